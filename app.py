@@ -1,7 +1,7 @@
 # app/app.py
 
 import streamlit as st
-from utils.common import set_page_config, display_header
+from utils.common import set_page_config, display_header, display_perf_panel
 
 # Configuration de la page
 set_page_config()
@@ -49,3 +49,6 @@ st.markdown("""
 # Afficher les pages dans la sidebar (automatiquement géré par Streamlit)
 # st.sidebar.title("Navigation")
 # Les pages sont listées automatiquement grâce à la structure de dossiers 'pages/'
+
+# Mesures de performance de la réexécution (barre latérale)
+display_perf_panel()
@@ -0,0 +1,269 @@
+# app/benchmarks/suite.py
+
+import json
+import platform
+import subprocess
+import sys
+import timeit
+from datetime import datetime
+import numpy as np
+from utils.bonds import (
+    calculate_price_batch, solve_ytm_batch, calculate_duration_batch, calculate_risk_batch, price_with_curve_batch, clear_schedule_cache
+)
+from utils.adjudication import clear_auction, sweep_user_bids
+from utils.yields import create_dummy_yield_curve, get_fitted_curve, interpolate_yield_curve, bootstrap_zero_curve, clear_curve_cache
+
+# Tailles par défaut (nombre d'obligations, de soumissions ou de maturités)
+DEFAULT_SIZES = (10, 1_000, 100_000, 1_000_000)
+
+# Ratio de temps au-delà duquel une mesure est signalée comme une régression
+DEFAULT_THRESHOLD = 1.25
+
+def _bond_universe(n, rng, frequency=None, max_maturity=30.0):
+    """
+    Univers d'obligations aléatoire : (nominal, coupon, fréquence, maturité, rendement).
+    """
+    face_value = np.full(n, 100.0)
+    coupon_rate = np.round(rng.uniform(0.0, 0.06, n), 4)
+    frequency = rng.choice([1.0, 2.0, 4.0], n) if frequency is None else np.full(n, float(frequency))
+    years_to_maturity = rng.uniform(0.25, max_maturity, n)
+    ytm = rng.uniform(0.0, 0.07, n)
+    return face_value, coupon_rate, frequency, years_to_maturity, ytm
+
+def _setup_price(n, rng):
+    fv, cr, f, T, y = _bond_universe(n, rng)
+    return lambda: calculate_price_batch(y, fv, cr, f, T)
+
+def _setup_ytm(n, rng):
+    fv, cr, f, T, y = _bond_universe(n, rng)
+    price = calculate_price_batch(y, fv, cr, f, T)
+    return lambda: solve_ytm_batch(price, fv, cr, f, T)
+
+def _setup_duration(n, rng):
+    fv, cr, f, T, y = _bond_universe(n, rng)
+    price = calculate_price_batch(y, fv, cr, f, T)
+    return lambda: calculate_duration_batch(price, fv, cr, f, T)
+
+def _setup_risk(n, rng):
+    fv, cr, f, T, y = _bond_universe(n, rng)
+    return lambda: calculate_risk_batch(y, fv, cr, f, T)
+
+def _setup_price_monthly_30y(n, rng):
+    fv, cr, f, T, y = _bond_universe(n, rng, frequency=12)
+    T = np.full(n, 30.0)
+    return lambda: calculate_price_batch(y, fv, cr, f, T)
+
+def _setup_price_monthly_30y_iterative(n, rng):
+    fv, cr, f, T, y = _bond_universe(n, rng, frequency=12)
+    T = np.full(n, 30.0)
+    return lambda: calculate_price_batch(y, fv, cr, f, T, method='iterative')
+
+def _setup_curve_pricing_monthly_30y(n, rng):
+    fv, cr, f, T, y = _bond_universe(n, rng, frequency=12)
+    T = 30.0 - rng.integers(0, 4, n) / 12
+    curve_df = create_dummy_yield_curve(None)
+    zero_curve = get_fitted_curve(curve_df)
+    zero_rate = lambda t: zero_curve(t, extrapolate=False)
+
+    def run():
+        clear_schedule_cache()
+        return price_with_curve_batch(zero_rate, fv, cr, f, T)
+    return run
+
+def _setup_clear_auction(n, rng):
+    prices = np.round(rng.normal(99.5, 0.2, n), 2)
+    amounts = rng.lognormal(np.log(20.0), 0.6, n)
+    total_amount = amounts.sum() * 0.6
+    return lambda: clear_auction(prices, amounts, total_amount)
+
+def _setup_sweep(n, rng):
+    prices = np.round(rng.normal(99.5, 0.2, 1000), 2)
+    amounts = rng.lognormal(np.log(20.0), 0.6, 1000)
+    user_prices = np.round(rng.uniform(99.0, 100.0, n), 2)
+    user_amounts = rng.uniform(1.0, 500.0, n)
+    return lambda: sweep_user_bids(prices, amounts, amounts.sum() * 0.6, user_prices, user_amounts)
+
+def _setup_interpolation(n, rng):
+    curve_df = create_dummy_yield_curve(None)
+    targets = rng.uniform(0.5, 30.0, n)
+    interpolate_yield_curve(curve_df, targets)
+    return lambda: interpolate_yield_curve(curve_df, targets)
+
+def _setup_interpolation_cold(n, rng):
+    curve_df = create_dummy_yield_curve(None)
+    targets = rng.uniform(0.5, 30.0, n)
+
+    def run():
+        clear_curve_cache()
+        return interpolate_yield_curve(curve_df, targets)
+    return run
+
+def _setup_bootstrap(n, rng):
+    fv, cr, f, T, _ = _bond_universe(n, rng, frequency=2)
+    price = calculate_price_batch(0.01 + 0.025 * (1 - np.exp(-T / 5)), fv, cr, f, T)
+    return lambda: bootstrap_zero_curve(price, fv, cr, f, T)
+
+def _setup_bootstrap_mixed(n, rng):
+    # Nominaux et fréquences mélangés : le critère d'arrêt ne doit pas dépendre du nominal
+    fv, cr, f, T, _ = _bond_universe(n, rng)
+    fv = rng.choice([100.0, 1_000.0, 1e6], n)
+    price = calculate_price_batch(0.01 + 0.025 * (1 - np.exp(-T / 5)), fv, cr, f, T)
+    return lambda: bootstrap_zero_curve(price, fv, cr, f, T)
+
+# Benchmarks : nom -> (préparation(taille, rng) -> fonction mesurée, taille maximale)
+BENCHMARKS = {
+    'bonds.price': (_setup_price, 1_000_000),
+    'bonds.ytm': (_setup_ytm, 1_000_000),
+    'bonds.duration': (_setup_duration, 1_000_000),
+    'bonds.risk': (_setup_risk, 1_000_000),
+    'bonds.price_monthly_30y': (_setup_price_monthly_30y, 1_000_000),
+    'bonds.price_monthly_30y_iterative': (_setup_price_monthly_30y_iterative, 100_000),
+    'bonds.curve_pricing_monthly_30y': (_setup_curve_pricing_monthly_30y, 100_000),
+    'adjudication.clear_auction': (_setup_clear_auction, 1_000_000),
+    'adjudication.sweep': (_setup_sweep, 1_000_000),
+    'yields.interpolate': (_setup_interpolation, 1_000_000),
+    'yields.interpolate_cold': (_setup_interpolation_cold, 1_000_000),
+    'yields.bootstrap': (_setup_bootstrap, 1_000),
+    'yields.bootstrap_mixed': (_setup_bootstrap_mixed, 1_000)
+}
+
+def _time(function, repeat, min_time):
+    """
+    Temps d'un appel (minimum et médiane sur `repeat` mesures), chaque mesure
+    enchaînant assez d'appels pour durer au moins `min_time` secondes.
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_time and number < 1_000_000:
+        number *= 10
+    timings = np.array(timer.repeat(repeat=repeat, number=number)) / number
+    return float(timings.min()), float(np.median(timings)), number
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def run_benchmarks(names=None, sizes=DEFAULT_SIZES, repeat=5, min_time=0.05, seed=0, verbose=False):
+    """
+    Exécute les benchmarks aux différentes tailles.
+
+    Args:
+        names (list, optional): Benchmarks à exécuter (par défaut, tous ; un
+            préfixe comme 'bonds' sélectionne tout un module).
+        sizes (tuple): Tailles testées (limitées par la taille maximale de chaque benchmark).
+        repeat (int): Nombre de mesures par point.
+        min_time (float): Durée minimale d'une mesure (secondes).
+        seed (int): Graine des données générées.
+        verbose (bool): Affiche chaque mesure.
+
+    Returns:
+        dict: {'metadata': {...}, 'results': [{'name', 'size', 'min_s', 'median_s', 'number', 'per_item_ns'}]}
+
+    Raises:
+        ValueError: si un nom ne désigne aucun benchmark.
+    """
+    def _matches(name, n):
+        return name == n or name.startswith(n + '.')
+
+    unknown = [n for n in names or () if not any(_matches(name, n) for name in BENCHMARKS)]
+    if unknown:
+        raise ValueError(f"Benchmark(s) inconnu(s) : {', '.join(unknown)} (disponibles : {', '.join(BENCHMARKS)})")
+    selected = [name for name in BENCHMARKS if names is None or any(_matches(name, n) for n in names)]
+    results = []
+    for name in selected:
+        setup, max_size = BENCHMARKS[name]
+        for size in sizes:
+            if size > max_size:
+                continue
+            function = setup(size, np.random.default_rng(seed))
+            min_s, median_s, number = _time(function, repeat, min_time)
+            results.append({
+                'name': name, 'size': size, 'min_s': min_s, 'median_s': median_s,
+                'number': number, 'per_item_ns': min_s / size * 1e9
+            })
+            if verbose:
+                print(f"{name:<40} {size:>10,} {min_s * 1e3:>12.3f} ms {min_s / size * 1e9:>10.1f} ns/élément")
+    return {
+        'metadata': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+def compare_results(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare des résultats à une référence, point par point (nom et taille).
+
+    Returns:
+        list: [{'name', 'size', 'baseline_s', 'current_s', 'ratio', 'regression', 'missing'}]
+            pour les points de la référence. Un point absent des résultats
+            courants est signalé par missing (current_s et ratio à None).
+    """
+    measured = {(r['name'], r['size']): r['min_s'] for r in current['results']}
+    comparison = []
+    for reference in baseline['results']:
+        key = (reference['name'], reference['size'])
+        baseline_s = reference['min_s']
+        current_s = measured.get(key)
+        if current_s is None:
+            ratio = None
+        else:
+            ratio = current_s / baseline_s if baseline_s > 0 else float('inf')
+        comparison.append({
+            'name': reference['name'], 'size': reference['size'], 'baseline_s': baseline_s,
+            'current_s': current_s, 'ratio': ratio, 'regression': ratio is not None and ratio > threshold,
+            'missing': current_s is None
+        })
+    return comparison
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmarks des calculs obligataires, d'adjudication et de courbe.")
+    parser.add_argument('names', nargs='*', help="Benchmarks ou modules à exécuter (par défaut, tous).")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES), help="Tailles, séparées par des virgules.")
+    parser.add_argument('--repeat', type=int, default=5, help="Nombre de mesures par point.")
+    parser.add_argument('--output', help="Fichier JSON où enregistrer les résultats.")
+    parser.add_argument('--compare', help="Fichier JSON de référence à comparer.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Ratio de temps signalé comme régression.")
+    parser.add_argument('--list', action='store_true', help="Liste les benchmarks disponibles.")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_, max_size) in BENCHMARKS.items():
+            print(f"{name:<40} taille maximale : {max_size:,}")
+        sys.exit(0)
+
+    sizes = tuple(int(s) for s in args.sizes.split(','))
+    try:
+        current = run_benchmarks(args.names or None, sizes=sizes, repeat=args.repeat, verbose=True)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"\nRésultats enregistrés dans {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        comparison = compare_results(current, baseline, args.threshold)
+        print(f"\nComparaison avec {args.compare} (seuil : x{args.threshold:.2f})")
+        for row in comparison:
+            if row['missing']:
+                print(f"{row['name']:<40} {row['size']:>10,} {row['baseline_s'] * 1e3:>12.3f} ms -> non mesuré")
+                continue
+            flag = 'RÉGRESSION' if row['regression'] else ''
+            print(f"{row['name']:<40} {row['size']:>10,} {row['baseline_s'] * 1e3:>12.3f} ms -> "
+                  f"{row['current_s'] * 1e3:>12.3f} ms  x{row['ratio']:.2f} {flag}")
+        n_missing = sum(row['missing'] for row in comparison)
+        if n_missing:
+            print(f"\n{n_missing} point(s) de la référence non mesuré(s) dans cette exécution")
+        sys.exit(1 if any(row['regression'] for row in comparison) else 0)
@@ -2,8 +2,9 @@
 
 import streamlit as st
 import pandas as pd
-from utils.common import set_page_config, display_header
-from utils.adjudication import calculate_marginal_price
+from utils.common import set_page_config, display_header, display_perf_panel
+from utils.orderbook import BidBook, BOOK_TICK_SIZE, BOOK_MAX_PRICE
+from utils.ingestion import validate_frame, BID_SCHEMA
 
 set_page_config()
 display_header("Calcul d'Adjudication à Prix Multiple", "⚖️")
@@ -30,7 +31,7 @@ edited_df = st.data_editor(
     initial_data,
     num_rows="dynamic",
     column_config={
-        "Price": st.column_config.NumberColumn("Prix (%)", format="%.2f", min_value=0.0),
+        "Price": st.column_config.NumberColumn("Prix (%)", format="%.3f", min_value=0.0, max_value=BOOK_MAX_PRICE, step=BOOK_TICK_SIZE),
         "Amount": st.column_config.NumberColumn("Montant Demandé (M€)", format="%.1f", min_value=0.0)
     },
     hide_index=True
@@ -42,20 +43,32 @@ if st.button("Calculer l'Adjudication"):
         st.warning("Veuillez entrer au moins une soumission.")
     else:
         try:
-            # Assurer que les colonnes sont numériques
-            edited_df['Price'] = pd.to_numeric(edited_df['Price'], errors='coerce')
-            edited_df['Amount'] = pd.to_numeric(edited_df['Amount'], errors='coerce')
-            
-            # Supprimer les lignes avec des valeurs manquantes après conversion
-            bids_df = edited_df.dropna()
+            # Valider les soumissions (prix et montants numériques et positifs)
+            bids_df, rejected_df = validate_frame(edited_df, BID_SCHEMA, downcast=False)
+            if not rejected_df.empty:
+                st.warning(f"{len(rejected_df)} soumission(s) ignorée(s) : {', '.join(rejected_df['Motif'].unique())}")
             
             if bids_df.empty:
                 st.error("Les données de soumission sont invalides. Veuillez vérifier les entrées.")
             else:
-                marginal_price, allocations_df = calculate_marginal_price(bids_df, total_amount)
+                # Le carnet est conservé entre les exécutions de la page : seules
+                # les soumissions modifiées depuis le dernier calcul sont appliquées.
+                if 'bid_book' not in st.session_state:
+                    st.session_state['bid_book'] = BidBook(total_amount, tick_size=BOOK_TICK_SIZE, max_price=BOOK_MAX_PRICE)
+                book = st.session_state['bid_book']
+                book.set_total_amount(total_amount)
+                book.sync(bids_df)
+                
+                result = book.clearing()
+                marginal_price = result.marginal_price
+                allocation_ratio = result.pro_rata_ratio
+                allocations_df = book.allocations()
                 
                 st.success("Calcul effectué avec succès!")
                 
+                if allocations_df['Amount'].sum() < total_amount:
+                    st.warning("Adjudication sous-souscrite : la demande totale est inférieure au montant à allouer, toutes les soumissions sont servies.")
+                
                 st.subheader("Résultats de l'Adjudication")
                 
                 col1, col2 = st.columns(2)
@@ -91,3 +104,6 @@ if st.button("Calculer l'Adjudication"):
                 
         except Exception as e:
             st.error(f"Une erreur est survenue lors du calcul : {e}")
+
+# Mesures de performance de la réexécution (barre latérale)
+display_perf_panel()
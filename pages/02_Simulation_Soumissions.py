@@ -3,8 +3,15 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.common import set_page_config, display_header
-from utils.adjudication import calculate_marginal_price
+from utils.common import set_page_config, display_header, display_perf_panel
+from utils.orderbook import BidBook, BOOK_TICK_SIZE, BOOK_MAX_PRICE
+from utils.adjudication import sweep_user_bids
+from utils.montecarlo import run_monte_carlo, summarize_monte_carlo
+from utils.ingestion import validate_frame, BID_SCHEMA
+from utils.lazy import lazy_import
+
+# plotly n'est chargé qu'au premier graphique affiché
+px = lazy_import('plotly.express')
 
 set_page_config()
 display_header("Simulation de Soumissions à l'Adjudication", "🎲")
@@ -28,15 +35,20 @@ market_df = st.data_editor(
     num_rows="dynamic",
     key="market_bids",
     column_config={
-        "Price": st.column_config.NumberColumn("Prix (%)", format="%.2f", min_value=0.0),
+        "Price": st.column_config.NumberColumn("Prix (%)", format="%.3f", min_value=0.0, max_value=BOOK_MAX_PRICE, step=BOOK_TICK_SIZE),
         "Amount": st.column_config.NumberColumn("Montant Demandé (M€)", format="%.1f", min_value=0.0)
     },
     hide_index=True
 )
 
+# Soumissions valides du marché (prix et montants numériques et positifs)
+market_df, rejected_market_df = validate_frame(market_df, BID_SCHEMA, downcast=False)
+if not rejected_market_df.empty:
+    st.warning(f"{len(rejected_market_df)} soumission(s) ignorée(s) : {', '.join(rejected_market_df['Motif'].unique())}")
+
 # --- Saisie de la Soumission de l'Utilisateur ---
 st.subheader("Votre Soumission")
-user_price = st.number_input("Votre Prix (%)", min_value=0.0, value=99.40, step=0.01)
+user_price = st.number_input("Votre Prix (%)", min_value=0.0, max_value=BOOK_MAX_PRICE, value=99.40, step=BOOK_TICK_SIZE, format="%.3f")
 user_amount = st.number_input("Votre Montant Demandé (M€)", min_value=0.0, value=50.0, step=1.0)
 
 # --- Paramètres de l'Adjudication ---
@@ -46,18 +58,18 @@ total_amount = st.number_input("Montant Total à Allouer (M€)", min_value=1.0,
 # --- Calcul et Affichage des Résultats ---
 if st.button("Simuler l'Adjudication"):
     try:
-        # 1. Préparer les DataFrames
-        market_df['Price'] = pd.to_numeric(market_df['Price'], errors='coerce')
-        market_df['Amount'] = pd.to_numeric(market_df['Amount'], errors='coerce')
-        market_df.dropna(inplace=True)
-        
-        user_bid = pd.DataFrame({'Price': [user_price], 'Amount': [user_amount]})
+        # 1. Combiner les soumissions dans le carnet, conservé entre les exécutions
+        # de la page : seules les soumissions modifiées sont appliquées.
+        if 'simulation_book' not in st.session_state:
+            st.session_state['simulation_book'] = BidBook(total_amount, tick_size=BOOK_TICK_SIZE, max_price=BOOK_MAX_PRICE)
+        book = st.session_state['simulation_book']
+        book.set_total_amount(total_amount)
+        all_bids = pd.concat([market_df, pd.DataFrame({'Price': [user_price], 'Amount': [user_amount]}, index=['user'])])
+        book.sync(all_bids)
         
-        # 2. Combiner les soumissions
-        all_bids = pd.concat([market_df, user_bid], ignore_index=True)
-        
-        # 3. Calculer l'adjudication
-        marginal_price, allocations_df = calculate_marginal_price(all_bids, total_amount)
+        # 2. Calculer l'adjudication
+        marginal_price = book.clearing().marginal_price
+        allocations_df = book.allocations()
         
         st.success("Simulation effectuée avec succès!")
         
@@ -69,8 +81,8 @@ if st.button("Simuler l'Adjudication"):
         with col2:
             st.metric("Montant Total Alloué", f"{allocations_df['Allocation'].sum():.2f} M€")
             
-        # 4. Extraire l'allocation de l'utilisateur
-        user_allocation = allocations_df[allocations_df['Price'] == user_price]['Allocation'].sum()
+        # 3. Extraire l'allocation de l'utilisateur (par identifiant, pas par prix)
+        user_allocation = book.allocation('user')
         
         st.markdown("### Votre Résultat")
         
@@ -99,3 +111,93 @@ if st.button("Simuler l'Adjudication"):
         
     except Exception as e:
         st.error(f"Une erreur est survenue lors de la simulation : {e}")
+
+# --- Balayage de Stratégies de Soumission ---
+st.subheader("Balayage de Stratégies de Soumission")
+st.info("Évaluez en une seule fois une grille de soumissions (prix × montant) face aux soumissions du marché.")
+
+col_sweep1, col_sweep2, col_sweep3 = st.columns(3)
+with col_sweep1:
+    sweep_price_min = st.number_input("Prix Minimum (%)", min_value=0.0, value=99.20, step=0.01)
+    sweep_price_max = st.number_input("Prix Maximum (%)", min_value=0.0, value=99.70, step=0.01)
+with col_sweep2:
+    sweep_amount_min = st.number_input("Montant Minimum (M€)", min_value=0.0, value=10.0, step=10.0)
+    sweep_amount_max = st.number_input("Montant Maximum (M€)", min_value=0.0, value=300.0, step=10.0)
+with col_sweep3:
+    sweep_points = st.number_input("Points par Axe", min_value=2, max_value=500, value=100, step=10)
+
+if st.button("Lancer le Balayage"):
+    try:
+        sweep_prices = np.linspace(sweep_price_min, sweep_price_max, int(sweep_points))
+        sweep_amounts = np.linspace(sweep_amount_min, sweep_amount_max, int(sweep_points))
+        price_grid, amount_grid = np.meshgrid(sweep_prices, sweep_amounts)
+        
+        sweep = sweep_user_bids(
+            market_df['Price'].to_numpy(), market_df['Amount'].to_numpy(),
+            total_amount, price_grid, amount_grid
+        )
+        
+        surfaces = [
+            (sweep.allocation, "Montant Alloué (M€)"),
+            (sweep.fill_ratio * 100, "Ratio d'Allocation (%)"),
+            (sweep.marginal_price, "Prix Marginal (%)"),
+            (sweep.cost, "Coût (M€)")
+        ]
+        for row_start in (0, 2):
+            cols = st.columns(2)
+            for col, (surface, title) in zip(cols, surfaces[row_start:row_start + 2]):
+                fig = px.imshow(
+                    surface,
+                    x=sweep_prices,
+                    y=sweep_amounts,
+                    origin='lower',
+                    aspect='auto',
+                    labels={'x': 'Votre Prix (%)', 'y': 'Votre Montant (M€)', 'color': title},
+                    title=title
+                )
+                with col:
+                    st.plotly_chart(fig, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"Une erreur est survenue lors du balayage : {e}")
+
+# --- Simulation Monte Carlo ---
+st.subheader("Simulation Monte Carlo")
+st.info("Générez des carnets de marché aléatoires, calibrés sur les soumissions ci-dessus, pour estimer la distribution du prix marginal et de votre allocation.")
+
+col_mc1, col_mc2 = st.columns(2)
+with col_mc1:
+    n_simulations = st.number_input("Nombre de Simulations", min_value=100, max_value=1_000_000, value=10000, step=1000)
+with col_mc2:
+    mc_seed = st.number_input("Graine Aléatoire", min_value=0, value=42, step=1)
+
+if st.button("Lancer la Simulation Monte Carlo"):
+    try:
+        mc_results = run_monte_carlo(
+            market_df, total_amount, user_price, user_amount,
+            n_simulations=int(n_simulations), seed=int(mc_seed)
+        )
+        
+        col_mc3, col_mc4, col_mc5 = st.columns(3)
+        with col_mc3:
+            st.metric("Probabilité d'Être Servi", f"{(mc_results['Allocation'] > 0).mean():.1%}")
+        with col_mc4:
+            st.metric("Ratio d'Allocation Moyen", f"{mc_results['Fill_Ratio'].mean():.1%}")
+        with col_mc5:
+            st.metric("Prix Marginal Médian", f"{mc_results['Marginal_Price'].median():.2f} %")
+        
+        col_mc6, col_mc7 = st.columns(2)
+        with col_mc6:
+            st.plotly_chart(px.histogram(mc_results, x='Marginal_Price', title='Distribution du Prix Marginal',
+                                         labels={'Marginal_Price': 'Prix Marginal (%)'}), use_container_width=True)
+        with col_mc7:
+            st.plotly_chart(px.histogram(mc_results, x='Fill_Ratio', title="Distribution du Ratio d'Allocation",
+                                         labels={'Fill_Ratio': "Ratio d'Allocation"}), use_container_width=True)
+        
+        st.dataframe(summarize_monte_carlo(mc_results))
+        
+    except Exception as e:
+        st.error(f"Une erreur est survenue lors de la simulation Monte Carlo : {e}")
+
+# Mesures de performance de la réexécution (barre latérale)
+display_perf_panel()
@@ -3,9 +3,13 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-from utils.common import set_page_config, display_header
-from utils.yields import create_dummy_yield_curve, interpolate_yield_curve
+from utils.common import set_page_config, display_header, display_perf_panel, read_data_file
+from utils.yields import create_dummy_yield_curve, interpolate_yield_curve, CURVE_METHODS
+from utils.curve_panel import CurvePanel, generate_sample_curve_history, FACTOR_NAMES
+from utils.lazy import lazy_import
+
+# plotly n'est chargé qu'au premier graphique affiché
+px = lazy_import('plotly.express')
 
 set_page_config()
 display_header("Analyse de la Courbe de Rendement (Yield Curve)", "📊")
@@ -33,10 +37,7 @@ else:
     uploaded_file = st.file_uploader("Choisissez un fichier CSV ou Excel", type=["csv", "xlsx"])
     if uploaded_file is not None:
         try:
-            if uploaded_file.name.endswith('.csv'):
-                curve_df = pd.read_csv(uploaded_file)
-            else:
-                curve_df = pd.read_excel(uploaded_file)
+            curve_df = read_data_file(uploaded_file)
             
             st.success("Fichier chargé avec succès!")
             st.dataframe(curve_df.head(), hide_index=True)
@@ -54,11 +55,12 @@ if curve_df is not None:
     st.subheader("Visualisation et Interpolation")
     
     # Paramètres d'interpolation
+    method = st.selectbox("Méthode d'Interpolation", list(CURVE_METHODS), index=0)
     max_maturity = curve_df['Maturity'].max()
     target_maturities = np.linspace(curve_df['Maturity'].min(), max_maturity, 100)
     
     # Interpolation
-    interpolated_df = interpolate_yield_curve(curve_df, target_maturities)
+    interpolated_df = interpolate_yield_curve(curve_df, target_maturities, method)
     
     # Préparation des données pour le graphique
     plot_df = pd.DataFrame({
@@ -108,3 +110,64 @@ if curve_df is not None:
         st.error("Pente Négative (Inversée) : Peut signaler une récession économique future.")
     else:
         st.warning("Pente Plate : Incertitude économique ou transition.")
+
+# --- Historique des Courbes et Analyse en Composantes Principales ---
+st.subheader("Historique des Courbes (ACP)")
+
+st.markdown("""
+    Les courbes quotidiennes sont interpolées sur une grille de maturités commune, puis
+    les **variations quotidiennes** sont décomposées en facteurs de **niveau**, de **pente**
+    et de **courbure** (analyse en composantes principales).
+""")
+
+history_source = st.radio(
+    "Source de l'historique",
+    ("Historique d'Exemple", "Charger un Historique (CSV : Date, Maturity, Yield)"),
+    index=0
+)
+
+@st.cache_resource
+def load_sample_panel():
+    return CurvePanel.from_frame(generate_sample_curve_history(), method='cubic')
+
+panel = None
+if history_source == "Historique d'Exemple":
+    panel = load_sample_panel()
+else:
+    history_file = st.file_uploader("Historique de courbes", type=["csv"], key="curve_history")
+    if history_file is not None:
+        try:
+            panel = CurvePanel.from_frame(pd.read_csv(history_file, parse_dates=['Date']), method='cubic')
+        except Exception as e:
+            st.error(f"Erreur lors du chargement de l'historique : {e}")
+
+if panel is not None and len(panel) >= 3:
+    pca = panel.pca()
+    st.info(f"{len(panel)} courbes sur {len(panel.tenors)} maturités.")
+
+    col_pca1, col_pca2 = st.columns(2)
+    with col_pca1:
+        loadings_df = pd.DataFrame(pca.loadings, columns=FACTOR_NAMES).assign(Maturity=panel.tenors)
+        fig_loadings = px.line(
+            loadings_df.melt(id_vars='Maturity', var_name='Facteur', value_name='Sensibilité'),
+            x='Maturity', y='Sensibilité', color='Facteur', markers=True,
+            title='Facteurs de Déformation de la Courbe',
+            labels={'Maturity': 'Maturité (Années)'}
+        )
+        st.plotly_chart(fig_loadings, use_container_width=True)
+    with col_pca2:
+        st.dataframe(pd.DataFrame({
+            'Facteur': FACTOR_NAMES,
+            'Variance Expliquée': pca.explained_variance_ratio,
+            'Écart-type Quotidien (pb)': np.sqrt(pca.variances) * 100
+        }).style.format({'Variance Expliquée': "{:.1%}", 'Écart-type Quotidien (pb)': "{:.2f}"}), hide_index=True)
+
+    fig_history = px.line(
+        panel.to_frame()[[t for t in (2.0, 10.0, 30.0) if t in panel.tenors]].rename(columns=lambda t: f"{t:g} ans"),
+        title='Historique des Rendements',
+        labels={'value': 'Rendement (%)', 'variable': 'Maturité'}
+    )
+    st.plotly_chart(fig_history, use_container_width=True)
+
+# Mesures de performance de la réexécution (barre latérale)
+display_perf_panel()
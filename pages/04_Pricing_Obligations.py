@@ -1,14 +1,14 @@
 # app/pages/04_Pricing_Obligations.py
 
 import streamlit as st
-from utils.common import set_page_config, display_header
-from utils.bonds import calculate_ytm, calculate_price, calculate_duration
+from utils.common import set_page_config, display_header, display_perf_panel
+from utils.bonds import calculate_ytm, calculate_risk
 
 set_page_config()
 display_header("Pricing et Analyse d'Obligations", "💰")
 
 st.markdown("""
-    Calculez le **Prix**, le **Rendement à l'Échéance (YTM)** et la **Duration** d'une obligation.
+    Calculez le **Prix**, le **Rendement à l'Échéance (YTM)**, la **Duration**, la **Convexité** et le **DV01** d'une obligation.
 """)
 
 # --- Saisie des Paramètres de l'Obligation ---
@@ -35,9 +35,9 @@ with col3:
 if st.button("Calculer les Métriques"):
     try:
         if input_type == "Prix Actuel":
-            # Calculer YTM et Duration à partir du Prix
+            # Calculer YTM puis les métriques de risque à partir du Prix
             ytm = calculate_ytm(price, face_value, coupon_rate, frequency, years_to_maturity)
-            macaulay, modified = calculate_duration(price, face_value, coupon_rate, frequency, years_to_maturity, ytm)
+            risk = calculate_risk(ytm, face_value, coupon_rate, frequency, years_to_maturity)
             
             st.subheader("Résultats (Calculé à partir du Prix)")
             
@@ -47,14 +47,12 @@ if st.button("Calculer les Métriques"):
             with col_res2:
                 st.metric("Rendement à l'Échéance (YTM)", f"{ytm * 100:.2f} %")
             with col_res3:
-                st.metric("Duration Modifiée (Années)", f"{modified:.2f}")
-                
-            st.info(f"Duration de Macaulay : {macaulay:.2f} années")
+                st.metric("Duration Modifiée (Années)", f"{risk.modified_duration:.2f}")
             
         else:
-            # Calculer Prix et Duration à partir du YTM
-            price_calc = calculate_price(ytm_target, face_value, coupon_rate, frequency, years_to_maturity)
-            macaulay, modified = calculate_duration(price_calc, face_value, coupon_rate, frequency, years_to_maturity, ytm_target)
+            # Calculer Prix et métriques de risque à partir du YTM, en une seule passe
+            risk = calculate_risk(ytm_target, face_value, coupon_rate, frequency, years_to_maturity)
+            price_calc = risk.price
             
             st.subheader("Résultats (Calculé à partir du YTM Cible)")
             
@@ -64,9 +62,15 @@ if st.button("Calculer les Métriques"):
             with col_res2:
                 st.metric("Prix Calculé (€)", f"{price_calc:.2f}")
             with col_res3:
-                st.metric("Duration Modifiée (Années)", f"{modified:.2f}")
-                
-            st.info(f"Duration de Macaulay : {macaulay:.2f} années")
+                st.metric("Duration Modifiée (Années)", f"{risk.modified_duration:.2f}")
+            
+        col_risk1, col_risk2, col_risk3 = st.columns(3)
+        with col_risk1:
+            st.metric("Duration de Macaulay (Années)", f"{risk.macaulay_duration:.2f}")
+        with col_risk2:
+            st.metric("Convexité", f"{risk.convexity:.2f}")
+        with col_risk3:
+            st.metric("DV01 (€ / pb)", f"{risk.dv01:.4f}")
             
         st.markdown("""
             <div style="margin-top: 20px; padding: 10px; border: 1px solid #ccc; border-radius: 5px;">
@@ -78,3 +82,6 @@ if st.button("Calculer les Métriques"):
             
     except Exception as e:
         st.error(f"Une erreur est survenue lors du calcul : {e}")
+
+# Mesures de performance de la réexécution (barre latérale)
+display_perf_panel()
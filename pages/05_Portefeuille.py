@@ -1,10 +1,8 @@
 # app/pages/05_Portefeuille.py
 
 import streamlit as st
-import pandas as pd
-import numpy as np
-from utils.common import set_page_config, display_header, get_bond_example_df
-from utils.bonds import calculate_ytm, calculate_duration
+from utils.common import set_page_config, display_header, display_perf_panel, get_bond_example_df
+from utils.portfolio import prepare_portfolio, analyze_portfolio
 
 set_page_config()
 display_header("Analyse de Portefeuille Obligataire", "💼")
@@ -43,60 +41,33 @@ if st.button("Analyser le Portefeuille"):
         st.warning("Veuillez entrer au moins une obligation dans le portefeuille.")
     else:
         try:
-            # Assurer que les colonnes sont numériques et non nulles
-            cols_to_check = ['Nominal', 'Taux_Coupon', 'Frequence_Coupon', 'Maturite_Annees', 'Prix_Actuel', 'Quantité']
-            for col in cols_to_check:
-                portfolio_df[col] = pd.to_numeric(portfolio_df[col], errors='coerce')
-            
-            portfolio_df.dropna(subset=cols_to_check, inplace=True)
+            # Valider les lignes : nominal et prix strictement positifs, coupon, fréquence, maturité et quantité dans leurs bornes (l'ISIN est libre)
+            portfolio_df, rejected_df = prepare_portfolio(portfolio_df, return_rejected=True)
+            if not rejected_df.empty:
+                st.warning(f"{len(rejected_df)} ligne(s) ignorée(s) : {', '.join(rejected_df['Motif'].unique())}")
             
             if portfolio_df.empty:
                 st.error("Les données du portefeuille sont invalides. Veuillez vérifier les entrées.")
             else:
-                # Calcul des métriques pour chaque obligation
-                results = []
-                for index, row in portfolio_df.iterrows():
-                    ytm = calculate_ytm(
-                        row['Prix_Actuel'], row['Nominal'], row['Taux_Coupon'] / 100, 
-                        row['Frequence_Coupon'], row['Maturite_Annees']
-                    )
-                    macaulay, modified = calculate_duration(
-                        row['Prix_Actuel'], row['Nominal'], row['Taux_Coupon'] / 100, 
-                        row['Frequence_Coupon'], row['Maturite_Annees'], ytm
-                    )
-                    
-                    market_value = row['Prix_Actuel'] * row['Quantité']
-                    
-                    results.append({
-                        'ISIN': row['ISIN'],
-                        'YTM': ytm,
-                        'Modified_Duration': modified,
-                        'Market_Value': market_value
-                    })
-                
-                results_df = pd.DataFrame(results)
-                
-                # Calcul des métriques agrégées
-                total_market_value = results_df['Market_Value'].sum()
-                results_df['Weight'] = results_df['Market_Value'] / total_market_value
-                
-                # Duration Modifiée Pondérée du Portefeuille
-                portfolio_duration = (results_df['Modified_Duration'] * results_df['Weight']).sum()
-                
-                # YTM Pondéré du Portefeuille (Approximation)
-                portfolio_ytm = (results_df['YTM'] * results_df['Weight']).sum()
+                # Calcul des métriques pour toutes les obligations en une fois
+                results_df, summary = analyze_portfolio(portfolio_df)
                 
                 st.success("Analyse du portefeuille effectuée avec succès!")
                 
                 st.subheader("Synthèse du Portefeuille")
                 
-                col1, col2, col3 = st.columns(3)
+                col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("Valeur Totale du Marché", f"{total_market_value:,.2f} €")
+                    st.metric("Valeur Totale du Marché", f"{summary['total_market_value']:,.2f} €")
                 with col2:
-                    st.metric("Duration Modifiée du Portefeuille", f"{portfolio_duration:.2f} Années")
+                    st.metric("Duration Modifiée du Portefeuille", f"{summary['modified_duration']:.2f} Années")
                 with col3:
-                    st.metric("YTM Pondéré du Portefeuille", f"{portfolio_ytm * 100:.2f} %")
+                    st.metric("YTM Pondéré du Portefeuille", f"{summary['ytm'] * 100:.2f} %")
+                with col4:
+                    st.metric("DV01 du Portefeuille", f"{summary['dv01']:,.2f} €")
+                
+                if summary['n_unconverged']:
+                    st.warning(f"Le YTM n'a pas convergé pour {summary['n_unconverged']} obligation(s) : vérifiez leurs prix.")
                     
                 st.markdown("### Détail des Obligations")
                 
@@ -104,14 +75,19 @@ if st.button("Analyser le Portefeuille"):
                 detail_df = portfolio_df.copy()
                 detail_df['YTM (%)'] = results_df['YTM'] * 100
                 detail_df['Duration Modifiée'] = results_df['Modified_Duration']
+                detail_df['Convexité'] = results_df['Convexity']
+                detail_df['DV01 (€)'] = results_df['DV01']
                 detail_df['Valeur Marché'] = results_df['Market_Value']
                 detail_df['Poids (%)'] = results_df['Weight'] * 100
                 
                 st.dataframe(
-                    detail_df[['ISIN', 'Quantité', 'Prix_Actuel', 'Valeur Marché', 'Poids (%)', 'YTM (%)', 'Duration Modifiée']],
+                    detail_df[['ISIN', 'Quantité', 'Prix_Actuel', 'Valeur Marché', 'Poids (%)', 'YTM (%)', 'Duration Modifiée', 'Convexité', 'DV01 (€)']],
                     hide_index=True
                 )
                 
         except Exception as e:
             st.error(f"Une erreur est survenue lors de l'analyse : {e}")
             st.exception(e)
+
+# Mesures de performance de la réexécution (barre latérale)
+display_perf_panel()
@@ -1,100 +1,193 @@
 # app/pages/06_Backtest_Adjudications.py
 
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.express as px
-from utils.common import set_page_config, display_header
+from utils.common import set_page_config, display_header, display_perf_panel
+from utils.backtest import run_backtest, summarize_backtest, generate_sample_history, AUCTION_COLUMNS, BID_COLUMNS
+from utils.store import AuctionStore, DEFAULT_STORE_DIR
+from utils.ingestion import ingest_csv, AUCTION_SCHEMA, AUCTION_BID_SCHEMA
+from utils.lazy import lazy_import
+
+# plotly n'est chargé qu'au premier graphique affiché
+px = lazy_import('plotly.express')
 
 set_page_config()
 display_header("Backtest de Stratégies d'Adjudication", "⏳")
 
 st.markdown("""
     Évaluez la performance historique de vos stratégies de soumission aux adjudications.
-    
-    **Note :** Cette page est une maquette. Pour un backtest réel, une base de données
-    historique des soumissions et des résultats d'adjudication serait nécessaire.
+
+    Chaque adjudication historique est rejouée avec votre soumission ajoutée au carnet complet
+    du marché. Une stratégie soumet au **prix marginal de la précédente adjudication du même ISIN**,
+    augmenté d'un écart de prix, pour une fraction du montant offert.
 """)
 
-# --- Données de Backtest Factices ---
-@st.cache_data
-def load_backtest_data():
-    dates = pd.to_datetime(pd.date_range(start='2022-01-01', periods=12, freq='M'))
-    data = {
-        'Date': dates,
-        'Prix_Marginal_Réel': np.random.uniform(98.0, 102.0, 12),
-        'Prix_Soumis': np.random.uniform(97.5, 101.5, 12),
-        'Montant_Soumis': np.random.randint(50, 200, 12),
-        'Montant_Alloué': np.random.randint(0, 200, 12)
-    }
-    df = pd.DataFrame(data)
-    # Simuler l'allocation
-    df['Allocation_Ratio'] = np.where(df['Prix_Soumis'] >= df['Prix_Marginal_Réel'], 
-                                     df['Montant_Alloué'] / df['Montant_Soumis'], 
-                                     0)
-    df['Allocation_Ratio'] = df['Allocation_Ratio'].clip(upper=1.0)
-    df['Montant_Alloué'] = df['Montant_Soumis'] * df['Allocation_Ratio']
-    
-    # Simuler le gain/perte (très simplifié)
-    df['Performance'] = (df['Prix_Marginal_Réel'] - df['Prix_Soumis']) * df['Montant_Alloué']
-    
-    return df
-
-backtest_df = load_backtest_data()
-
-# --- Affichage des Résultats ---
-st.subheader("Historique des Adjudications Simulé")
-st.dataframe(backtest_df.style.format({
-    'Prix_Marginal_Réel': "{:.2f}",
-    'Prix_Soumis': "{:.2f}",
-    'Montant_Soumis': "{:,.0f}",
-    'Montant_Alloué': "{:,.0f}",
-    'Allocation_Ratio': "{:.1%}",
-    'Performance': "{:,.2f}"
-}), hide_index=True)
-
-# --- Visualisation de la Performance ---
-st.subheader("Visualisation de la Performance")
-
-# Graphique de l'écart de prix
-fig_price = px.line(
-    backtest_df,
-    x='Date',
-    y=['Prix_Marginal_Réel', 'Prix_Soumis'],
-    title='Comparaison Prix Soumis vs Prix Marginal Réel',
-    labels={'value': 'Prix (%)', 'variable': 'Type de Prix'}
-)
-fig_price.update_layout(hovermode="x unified")
-st.plotly_chart(fig_price, use_container_width=True)
-
-# Graphique de la performance
-fig_perf = px.bar(
-    backtest_df,
-    x='Date',
-    y='Performance',
-    title='Performance par Adjudication (Gain/Perte Simulé)',
-    labels={'Performance': 'Performance (€)'}
+# --- Données Historiques ---
+st.subheader("Historique des Adjudications")
+
+data_source = st.radio(
+    "Source des données",
+    ("Historique d'Exemple", "Charger des Fichiers (CSV)", "Base Historique Locale (Parquet)"),
+    index=0
 )
-st.plotly_chart(fig_perf, use_container_width=True)
 
-# --- Métriques Clés ---
-st.subheader("Métriques de Backtest")
+@st.cache_data
+def load_sample_history():
+    return generate_sample_history()
 
-total_performance = backtest_df['Performance'].sum()
-avg_allocation = backtest_df['Allocation_Ratio'].mean()
-hit_rate = (backtest_df['Allocation_Ratio'] > 0).sum() / len(backtest_df)
+auctions_df, bids_df = None, None
+if data_source == "Historique d'Exemple":
+    auctions_df, bids_df = load_sample_history()
+elif data_source == "Base Historique Locale (Parquet)":
+    store_path = st.text_input("Répertoire de la base", value=DEFAULT_STORE_DIR)
+    try:
+        store = AuctionStore(store_path)
+        index_df = store.index()
+        if index_df.empty:
+            st.warning("La base est vide : ingérez des adjudications avec AuctionStore.append.")
+        else:
+            col_store1, col_store2 = st.columns(2)
+            with col_store1:
+                selected_isins = st.multiselect("ISIN", sorted(index_df['ISIN'].unique()))
+            with col_store2:
+                date_range = st.date_input(
+                    "Période",
+                    value=(index_df['Date'].min().date(), index_df['Date'].max().date())
+                )
+            start_date, end_date = (date_range + (None,))[:2] if isinstance(date_range, tuple) else (date_range, None)
+            auctions_df, bids_df = store.load(start=start_date, end=end_date, isins=selected_isins or None)
+            if auctions_df.empty:
+                st.warning("Aucune adjudication ne correspond aux critères.")
+                auctions_df, bids_df = None, None
+    except Exception as e:
+        st.error(f"Erreur lors de la lecture de la base : {e}")
+        auctions_df, bids_df = None, None
+else:
+    col_file1, col_file2 = st.columns(2)
+    with col_file1:
+        auctions_file = st.file_uploader(f"En-têtes d'adjudication ({', '.join(AUCTION_COLUMNS)})", type=["csv"])
+    with col_file2:
+        bids_file = st.file_uploader(f"Carnets de soumissions ({', '.join(BID_COLUMNS)})", type=["csv"])
+    if auctions_file is not None and bids_file is not None:
+        try:
+            # Lecture par blocs, validée et typée ; les lignes invalides sont signalées
+            auctions_df, auctions_report = ingest_csv(auctions_file, AUCTION_SCHEMA)
+            bids_df, bids_report = ingest_csv(bids_file, AUCTION_BID_SCHEMA)
+            for label, report in (("En-têtes", auctions_report), ("Soumissions", bids_report)):
+                if report.n_rejected:
+                    st.warning(f"{label} : {report.n_rejected:,} ligne(s) rejetée(s) sur {report.n_rows:,}.")
+                    st.dataframe(report.rejected.head(100), hide_index=True)
+        except ValueError as e:
+            st.error(str(e))
+            auctions_df, bids_df = None, None
+        except Exception as e:
+            st.error(f"Erreur lors du chargement des fichiers : {e}")
+            auctions_df, bids_df = None, None
 
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.metric("Performance Totale Simulé", f"{total_performance:,.2f} €")
-with col2:
-    st.metric("Ratio d'Allocation Moyen", f"{avg_allocation:.1%}")
-with col3:
-    st.metric("Taux de Succès (Hit Rate)", f"{hit_rate:.1%}")
+if auctions_df is not None:
+    st.info(f"{len(auctions_df)} adjudications, {len(bids_df):,} soumissions.")
 
-st.markdown("""
-    <div style="margin-top: 20px; padding: 10px; border: 1px solid #ccc; border-radius: 5px;">
-        **Conclusion :** L'analyse montre comment les prix soumis se sont comparés
-        au prix marginal réel, impactant le ratio d'allocation et la performance simulée.
-    </div>
-""", unsafe_allow_html=True)
+    # --- Grille de Stratégies ---
+    st.subheader("Grille de Stratégies")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        offset_range = st.slider("Écart au Prix d'Ancrage (points de %)", -1.0, 1.0, (-0.3, 0.3), step=0.01)
+        n_offsets = st.number_input("Nombre d'Écarts", min_value=1, max_value=200, value=25)
+    with col2:
+        fraction_range = st.slider("Montant Soumis (% du montant offert)", 0.5, 50.0, (1.0, 20.0), step=0.5)
+        n_fractions = st.number_input("Nombre de Montants", min_value=1, max_value=200, value=20)
+
+    if st.button("Lancer le Backtest"):
+        try:
+            offsets, fractions = np.meshgrid(
+                np.linspace(*offset_range, int(n_offsets)),
+                np.linspace(*fraction_range, int(n_fractions)) / 100
+            )
+            results_df = run_backtest(auctions_df, bids_df, offsets, fractions, workers=None)
+            summary_df = summarize_backtest(results_df)
+
+            # --- Carte de la Performance par Stratégie ---
+            st.subheader("Performance par Stratégie")
+
+            performance_grid = summary_df.pivot(index='Amount_Fraction', columns='Price_Offset', values='Performance_Totale')
+            fig_grid = px.imshow(
+                performance_grid.to_numpy(),
+                x=performance_grid.columns,
+                y=performance_grid.index * 100,
+                origin='lower',
+                aspect='auto',
+                labels={'x': "Écart au Prix d'Ancrage", 'y': 'Montant Soumis (%)', 'color': 'Performance (M€)'},
+                title='Performance Totale par Stratégie'
+            )
+            st.plotly_chart(fig_grid, use_container_width=True)
+
+            best = summary_df.loc[summary_df['Performance_Totale'].idxmax()]
+            st.success(
+                f"Meilleure stratégie : écart de {best['Price_Offset']:+.2f} point, "
+                f"montant de {best['Amount_Fraction']:.1%} du montant offert."
+            )
+
+            backtest_df = results_df[results_df['Strategy'] == best['Strategy']]
+
+            # --- Affichage des Résultats ---
+            st.subheader("Historique de la Meilleure Stratégie")
+            st.dataframe(backtest_df[[
+                'Date', 'ISIN', 'Prix_Marginal', 'Prix_Soumis', 'Montant_Soumis', 'Montant_Alloué', 'Allocation_Ratio', 'Performance'
+            ]].style.format({
+                'Prix_Marginal': "{:.2f}",
+                'Prix_Soumis': "{:.2f}",
+                'Montant_Soumis': "{:,.1f}",
+                'Montant_Alloué': "{:,.1f}",
+                'Allocation_Ratio': "{:.1%}",
+                'Performance': "{:,.3f}"
+            }), hide_index=True)
+
+            # --- Visualisation de la Performance ---
+            st.subheader("Visualisation de la Performance")
+
+            # Graphique de l'écart de prix
+            fig_price = px.line(
+                backtest_df,
+                x='Date',
+                y=['Prix_Marginal', 'Prix_Soumis'],
+                title='Comparaison Prix Soumis vs Prix Marginal',
+                labels={'value': 'Prix (%)', 'variable': 'Type de Prix'}
+            )
+            fig_price.update_layout(hovermode="x unified")
+            st.plotly_chart(fig_price, use_container_width=True)
+
+            # Graphique de la performance cumulée
+            fig_perf = px.line(
+                backtest_df.assign(Performance_Cumulée=backtest_df['Performance'].cumsum()),
+                x='Date',
+                y='Performance_Cumulée',
+                title='Performance Cumulée (M€)',
+                labels={'Performance_Cumulée': 'Performance (M€)'}
+            )
+            st.plotly_chart(fig_perf, use_container_width=True)
+
+            # --- Métriques Clés ---
+            st.subheader("Métriques de Backtest")
+
+            col3, col4, col5 = st.columns(3)
+            with col3:
+                st.metric("Performance Totale", f"{best['Performance_Totale']:,.3f} M€")
+            with col4:
+                st.metric("Ratio d'Allocation Moyen", f"{best['Ratio_Allocation_Moyen']:.1%}")
+            with col5:
+                st.metric("Taux de Succès (Hit Rate)", f"{best['Taux_Succes']:.1%}")
+
+            st.markdown("""
+                <div style="margin-top: 20px; padding: 10px; border: 1px solid #ccc; border-radius: 5px;">
+                    **Performance :** écart entre le prix de référence (prix post-adjudication s'il est
+                    disponible, sinon prix marginal) et le prix payé, multiplié par le montant alloué.
+                </div>
+            """, unsafe_allow_html=True)
+
+        except Exception as e:
+            st.error(f"Une erreur est survenue lors du backtest : {e}")
+            st.exception(e)
+
+# Mesures de performance de la réexécution (barre latérale)
+display_perf_panel()
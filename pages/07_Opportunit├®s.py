@@ -2,9 +2,10 @@
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-from utils.common import set_page_config, display_header, get_bond_example_df
-from utils.bonds import calculate_price
+from utils.common import set_page_config, display_header, display_perf_panel, get_bond_example_df
+from utils.yields import create_dummy_yield_curve
+from utils.screener import screen_opportunities, reference_yields_from_curve, CHEAP_LABEL
+from utils.ingestion import validate_frame, BOND_SCHEMA, ColumnSchema
 
 set_page_config()
 display_header("Identification d'Opportunités d'Arbitrage", "🔍")
@@ -38,40 +39,45 @@ analysis_df = st.data_editor(
     hide_index=True
 )
 
+# --- Paramètres du Screening ---
+st.subheader("Paramètres du Screening")
+
+col_param1, col_param2, col_param3 = st.columns(3)
+with col_param1:
+    reference_source = st.radio("Rendements de Référence", ["YTM Saisis", "Courbe de Rendement (Exemple)"])
+with col_param2:
+    threshold_bp = st.number_input("Seuil d'Écart Normalisé (pb)", min_value=0.0, value=5.0, step=1.0)
+    rank_by = st.selectbox(
+        "Classement", ["normalized_gap", "spread"],
+        format_func=lambda x: "Écart de Prix / DV01" if x == "normalized_gap" else "Écart de Rendement"
+    )
+with col_param3:
+    top_n = st.number_input("Nombre d'Opportunités Affichées", min_value=1, value=10, step=1)
+
 # --- Calcul et Affichage des Résultats ---
 if st.button("Rechercher les Opportunités"):
     if analysis_df.empty:
         st.warning("Veuillez entrer au moins une obligation à analyser.")
     else:
         try:
-            # Assurer que les colonnes sont numériques
-            cols_to_check = ['Nominal', 'Taux_Coupon', 'Frequence_Coupon', 'Maturite_Annees', 'Prix_Actuel', 'YTM_Reference (%)']
-            for col in cols_to_check:
-                analysis_df[col] = pd.to_numeric(analysis_df[col], errors='coerce')
-            
-            analysis_df.dropna(subset=cols_to_check, inplace=True)
+            # Valider les obligations saisies : nominal et prix strictement positifs, coupon, fréquence et maturité dans leurs bornes (l'ISIN est libre)
+            analysis_df, rejected_df = validate_frame(
+                analysis_df, {**BOND_SCHEMA, 'YTM_Reference (%)': ColumnSchema('float64')}, downcast=False
+            )
+            if not rejected_df.empty:
+                st.warning(f"{len(rejected_df)} obligation(s) ignorée(s) : {', '.join(rejected_df['Motif'].unique())}")
             
             if analysis_df.empty:
                 st.error("Les données d'analyse sont invalides. Veuillez vérifier les entrées.")
             else:
-                # Calcul du prix théorique
-                analysis_df['Prix_Théorique'] = analysis_df.apply(
-                    lambda row: calculate_price(
-                        row['YTM_Reference (%)'] / 100, 
-                        row['Nominal'], 
-                        row['Taux_Coupon'] / 100, 
-                        row['Frequence_Coupon'], 
-                        row['Maturite_Annees']
-                    ), axis=1
-                )
-                
-                # Calcul de l'écart (Spread)
-                analysis_df['Écart_Prix'] = analysis_df['Prix_Actuel'] - analysis_df['Prix_Théorique']
+                if reference_source == "YTM Saisis":
+                    reference_ytm = analysis_df['YTM_Reference (%)'].to_numpy() / 100
+                else:
+                    reference_ytm = reference_yields_from_curve(create_dummy_yield_curve(None), analysis_df['Maturite_Annees'])
                 
-                # Identification de l'opportunité
-                analysis_df['Opportunité'] = np.where(
-                    analysis_df['Écart_Prix'] > 0.5, 'Surévaluée (Vente)',
-                    np.where(analysis_df['Écart_Prix'] < -0.5, 'Sous-évaluée (Achat)', 'Juste Valeur')
+                # Prix théorique, écarts et classement pour tout l'univers en une fois
+                results_df, cheap_df, rich_df = screen_opportunities(
+                    analysis_df, reference_ytm, threshold_bp=threshold_bp, top_n=int(top_n), rank_by=rank_by
                 )
                 
                 st.success("Analyse des opportunités terminée!")
@@ -79,32 +85,36 @@ if st.button("Rechercher les Opportunités"):
                 st.subheader("Résultats de l'Analyse")
                 
                 # Mise en forme pour l'affichage
-                display_df = analysis_df.copy()
-                display_df.rename(columns={
+                display_columns = {
                     'Prix_Actuel': 'Prix de Marché (€)',
                     'Prix_Théorique': 'Prix Théorique (€)',
                     'Écart_Prix': 'Écart (€)',
-                    'YTM_Reference (%)': 'YTM Réf. (%)'
-                }, inplace=True)
+                    'Écart_Normalisé_pb': 'Écart / DV01 (pb)',
+                    'Spread_pb': 'Spread de Rendement (pb)'
+                }
+                display_df = results_df.rename(columns=display_columns)
                 
                 st.dataframe(
-                    display_df[['ISIN', 'Prix de Marché (€)', 'Prix Théorique (€)', 'Écart (€)', 'Opportunité']],
+                    display_df[['ISIN'] + list(display_columns.values()) + ['Opportunité']],
                     hide_index=True
                 )
                 
                 # Affichage des opportunités
-                opportunities = display_df[display_df['Opportunité'] != 'Juste Valeur']
+                opportunities = pd.concat([cheap_df, rich_df]).rename(columns=display_columns)
                 
                 if not opportunities.empty:
                     st.markdown("### Opportunités Identifiées")
                     for index, row in opportunities.iterrows():
-                        if row['Opportunité'] == 'Sous-évaluée (Achat)':
-                            st.success(f"**Achat :** L'obligation {row['ISIN']} est sous-évaluée. Prix de Marché: {row['Prix de Marché (€)']:.2f} €, Prix Théorique: {row['Prix Théorique (€)']:.2f} € (Écart: {row['Écart (€)']:.2f} €)")
+                        if row['Opportunité'] == CHEAP_LABEL:
+                            st.success(f"**Achat :** L'obligation {row['ISIN']} est sous-évaluée. Prix de Marché: {row['Prix de Marché (€)']:.2f} €, Prix Théorique: {row['Prix Théorique (€)']:.2f} € (Écart: {row['Écart / DV01 (pb)']:.1f} pb)")
                         else:
-                            st.error(f"**Vente :** L'obligation {row['ISIN']} est surévaluée. Prix de Marché: {row['Prix de Marché (€)']:.2f} €, Prix Théorique: {row['Prix Théorique (€)']:.2f} € (Écart: {row['Écart (€)']:.2f} €)")
+                            st.error(f"**Vente :** L'obligation {row['ISIN']} est surévaluée. Prix de Marché: {row['Prix de Marché (€)']:.2f} €, Prix Théorique: {row['Prix Théorique (€)']:.2f} € (Écart: {row['Écart / DV01 (pb)']:.1f} pb)")
                 else:
-                    st.info("Aucune opportunité d'arbitrage significative identifiée (Écart > 0.5 €).")
+                    st.info(f"Aucune opportunité d'arbitrage significative identifiée (Écart > {threshold_bp:.1f} pb).")
                 
         except Exception as e:
             st.error(f"Une erreur est survenue lors de la recherche d'opportunités : {e}")
             st.exception(e)
+
+# Mesures de performance de la réexécution (barre latérale)
+display_perf_panel()
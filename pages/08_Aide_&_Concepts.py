@@ -1,7 +1,7 @@
 # app/pages/08_Aide_&_Concepts.py
 
 import streamlit as st
-from utils.common import set_page_config, display_header
+from utils.common import set_page_config, display_header, display_perf_panel
 
 set_page_config()
 display_header("Aide et Concepts Clés", "📚")
@@ -72,3 +72,6 @@ st.markdown("""
 """)
 
 st.info("Pour toute question technique ou conceptuelle supplémentaire, veuillez contacter votre expert en finance quantitative.")
+
+# Mesures de performance de la réexécution (barre latérale)
+display_perf_panel()
@@ -0,0 +1,24 @@
+# app/tests/test_startup.py
+
+import glob
+import os
+import pytest
+from utils.startup import APP_ROOT, HEADLESS_BUDGETS, PAGE_BUDGET, measure_cold_start, page_imports
+
+# Mesures par cible (médiane) : limite l'effet d'une mesure bruitée
+REPEAT = 3
+
+PAGES = [os.path.join(APP_ROOT, 'app.py')] + sorted(glob.glob(os.path.join(APP_ROOT, 'pages', '*.py')))
+
+@pytest.mark.parametrize('module', sorted(HEADLESS_BUDGETS))
+def test_headless_module_cold_start(module):
+    budget, forbidden = HEADLESS_BUDGETS[module]
+    elapsed, modules = measure_cold_start(f"import {module}", repeat=REPEAT)
+    assert not modules.intersection(forbidden), f"{module} charge {sorted(modules.intersection(forbidden))}"
+    assert elapsed <= budget, f"{module} : {elapsed:.3f} s (budget {budget} s)"
+
+@pytest.mark.parametrize('path', PAGES, ids=lambda path: os.path.relpath(path, APP_ROOT))
+def test_page_cold_start(path):
+    pytest.importorskip('streamlit')
+    elapsed, _ = measure_cold_start(page_imports(path), repeat=REPEAT)
+    assert elapsed <= PAGE_BUDGET, f"{os.path.relpath(path, APP_ROOT)} : {elapsed:.3f} s (budget {PAGE_BUDGET} s)"
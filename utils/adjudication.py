@@ -1,7 +1,76 @@
 # app/utils/adjudication.py
 
+import numpy as np
 import pandas as pd
+from collections import namedtuple
+from utils.instrumentation import instrument
 
+# Résultat d'une adjudication : prix marginal, allocations (dans l'ordre
+# d'origine des soumissions), ratio de service au prix marginal et montant alloué.
+ClearingResult = namedtuple('ClearingResult', ['marginal_price', 'allocations', 'pro_rata_ratio', 'total_allocated'])
+
+# Surfaces de résultat d'un balayage de soumissions : une valeur par soumission candidate.
+SweepResult = namedtuple('SweepResult', ['marginal_price', 'allocation', 'fill_ratio', 'cost'])
+
+@instrument()
+def clear_auction(prices, amounts, total_amount):
+    """
+    Calcule le prix marginal et les allocations d'une adjudication à prix
+    multiple, directement sur des tableaux NumPy.
+
+    Un seul tri des prix, une somme cumulée et une recherche
+    dichotomique du niveau marginal suffisent. Si la demande totale est
+    inférieure au montant offert, toutes les soumissions sont servies
+    intégralement et le prix marginal est le plus bas prix soumis.
+
+    Args:
+        prices (array-like): Prix des soumissions.
+        amounts (array-like): Montants demandés (positifs).
+        total_amount (float): Montant total de l'obligation à allouer.
+
+    Returns:
+        ClearingResult: (marginal_price, allocations, pro_rata_ratio, total_allocated)
+    """
+    prices = np.asarray(prices, dtype=float)
+    amounts = np.asarray(amounts, dtype=float)
+    if prices.size == 0:
+        return ClearingResult(np.nan, np.zeros(0), 0.0, 0.0)
+
+    # 1. Trier les soumissions par prix décroissant. L'ordre à prix égal est
+    # indifférent : un même niveau de prix est servi au prorata.
+    order = np.argsort(-prices)
+    sorted_prices = prices[order]
+    allocations_sorted = amounts[order]
+
+    # 2. Calculer le montant cumulé
+    cumulative = np.cumsum(allocations_sorted)
+
+    # 3. Trouver le prix marginal : première soumission qui atteint le montant total
+    marginal_index = int(np.searchsorted(cumulative, total_amount, side='left'))
+    if marginal_index == len(cumulative):
+        # Adjudication sous-souscrite : toute la demande est servie
+        return ClearingResult(sorted_prices[-1], amounts.copy(), 1.0, float(cumulative[-1]))
+    marginal_price = sorted_prices[marginal_index]
+
+    # 4. Bornes du niveau de prix marginal dans le carnet trié
+    level_start = int(np.searchsorted(-sorted_prices, -marginal_price, side='left'))
+    level_end = int(np.searchsorted(-sorted_prices, -marginal_price, side='right'))
+    amount_allocated_above = cumulative[level_start - 1] if level_start > 0 else 0.0
+    total_marginal_amount = cumulative[level_end - 1] - amount_allocated_above
+
+    # 5. Allocation au prorata au prix marginal, rien en dessous
+    remaining_amount = total_amount - amount_allocated_above
+    allocation_ratio = remaining_amount / total_marginal_amount if total_marginal_amount > 0 else 0.0
+    allocations_sorted[level_start:level_end] *= allocation_ratio
+    allocations_sorted[level_end:] = 0.0
+
+    # 6. Replacer les allocations dans l'ordre d'origine des soumissions
+    allocations = np.empty_like(allocations_sorted)
+    allocations[order] = allocations_sorted
+
+    return ClearingResult(marginal_price, allocations, float(allocation_ratio), float(total_amount))
+
+@instrument()
 def calculate_marginal_price(bids_df, total_amount):
     """
     Calcule le prix marginal et les allocations dans une adjudication à prix multiple.
@@ -13,45 +82,94 @@ def calculate_marginal_price(bids_df, total_amount):
     Returns:
         tuple: (marginal_price, allocated_bids_df)
     """
-    # 1. Trier les soumissions par prix décroissant
-    bids_df = bids_df.sort_values(by='Price', ascending=False).reset_index(drop=True)
-    
-    # 2. Calculer le montant cumulé
-    bids_df['Cumulative_Amount'] = bids_df['Amount'].cumsum()
-    
-    # 3. Trouver le prix marginal
-    # Le prix marginal est le prix de la soumission qui fait dépasser le montant total.
-    marginal_row = bids_df[bids_df['Cumulative_Amount'] >= total_amount].iloc[0]
-    marginal_price = marginal_row['Price']
-    
-    # 4. Allouer les soumissions au-dessus du prix marginal
-    allocated_bids = bids_df[bids_df['Price'] > marginal_price].copy()
-    allocated_bids['Allocation'] = allocated_bids['Amount']
-    
-    # 5. Calculer l'allocation pour le prix marginal
-    amount_allocated_above = allocated_bids['Allocation'].sum()
-    remaining_amount = total_amount - amount_allocated_above
-    
-    marginal_bids = bids_df[bids_df['Price'] == marginal_price].copy()
-    total_marginal_amount = marginal_bids['Amount'].sum()
-    
-    if total_marginal_amount > 0:
-        allocation_ratio = remaining_amount / total_marginal_amount
-        marginal_bids['Allocation'] = marginal_bids['Amount'] * allocation_ratio
-    else:
-        # Cas où le prix marginal est le plus bas et il n'y a pas de soumission à ce prix
-        marginal_bids['Allocation'] = 0
-        
-    # 6. Combiner les allocations
-    final_allocations = pd.concat([allocated_bids, marginal_bids])
-    
-    # 7. Les soumissions en dessous du prix marginal n'ont pas d'allocation
-    unallocated_bids = bids_df[bids_df['Price'] < marginal_price].copy()
-    unallocated_bids['Allocation'] = 0
-    
-    final_allocations = pd.concat([final_allocations, unallocated_bids]).sort_values(by='Price', ascending=False)
+    result = clear_auction(bids_df['Price'].to_numpy(), bids_df['Amount'].to_numpy(), total_amount)
+
+    final_allocations = bids_df.copy()
+    final_allocations['Allocation'] = result.allocations
+    final_allocations = final_allocations.sort_values(by='Price', ascending=False, kind='stable').reset_index(drop=True)
+    final_allocations['Cumulative_Amount'] = final_allocations['Amount'].cumsum()
     
-    return marginal_price, final_allocations
+    return result.marginal_price, final_allocations
+
+def _market_levels(prices, amounts):
+    """
+    Agrège un carnet par niveau de prix décroissant.
+
+    Returns:
+        tuple: (niveaux de prix décroissants, montant cumulé à chaque niveau)
+    """
+    levels, inverse = np.unique(-np.asarray(prices, dtype=float), return_inverse=True)
+    level_amounts = np.bincount(inverse.ravel(), weights=np.asarray(amounts, dtype=float), minlength=len(levels))
+    return -levels, np.cumsum(level_amounts)
+
+def _demand_at_or_above(levels, cumulative, price, strict=False):
+    """
+    Demande du carnet agrégé aux prix supérieurs (ou égaux) à `price`, vectorisé sur `price`.
+    """
+    count = np.searchsorted(-levels, -price, side='left' if strict else 'right')
+    return np.where(count > 0, cumulative[np.maximum(count - 1, 0)], 0.0)
+
+@instrument()
+def sweep_user_bids(market_prices, market_amounts, total_amount, user_prices, user_amounts):
+    """
+    Évalue un ensemble de soumissions candidates face au même carnet de marché,
+    en une seule passe vectorisée (une adjudication distincte par candidate).
+
+    Le carnet de marché est agrégé et trié une seule fois ; pour chaque
+    candidate, le prix marginal est obtenu par recherche dichotomique sur la
+    demande cumulée du marché, décalée du montant de la candidate.
+
+    Args:
+        market_prices, market_amounts (array-like): Soumissions du marché.
+        total_amount (float): Montant total de l'obligation à allouer.
+        user_prices, user_amounts (array-like): Prix et montants des soumissions
+            candidates, diffusés entre eux (par exemple une grille issue de np.meshgrid).
+
+    Returns:
+        SweepResult: (marginal_price, allocation, fill_ratio, cost), tableaux de
+            la forme des candidates. Le coût est le montant alloué multiplié
+            par le prix soumis (prix multiple), en unités de montant.
+    """
+    user_prices, user_amounts = np.broadcast_arrays(np.asarray(user_prices, dtype=float), np.asarray(user_amounts, dtype=float))
+    levels, cumulative = _market_levels(market_prices, market_amounts)
+    if len(levels) == 0:
+        levels, cumulative = np.array([np.inf]), np.array([0.0])
+
+    # (i) Le marché seul atteint le montant à un niveau strictement supérieur au prix de la candidate
+    market_index = int(np.searchsorted(cumulative, total_amount, side='left'))
+    market_marginal = levels[market_index] if market_index < len(levels) else -np.inf
+    above_user = market_marginal > user_prices
+
+    # (ii) Le montant est atteint au prix de la candidate
+    demand_at_user = _demand_at_or_above(levels, cumulative, user_prices) + user_amounts
+    at_user = ~above_user & (demand_at_user >= total_amount)
+
+    # (iii) Le montant est atteint à un niveau de marché inférieur, la candidate étant servie
+    below_index = np.searchsorted(cumulative, total_amount - user_amounts, side='left')
+    below_found = below_index < len(levels)
+    below_marginal = levels[np.minimum(below_index, len(levels) - 1)]
+
+    # (iv) Sinon l'adjudication est sous-souscrite : le plus bas prix soumis est marginal
+    lowest_price = np.minimum(np.where(np.isfinite(levels[-1]), levels[-1], np.inf), user_prices)
+    marginal_price = np.where(above_user, market_marginal,
+                              np.where(at_user, user_prices,
+                                       np.where(below_found, below_marginal, lowest_price)))
+    undersubscribed = ~above_user & ~at_user & ~below_found
+
+    # Allocation de la candidate : intégrale au-dessus du prix marginal, au prorata au prix marginal
+    demand_above = _demand_at_or_above(levels, cumulative, marginal_price, strict=True)
+    level_amount = _demand_at_or_above(levels, cumulative, marginal_price) - demand_above + user_amounts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(level_amount > 0, (total_amount - demand_above) / level_amount, 0.0)
+    allocation = np.where(user_prices > marginal_price, user_amounts,
+                          np.where(user_prices == marginal_price, user_amounts * ratio, 0.0))
+    allocation = np.where(undersubscribed, user_amounts, allocation)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fill_ratio = np.where(user_amounts > 0, allocation / user_amounts, 0.0)
+    cost = allocation * user_prices / 100
+
+    return SweepResult(marginal_price, allocation, fill_ratio, cost)
 
 # Exemple d'utilisation (pour test)
 if __name__ == '__main__':
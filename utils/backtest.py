@@ -0,0 +1,206 @@
+# app/utils/backtest.py
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from utils.adjudication import clear_auction, sweep_user_bids
+from utils.montecarlo import BidBookModel, simulate_bid_books
+
+# Colonnes attendues des historiques d'adjudication
+AUCTION_COLUMNS = ['Auction_ID', 'Date', 'ISIN', 'Total_Amount']
+BID_COLUMNS = ['Auction_ID', 'Price', 'Amount']
+
+def prepare_auctions(auctions_df, bids_df):
+    """
+    Trie les adjudications par date, liquide chaque carnet historique et
+    calcule le prix d'ancrage des stratégies.
+
+    Le prix d'ancrage d'une adjudication est le prix marginal de la
+    précédente adjudication du même ISIN (NaN pour la première).
+
+    Args:
+        auctions_df (pd.DataFrame): En-têtes ('Auction_ID', 'Date', 'ISIN',
+            'Total_Amount', et optionnellement 'Post_Auction_Price', le prix
+            constaté sur le marché secondaire après l'adjudication).
+        bids_df (pd.DataFrame): Soumissions ('Auction_ID', 'Price', 'Amount').
+
+    Returns:
+        tuple: (auctions_df enrichi de 'Marginal_Price' et 'Anchor_Price',
+                dictionnaire Auction_ID -> (prix, montants))
+    """
+    auctions_df = auctions_df.sort_values(['Date', 'Auction_ID'], kind='stable').reset_index(drop=True)
+    books = {
+        auction_id: (group['Price'].to_numpy(dtype=float), group['Amount'].to_numpy(dtype=float))
+        for auction_id, group in bids_df.groupby('Auction_ID', sort=False)
+    }
+    empty_book = (np.zeros(0), np.zeros(0))
+
+    auctions_df['Marginal_Price'] = [
+        clear_auction(*books.get(auction_id, empty_book), total_amount).marginal_price
+        for auction_id, total_amount in zip(auctions_df['Auction_ID'], auctions_df['Total_Amount'])
+    ]
+    auctions_df['Anchor_Price'] = auctions_df.groupby('ISIN', sort=False)['Marginal_Price'].shift(1)
+    return auctions_df, books
+
+def _backtest_chunk(auction_rows, books, price_offsets, amount_fractions):
+    """
+    Rejoue un bloc d'adjudications pour toutes les stratégies à la fois.
+
+    Returns:
+        tuple: tableaux (adjudications du bloc x stratégies) : prix soumis,
+            montant soumis, prix marginal, allocation.
+    """
+    n_strategies = price_offsets.size
+    shape = (len(auction_rows), n_strategies)
+    bid_price, bid_amount, marginal_price, allocation = (np.full(shape, np.nan) for _ in range(4))
+
+    for i, (auction_id, total_amount, anchor_price) in enumerate(auction_rows):
+        if not np.isfinite(anchor_price):
+            continue
+        prices, amounts = books.get(auction_id, (np.zeros(0), np.zeros(0)))
+        user_prices = np.round(anchor_price + price_offsets, 10)
+        user_amounts = amount_fractions * total_amount
+        sweep = sweep_user_bids(prices, amounts, total_amount, user_prices, user_amounts)
+        bid_price[i] = user_prices
+        bid_amount[i] = user_amounts
+        marginal_price[i] = sweep.marginal_price
+        allocation[i] = sweep.allocation
+
+    return bid_price, bid_amount, marginal_price, allocation
+
+def run_backtest(auctions_df, bids_df, price_offsets, amount_fractions, workers=1):
+    """
+    Rejoue les adjudications historiques pour une grille de stratégies de soumission.
+
+    Une stratégie soumet, à chaque adjudication, au prix d'ancrage (prix
+    marginal de la précédente adjudication du même ISIN) augmenté de
+    `price_offset`, pour un montant égal à `amount_fraction` du montant offert.
+    Notre soumission est ajoutée au carnet historique et l'adjudication est
+    liquidée à nouveau : toutes les stratégies sont évaluées en un seul passage
+    vectorisé par adjudication, et les adjudications sont réparties entre les processus.
+
+    Args:
+        auctions_df, bids_df (pd.DataFrame): Historique (voir prepare_auctions).
+        price_offsets (array-like): Écarts de prix au prix d'ancrage (en points de %).
+        amount_fractions (array-like): Montants soumis en fraction du montant offert.
+            Diffusés avec price_offsets : une stratégie par élément.
+        workers (int, optional): Nombre de processus (None : nombre de cœurs).
+
+    Returns:
+        pd.DataFrame: Une ligne par (adjudication, stratégie) jouée, avec le prix et
+            le montant soumis, le prix marginal, l'allocation, le ratio de
+            service et la performance. La performance est l'écart entre le prix
+            de référence (prix post-adjudication s'il est fourni, sinon prix
+            marginal) et le prix payé, multiplié par le montant alloué.
+    """
+    price_offsets, amount_fractions = (a.ravel() for a in np.broadcast_arrays(
+        np.asarray(price_offsets, dtype=float), np.asarray(amount_fractions, dtype=float)
+    ))
+    auctions_df, books = prepare_auctions(auctions_df, bids_df)
+    auction_rows = list(zip(auctions_df['Auction_ID'], auctions_df['Total_Amount'].astype(float), auctions_df['Anchor_Price']))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    n_chunks = max(1, min(workers, len(auction_rows)))
+    bounds = np.linspace(0, len(auction_rows), n_chunks + 1).astype(int)
+    chunks = [auction_rows[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    chunk_books = [{row[0]: books[row[0]] for row in chunk if row[0] in books} for chunk in chunks]
+
+    if n_chunks == 1:
+        results = [_backtest_chunk(chunks[0], chunk_books[0], price_offsets, amount_fractions)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_chunks) as executor:
+            results = list(executor.map(
+                _backtest_chunk, chunks, chunk_books,
+                [price_offsets] * n_chunks, [amount_fractions] * n_chunks
+            ))
+    bid_price, bid_amount, marginal_price, allocation = (np.concatenate(arrays) for arrays in zip(*results))
+
+    n_auctions, n_strategies = bid_price.shape
+    if 'Post_Auction_Price' in auctions_df:
+        reference_price = auctions_df['Post_Auction_Price'].to_numpy(dtype=float)[:, None]
+    else:
+        reference_price = marginal_price
+
+    results_df = pd.DataFrame({
+        'Auction_ID': np.repeat(auctions_df['Auction_ID'].to_numpy(), n_strategies),
+        'Date': np.repeat(auctions_df['Date'].to_numpy(), n_strategies),
+        'ISIN': np.repeat(auctions_df['ISIN'].to_numpy(), n_strategies),
+        'Strategy': np.tile(np.arange(n_strategies), n_auctions),
+        'Price_Offset': np.tile(price_offsets, n_auctions),
+        'Amount_Fraction': np.tile(amount_fractions, n_auctions),
+        'Prix_Soumis': bid_price.ravel(),
+        'Montant_Soumis': bid_amount.ravel(),
+        'Prix_Marginal': marginal_price.ravel(),
+        'Montant_Alloué': allocation.ravel(),
+        'Performance': ((reference_price - bid_price) / 100 * allocation).ravel()
+    })
+    results_df = results_df.dropna(subset=['Prix_Soumis']).reset_index(drop=True)
+    results_df['Allocation_Ratio'] = np.where(
+        results_df['Montant_Soumis'] > 0, results_df['Montant_Alloué'] / results_df['Montant_Soumis'], 0.0
+    )
+    return results_df
+
+def summarize_backtest(results_df):
+    """
+    Agrège les résultats par stratégie : performance totale, ratio
+    d'allocation moyen, taux de succès et montant total alloué.
+    """
+    grouped = results_df.groupby(['Strategy', 'Price_Offset', 'Amount_Fraction'])
+    return pd.DataFrame({
+        'Performance_Totale': grouped['Performance'].sum(),
+        'Ratio_Allocation_Moyen': grouped['Allocation_Ratio'].mean(),
+        'Taux_Succes': grouped['Montant_Alloué'].apply(lambda x: (x > 0).mean()),
+        'Montant_Total_Alloue': grouped['Montant_Alloué'].sum(),
+        'Nombre_Adjudications': grouped.size()
+    }).reset_index()
+
+def generate_sample_history(n_auctions=520, isins=('FR0010000001', 'FR0010000002', 'FR0010000003'),
+                            start='2016-01-04', freq='W-MON', total_amount=500.0, seed=0):
+    """
+    Génère un historique d'adjudications de démonstration (en-têtes et carnets
+    complets), avec un niveau de prix qui évolue comme une marche aléatoire.
+
+    Returns:
+        tuple: (auctions_df, bids_df)
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start=start, periods=n_auctions, freq=freq)
+    isin = np.asarray(isins)[np.arange(n_auctions) % len(isins)]
+    price_level = 99.5 + np.cumsum(rng.normal(0.0, 0.05, n_auctions))
+
+    model = BidBookModel(mean_bids=40.0, price_center=0.0, price_vol=0.08, shift_vol=0.0,
+                         log_amount_mean=np.log(20.0), log_amount_vol=0.6, tick_size=0.01)
+    prices, amounts = simulate_bid_books(model, n_auctions, rng)
+    prices = np.round(prices + np.round(price_level, 2)[:, None], 10)
+
+    auction_ids = np.arange(n_auctions)
+    auctions_df = pd.DataFrame({
+        'Auction_ID': auction_ids,
+        'Date': dates,
+        'ISIN': isin,
+        'Total_Amount': total_amount,
+        'Post_Auction_Price': price_level + rng.normal(0.0, 0.05, n_auctions)
+    })
+    filled = amounts > 0
+    bids_df = pd.DataFrame({
+        'Auction_ID': np.repeat(auction_ids, filled.sum(axis=1)),
+        'Price': prices[filled],
+        'Amount': amounts[filled]
+    })
+    return auctions_df, bids_df
+
+# Exemple d'utilisation (pour test)
+if __name__ == '__main__':
+    import time
+
+    auctions_df, bids_df = generate_sample_history()
+    offsets, fractions = np.meshgrid(np.linspace(-0.3, 0.3, 25), np.linspace(0.01, 0.2, 20))
+
+    start_time = time.perf_counter()
+    results_df = run_backtest(auctions_df, bids_df, offsets, fractions, workers=None)
+    print(f"{len(auctions_df)} adjudications x {offsets.size} stratégies : {time.perf_counter() - start_time:.2f} s")
+
+    summary_df = summarize_backtest(results_df)
+    print(summary_df.sort_values('Performance_Totale', ascending=False).head())
@@ -0,0 +1,457 @@
+# app/utils/batch.py
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from utils.adjudication import clear_auction
+from utils.data import read_data_file
+from utils.ingestion import (
+    validate_frame, iter_csv_chunks, IngestionReport, ColumnSchema,
+    BOND_SCHEMA, AUCTION_SCHEMA, AUCTION_BID_SCHEMA, INGESTION_CHUNK_SIZE, MAX_REJECTED_ROWS
+)
+from utils.lazy import lazy_import
+from utils.portfolio import analyze_portfolio
+from utils.screener import screen_opportunities, reference_yields_from_curve
+
+# Traitements par lots sans interface (tâches planifiées, ligne de commande) :
+# les fichiers sont lus, validés, calculés et écrits bloc par bloc
+pa = lazy_import('pyarrow')
+pq = lazy_import('pyarrow.parquet')
+
+# Formats de fichiers acceptés en entrée et en sortie (selon l'extension)
+BATCH_FORMATS = ('.csv', '.parquet')
+
+# Obligations à analyser : la quantité détenue est facultative (1 par défaut)
+PRICING_SCHEMA = {**BOND_SCHEMA, 'Quantité': ColumnSchema('float64', min_value=0.0, required=False)}
+
+# Obligations à comparer à un rendement de référence (en %), lu dans le
+# fichier si aucune courbe n'est fournie
+SCREENING_SCHEMA = {**BOND_SCHEMA, 'YTM_Reference': ColumnSchema('float64', required=False)}
+
+def _file_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in BATCH_FORMATS:
+        raise ValueError(f"Format de fichier non supporté : {path} (CSV ou Parquet attendu).")
+    return extension
+
+def iter_file_chunks(path, schema, chunksize=INGESTION_CHUNK_SIZE):
+    """
+    Lit un fichier CSV ou Parquet par blocs de `chunksize` lignes et valide
+    chaque bloc selon le schéma (colonnes numériques en float64).
+
+    Yields:
+        tuple: (lignes valides, lignes rejetées) de chaque bloc. Les rejets sont
+            numérotés par ligne du fichier (CSV) ou par rang (Parquet).
+    """
+    if _file_format(path) == '.csv':
+        yield from iter_csv_chunks(path, schema, chunksize, downcast=False)
+        return
+    parquet_file = pq.ParquetFile(path)
+    columns = [name for name in schema if name in parquet_file.schema_arrow.names]
+    first_line = 0
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        chunk = batch.to_pandas()
+        chunk.index += first_line
+        yield validate_frame(chunk, schema, downcast=False, first_line=first_line)
+        first_line += len(chunk)
+
+class _ChunkWriter:
+    """
+    Écrit des blocs de résultats, au fil de l'eau, dans un fichier CSV ou Parquet.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.n_rows = 0
+        self._format = _file_format(path)
+        self._parquet_writer = None
+        self._started = False
+
+    def write(self, df):
+        if self._format == '.csv':
+            df.to_csv(self.path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        else:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        self._started = True
+        self.n_rows += len(df)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class _RejectionLog:
+    """
+    Cumule les lignes lues et rejetées des blocs (les premières rejetées sont conservées).
+    """
+
+    def __init__(self, max_rejected=MAX_REJECTED_ROWS):
+        self.max_rejected = max_rejected
+        self.n_rows = 0
+        self.n_rejected = 0
+        self._rejected = []
+        self._kept = 0
+
+    def add(self, valid_df, rejected_df, source=None):
+        self.n_rows += len(valid_df) + len(rejected_df)
+        self.n_rejected += len(rejected_df)
+        if self._kept < self.max_rejected and len(rejected_df):
+            kept = rejected_df.iloc[:self.max_rejected - self._kept]
+            if source is not None:
+                kept = kept.assign(Fichier=source)
+            self._rejected.append(kept)
+            self._kept += len(kept)
+
+    def report(self):
+        rejected_df = pd.concat(self._rejected, ignore_index=True) if self._rejected else pd.DataFrame(columns=['Ligne', 'Motif'])
+        return IngestionReport(self.n_rows, self.n_rows - self.n_rejected, self.n_rejected, rejected_df)
+
+def _map_chunks(function, tasks, workers=1):
+    """
+    Applique function(*task) à chaque tâche et retourne les résultats dans
+    l'ordre des tâches, sur `workers` processus (None : nombre de cœurs).
+
+    Au plus 2 x workers tâches sont en cours à la fois : les blocs sont lus au
+    rythme des calculs et la mémoire utilisée reste bornée.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for task in tasks:
+            yield function(*task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(function, *task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# --- Analyse d'obligations et de portefeuilles ---
+
+def _price_chunk(bonds_df, coupon_in_percent):
+    if 'Quantité' not in bonds_df:
+        bonds_df = bonds_df.assign(Quantité=1.0)
+    results_df, summary = analyze_portfolio(bonds_df, coupon_in_percent)
+    # Les poids ne sont connus qu'une fois tous les blocs traités (voir le bilan)
+    results_df = results_df.drop(columns='Weight')
+    market_value = results_df['Market_Value'].to_numpy()
+    totals = np.array([
+        market_value.sum(),
+        market_value @ results_df['Modified_Duration'].to_numpy(),
+        market_value @ results_df['YTM'].to_numpy(),
+        market_value @ results_df['Convexity'].to_numpy(),
+        results_df['DV01'].sum(),
+        summary['n_unconverged']
+    ])
+    return results_df, totals
+
+def price_file(input_path, output_path, chunksize=INGESTION_CHUNK_SIZE, workers=1, coupon_in_percent=True):
+    """
+    Calcule YTM, durations, convexité, DV01 et valeur de marché de toutes les
+    obligations d'un fichier, bloc par bloc.
+
+    Args:
+        input_path (str): Fichier CSV ou Parquet (colonnes de PRICING_SCHEMA).
+        output_path (str): Fichier de résultats (.csv ou .parquet), une ligne par obligation valide.
+        chunksize (int): Nombre de lignes traitées à la fois.
+        workers (int, optional): Nombre de processus (None : nombre de cœurs).
+        coupon_in_percent (bool): Si vrai, 'Taux_Coupon' est exprimé en pourcentage.
+
+    Returns:
+        tuple: (summary, IngestionReport). summary contient les agrégats du
+            portefeuille (voir utils.portfolio.analyze_portfolio), calculés
+            sur l'ensemble du fichier.
+    """
+    log = _RejectionLog()
+
+    def tasks():
+        for valid_df, rejected_df in iter_file_chunks(input_path, PRICING_SCHEMA, chunksize):
+            log.add(valid_df, rejected_df)
+            yield valid_df, coupon_in_percent
+
+    totals = np.zeros(6)
+    with _ChunkWriter(output_path) as writer:
+        for results_df, chunk_totals in _map_chunks(_price_chunk, tasks(), workers):
+            writer.write(results_df)
+            totals += chunk_totals
+
+    total_market_value, duration_sum, ytm_sum, convexity_sum, dv01, n_unconverged = totals
+    weighted = (lambda value: float(value / total_market_value)) if total_market_value else (lambda value: 0.0)
+    summary = {
+        'total_market_value': float(total_market_value),
+        'modified_duration': weighted(duration_sum),
+        'ytm': weighted(ytm_sum),
+        'convexity': weighted(convexity_sum),
+        'dv01': float(dv01),
+        'n_bonds': writer.n_rows,
+        'n_unconverged': int(n_unconverged)
+    }
+    return summary, log.report()
+
+# --- Recherche d'opportunités ---
+
+def _screen_chunk(bonds_df, reference_ytm, threshold_bp, top_n, rank_by, coupon_in_percent):
+    return screen_opportunities(
+        bonds_df, reference_ytm, threshold_bp=threshold_bp, top_n=top_n, rank_by=rank_by,
+        coupon_in_percent=coupon_in_percent
+    )
+
+def _merge_top(frames, column, ascending, top_n):
+    """
+    Retient les top_n meilleures lignes parmi les meilleures de chaque bloc.
+    """
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame()
+    merged = pd.concat(frames, ignore_index=True)
+    return merged.sort_values(column, ascending=ascending, kind='stable').head(top_n).reset_index(drop=True)
+
+def screen_file(input_path, output_path, curve_path=None, method='cubic', threshold_bp=5.0, top_n=10,
+                rank_by='normalized_gap', chunksize=INGESTION_CHUNK_SIZE, workers=1, coupon_in_percent=True):
+    """
+    Compare chaque obligation d'un fichier à son prix théorique (voir
+    utils.screener.screen_opportunities), bloc par bloc.
+
+    Args:
+        input_path (str): Fichier CSV ou Parquet (colonnes de SCREENING_SCHEMA).
+        output_path (str): Fichier de résultats (.csv ou .parquet), une ligne par obligation valide.
+        curve_path (str, optional): Courbe de référence ('Maturity', 'Yield' en %).
+            Sans courbe, le rendement de référence est lu dans la colonne 'YTM_Reference' (en %).
+        method (str): Méthode d'interpolation de la courbe.
+        threshold_bp, top_n, rank_by, coupon_in_percent: Voir screen_opportunities.
+        chunksize (int): Nombre de lignes traitées à la fois.
+        workers (int, optional): Nombre de processus (None : nombre de cœurs).
+
+    Returns:
+        tuple: (cheap_df, rich_df, IngestionReport), les top_n obligations les
+            plus sous- et surévaluées de tout le fichier.
+    """
+    curve_df = read_data_file(curve_path) if curve_path is not None else None
+    log = _RejectionLog()
+
+    def tasks():
+        for valid_df, rejected_df in iter_file_chunks(input_path, SCREENING_SCHEMA, chunksize):
+            log.add(valid_df, rejected_df)
+            if curve_df is not None:
+                reference_ytm = reference_yields_from_curve(curve_df, valid_df['Maturite_Annees'].to_numpy(), method)
+            elif 'YTM_Reference' in valid_df:
+                reference_ytm = valid_df['YTM_Reference'].to_numpy() / 100
+            else:
+                raise ValueError("Fournissez une courbe de référence ou une colonne 'YTM_Reference'.")
+            yield valid_df, reference_ytm, threshold_bp, top_n, rank_by, coupon_in_percent
+
+    cheap_frames, rich_frames = [], []
+    with _ChunkWriter(output_path) as writer:
+        for results_df, cheap_df, rich_df in _map_chunks(_screen_chunk, tasks(), workers):
+            writer.write(results_df)
+            cheap_frames.append(cheap_df)
+            rich_frames.append(rich_df)
+
+    # Même classement que screen_opportunities, sur les meilleurs de chaque bloc
+    if rank_by == 'normalized_gap':
+        cheap_df = _merge_top(cheap_frames, 'Écart_Normalisé_pb', True, top_n)
+        rich_df = _merge_top(rich_frames, 'Écart_Normalisé_pb', False, top_n)
+    else:
+        cheap_df = _merge_top(cheap_frames, 'Spread_pb', False, top_n)
+        rich_df = _merge_top(rich_frames, 'Spread_pb', True, top_n)
+    return cheap_df, rich_df, log.report()
+
+# --- Liquidation d'adjudications ---
+
+def _clear_chunk(auction_rows, books):
+    """
+    Liquide un bloc d'adjudications.
+
+    Returns:
+        tuple: (une ligne par adjudication, une ligne par soumission avec son allocation)
+    """
+    results, allocations = [], []
+    for auction_id, total_amount in auction_rows:
+        prices, amounts = books.get(auction_id, (np.zeros(0), np.zeros(0)))
+        result = clear_auction(prices, amounts, total_amount)
+        demand = float(amounts.sum())
+        results.append((auction_id, demand, demand / total_amount if total_amount else np.nan,
+                        result.marginal_price, result.pro_rata_ratio, result.total_allocated))
+        allocations.append(pd.DataFrame({
+            'Auction_ID': auction_id, 'Price': prices, 'Amount': amounts, 'Allocation': result.allocations
+        }))
+    results_df = pd.DataFrame(results, columns=[
+        'Auction_ID', 'Demande', 'Couverture', 'Prix_Marginal', 'Ratio_Prorata', 'Montant_Alloué'
+    ])
+    allocations_df = pd.concat(allocations, ignore_index=True) if allocations else pd.DataFrame(
+        columns=['Auction_ID', 'Price', 'Amount', 'Allocation']
+    )
+    return results_df, allocations_df
+
+def clear_file(auctions_path, bids_path, output_path, allocations_path=None, chunksize=INGESTION_CHUNK_SIZE, workers=1):
+    """
+    Liquide toutes les adjudications d'un historique (voir utils.adjudication.clear_auction).
+
+    Les soumissions sont lues par blocs ; celles d'une même adjudication
+    doivent être contiguës dans le fichier (fichier trié ou groupé par
+    'Auction_ID'), une adjudication pouvant être à cheval sur deux blocs.
+
+    Args:
+        auctions_path (str): En-têtes d'adjudication (colonnes de AUCTION_SCHEMA).
+        bids_path (str): Soumissions (colonnes de AUCTION_BID_SCHEMA).
+        output_path (str): Résultats par adjudication (.csv ou .parquet) : demande,
+            taux de couverture, prix marginal, ratio au prorata et montant alloué.
+        allocations_path (str, optional): Allocations par soumission (.csv ou .parquet).
+        chunksize (int): Nombre de soumissions lues à la fois.
+        workers (int, optional): Nombre de processus (None : nombre de cœurs).
+
+    Returns:
+        tuple: (summary, IngestionReport des deux fichiers)
+
+    Raises:
+        ValueError: si les soumissions d'une adjudication ne sont pas contiguës.
+    """
+    log = _RejectionLog()
+    auction_frames = []
+    for valid_df, rejected_df in iter_file_chunks(auctions_path, AUCTION_SCHEMA, chunksize):
+        log.add(valid_df, rejected_df, source=os.path.basename(auctions_path))
+        auction_frames.append(valid_df)
+    # Fichier vide, réduit à l'en-tête ou entièrement rejeté : aucune adjudication
+    auctions_df = pd.concat(auction_frames, ignore_index=True) if auction_frames else pd.DataFrame(columns=list(AUCTION_SCHEMA))
+    headers = auctions_df.set_index('Auction_ID')[['Date', 'ISIN', 'Total_Amount']]
+    if not headers.index.is_unique:
+        raise ValueError("Identifiants d'adjudication en double.")
+    total_amounts = headers['Total_Amount'].to_dict()
+    done = set()
+
+    def tasks():
+        carry = None
+        for valid_df, rejected_df in iter_file_chunks(bids_path, AUCTION_BID_SCHEMA, chunksize):
+            known = valid_df['Auction_ID'].isin(total_amounts)
+            orphans = valid_df.loc[~known].assign(Motif='Auction_ID : adjudication inconnue')
+            orphans.insert(0, 'Ligne', valid_df.index[~known] + (2 if bids_path.lower().endswith('.csv') else 0))
+            log.add(valid_df.loc[known], pd.concat([rejected_df, orphans]), source=os.path.basename(bids_path))
+            bids_df = valid_df.loc[known] if carry is None else pd.concat([carry, valid_df.loc[known]])
+            if bids_df.empty:
+                continue
+            # La dernière adjudication du bloc peut se poursuivre dans le bloc suivant
+            ids = bids_df['Auction_ID'].to_numpy()
+            others = np.flatnonzero(ids != ids[-1])
+            split = others[-1] + 1 if others.size else 0
+            carry, bids_df = bids_df.iloc[split:], bids_df.iloc[:split]
+            if bids_df.empty:
+                continue
+            yield _book_task(bids_df, total_amounts, done)
+        if carry is not None and len(carry):
+            yield _book_task(carry, total_amounts, done)
+        # Adjudications sans soumission
+        remaining = [auction_id for auction_id in total_amounts if auction_id not in done]
+        if remaining:
+            done.update(remaining)
+            yield [(auction_id, total_amounts[auction_id]) for auction_id in remaining], {}
+
+    output_columns = [
+        'Auction_ID', 'Date', 'ISIN', 'Total_Amount',
+        'Demande', 'Couverture', 'Prix_Marginal', 'Ratio_Prorata', 'Montant_Alloué'
+    ]
+    n_auctions = total_allocated = 0
+    with _ChunkWriter(output_path) as writer:
+        allocation_writer = _ChunkWriter(allocations_path) if allocations_path is not None else None
+        try:
+            for results_df, allocations_df in _map_chunks(_clear_chunk, tasks(), workers):
+                results_df = results_df.join(headers, on='Auction_ID')
+                writer.write(results_df[output_columns])
+                if allocation_writer is not None:
+                    allocation_writer.write(allocations_df)
+                n_auctions += len(results_df)
+                total_allocated += results_df['Montant_Alloué'].sum()
+        finally:
+            if allocation_writer is not None:
+                allocation_writer.close()
+        if not writer.n_rows:
+            # Aucune adjudication : fichier de résultats vide, avec ses colonnes
+            writer.write(pd.DataFrame(columns=output_columns))
+
+    summary = {'n_auctions': n_auctions, 'total_allocated': float(total_allocated)}
+    return summary, log.report()
+
+def _book_task(bids_df, total_amounts, done):
+    """
+    Regroupe les soumissions d'un bloc par adjudication (dans l'ordre du fichier).
+    """
+    books = {
+        auction_id: (group['Price'].to_numpy(dtype=float), group['Amount'].to_numpy(dtype=float))
+        for auction_id, group in bids_df.groupby('Auction_ID', sort=False)
+    }
+    repeated = done.intersection(books)
+    if repeated:
+        raise ValueError(f"Les soumissions de l'adjudication {min(repeated)} ne sont pas contiguës : triez le fichier par Auction_ID.")
+    done.update(books)
+    return [(auction_id, total_amounts[auction_id]) for auction_id in books], books
+
+# Ligne de commande : python -m utils.batch {price,screen,clear} ...
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Traitements par lots des fichiers d'obligations et d'adjudications.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def _add_common_options(subparser):
+        subparser.add_argument('-o', '--output', required=True, help="Fichier de résultats (.csv ou .parquet).")
+        subparser.add_argument('--chunksize', type=int, default=INGESTION_CHUNK_SIZE, help="Lignes traitées à la fois.")
+        subparser.add_argument('--workers', type=int, default=1, help="Nombre de processus (0 : nombre de cœurs).")
+
+    price_parser = subparsers.add_parser('price', help="YTM, durations, convexité et DV01 de chaque obligation.")
+    price_parser.add_argument('input', help="Obligations (.csv ou .parquet).")
+    price_parser.add_argument('--coupon-decimal', action='store_true', help="Taux de coupon en décimal plutôt qu'en %%.")
+    _add_common_options(price_parser)
+
+    screen_parser = subparsers.add_parser('screen', help="Obligations sous- et surévaluées par rapport à une référence.")
+    screen_parser.add_argument('input', help="Obligations (.csv ou .parquet).")
+    screen_parser.add_argument('--curve', help="Courbe de référence (Maturity, Yield en %%) ; sinon colonne YTM_Reference.")
+    screen_parser.add_argument('--method', default='cubic', help="Méthode d'interpolation de la courbe.")
+    screen_parser.add_argument('--threshold-bp', type=float, default=5.0, help="Seuil d'écart normalisé (pb).")
+    screen_parser.add_argument('--top-n', type=int, default=10, help="Opportunités retenues de chaque côté.")
+    screen_parser.add_argument('--rank-by', choices=['normalized_gap', 'spread'], default='normalized_gap')
+    screen_parser.add_argument('--coupon-decimal', action='store_true', help="Taux de coupon en décimal plutôt qu'en %%.")
+    _add_common_options(screen_parser)
+
+    clear_parser = subparsers.add_parser('clear', help="Prix marginal et allocations de chaque adjudication.")
+    clear_parser.add_argument('auctions', help="En-têtes d'adjudication (.csv ou .parquet).")
+    clear_parser.add_argument('bids', help="Soumissions, groupées par Auction_ID (.csv ou .parquet).")
+    clear_parser.add_argument('--allocations', help="Fichier des allocations par soumission.")
+    _add_common_options(clear_parser)
+
+    args = parser.parse_args()
+    workers = args.workers or None
+
+    if args.command == 'price':
+        summary, report = price_file(args.input, args.output, args.chunksize, workers, not args.coupon_decimal)
+        print(f"{summary['n_bonds']:,} obligations analysées, valeur de marché {summary['total_market_value']:,.2f}, "
+              f"duration modifiée {summary['modified_duration']:.3f}, YTM {summary['ytm'] * 100:.3f} %, "
+              f"DV01 {summary['dv01']:,.2f}")
+        if summary['n_unconverged']:
+            print(f"YTM non convergé pour {summary['n_unconverged']} obligation(s).")
+    elif args.command == 'screen':
+        cheap_df, rich_df, report = screen_file(
+            args.input, args.output, args.curve, args.method, args.threshold_bp, args.top_n, args.rank_by,
+            args.chunksize, workers, not args.coupon_decimal
+        )
+        for label, frame in (("Sous-évaluées", cheap_df), ("Surévaluées", rich_df)):
+            print(f"\n{label} :")
+            print(frame[['ISIN', 'Écart_Normalisé_pb', 'Spread_pb']].to_string(index=False) if len(frame) else "aucune")
+    else:
+        summary, report = clear_file(args.auctions, args.bids, args.output, args.allocations, args.chunksize, workers)
+        print(f"{summary['n_auctions']:,} adjudications liquidées, montant alloué {summary['total_allocated']:,.2f}")
+
+    print(f"\n{report.n_rows:,} lignes lues, {report.n_rejected:,} rejetées ; résultats dans {args.output}")
+    if report.n_rejected:
+        print(report.rejected.head(10).to_string(index=False))
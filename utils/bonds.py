@@ -1,88 +1,629 @@
 # app/utils/bonds.py
 
 import numpy as np
-from datetime import date, timedelta
+from collections import namedtuple
+from functools import lru_cache
+from utils.instrumentation import instrument, register_cache
 
-def calculate_ytm(price, face_value, coupon_rate, frequency, years_to_maturity):
+# Résultat du solveur de YTM : rendement, indicateur de convergence et
+# nombre d'itérations, pour chaque obligation.
+YTMResult = namedtuple('YTMResult', ['ytm', 'converged', 'iterations'])
+
+# Métriques de risque calculées en une seule passe : prix, durations (années),
+# convexité (années²) et DV01 (variation de prix pour 1 point de base).
+RiskMetrics = namedtuple('RiskMetrics', ['price', 'macaulay_duration', 'modified_duration', 'convexity', 'dv01'])
+
+# En dessous de ce taux par période, les formules fermées perdent en précision
+# (division par 1 - v) : les sommes sont alors calculées par la boucle exacte.
+_CLOSED_FORM_MIN_RATE = 1e-4
+
+# Nombre maximal d'échéanciers conservés en cache (éviction LRU)
+SCHEDULE_CACHE_SIZE = 4096
+
+# Nombre maximal de flux traités à la fois lors du pricing sur une courbe
+_CURVE_PRICING_CHUNK = 2_000_000
+
+def _broadcast_bond_arrays(*arrays):
     """
-    Calcule le rendement à l'échéance (YTM) d'une obligation.
-    Utilise une méthode itérative (Newton-Raphson) ou une approximation.
-    Pour la simplicité, nous utiliserons une approximation ici.
+    Convertit les paramètres en tableaux float de même forme (aplatis).
+
+    Returns:
+        tuple: (forme d'origine, liste des tableaux 1D)
+    """
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in arrays))
+    shape = arrays[0].shape
+    return shape, [a.ravel() for a in arrays]
+
+def _coupon_schedule(face_value, coupon_rate, frequency, years_to_maturity):
+    """
+    Décrit l'échéancier des coupons, en périodes, à rebours depuis l'échéance.
+
+    Les N coupons tombent aux dates a, a + 1, ..., a + N - 1 = périodes totales.
+    La première période a (dans ]0, 1]) est fractionnaire lorsque la maturité
+    ne correspond pas à un nombre entier de périodes.
+
+    Returns:
+        tuple: (périodes totales, nombre de coupons N, première période a, coupon par période)
+    """
+    periods = years_to_maturity * frequency
+    # La tolérance évite qu'une erreur d'arrondi (5 * 12 = 60.000000001) ajoute un coupon
+    n_coupons = np.maximum(np.ceil(periods - 1e-9), 0).astype(np.int64)
+    first_period = periods - np.maximum(n_coupons - 1, 0)
+    coupon_payment = (coupon_rate / frequency) * face_value
+    return periods, n_coupons, first_period, coupon_payment
+
+def _geometric_sums_loop(discount, n_coupons, order):
+    """
+    Calcule S_k = somme de j^k * v^j pour j = 0..N-1 par une boucle sur j,
+    vectorisée sur les obligations.
+
+    Les obligations sont triées par nombre de coupons décroissant : à l'étape j,
+    seules les k premières (celles qui versent encore un coupon) sont mises à
+    jour, ce qui évite de parcourir les obligations échues.
+    """
+    order_idx = np.argsort(-n_coupons, kind='stable')
+    discount_sorted = discount[order_idx]
+    n_sorted = n_coupons[order_idx]
+    n_max = int(n_sorted[0]) if n_sorted.size else 0
+    active = np.searchsorted(-n_sorted, -np.arange(1, n_max + 1), side='right')
+
+    factor = np.ones_like(discount_sorted)
+    sums_sorted = [np.zeros_like(discount_sorted) for _ in range(order + 1)]
+    for j, k in enumerate(active):
+        for power, total in enumerate(sums_sorted):
+            total[:k] += j**power * factor[:k]
+        factor[:k] *= discount_sorted[:k]
+
+    sums = []
+    for total in sums_sorted:
+        unsorted = np.empty_like(total)
+        unsorted[order_idx] = total
+        sums.append(unsorted)
+    return sums
+
+def _geometric_sums(rate, n_coupons, order=1, method='closed'):
+    """
+    Calcule S_k = somme de j^k * v^j pour j = 0..N-1, v = 1 / (1 + r), k = 0..order.
+
+    Avec method='closed', les sommes sont obtenues en O(1) par obligation
+    (séries géométriques) :
+        S_0 = (1 - v^N) / (1 - v)
+        S_1 = (S_0 - 1 - (N - 1) v^N) / (1 - v)
+        S_2 = (2 S_1 - S_0 + 1 - (N - 1)^2 v^N) / (1 - v)
+    Les taux proches de zéro, pour lesquels ces formules perdent en précision,
+    sont calculés par la boucle exacte. Avec method='iterative', la boucle est
+    utilisée pour toutes les obligations.
+    """
+    if method not in ('closed', 'iterative'):
+        raise ValueError(f"Méthode inconnue : {method}")
+
+    discount = 1 / (1 + rate)
+    if method == 'iterative':
+        return _geometric_sums_loop(discount, n_coupons, order)
+
+    n = n_coupons.astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_discount = -np.log1p(rate)
+        discount_n = np.exp(n * log_discount)
+        one_minus_discount = rate * discount
+        sums = [-np.expm1(n * log_discount) / one_minus_discount]
+        if order >= 1:
+            sums.append((sums[0] - 1 - (n - 1) * discount_n) / one_minus_discount)
+        if order >= 2:
+            sums.append((2 * sums[1] - sums[0] + 1 - (n - 1)**2 * discount_n) / one_minus_discount)
+
+    small = np.abs(rate) < _CLOSED_FORM_MIN_RATE
+    if small.any():
+        exact = _geometric_sums_loop(discount[small], n_coupons[small], order)
+        for total, exact_total in zip(sums, exact):
+            total[small] = exact_total
+    return sums
+
+def _price_moments(ytm, face_value, coupon_rate, frequency, years_to_maturity, order=1, method='closed'):
+    """
+    Calcule M_k = somme de t^k * CF_t * v^t (t en périodes) pour k = 0..order.
+
+    M_0 est le prix, M_1 / M_0 la duration de Macaulay en périodes ; M_2 sert
+    au calcul de la convexité.
+    """
+    periods, n_coupons, first_period, coupon_payment = _coupon_schedule(
+        face_value, coupon_rate, frequency, years_to_maturity
+    )
+    rate = ytm / frequency
+    sums = _geometric_sums(rate, n_coupons, order, method)
+
+    # Les coupons tombent en t = a + j : v^t = v^a * v^j
+    coupon_pv = coupon_payment * (1 + rate)**(-first_period)
+    principal_pv = face_value * (1 + rate)**(-periods)
+
+    moments = [coupon_pv * sums[0] + principal_pv]
+    if order >= 1:
+        moments.append(coupon_pv * (first_period * sums[0] + sums[1]) + periods * principal_pv)
+    if order >= 2:
+        moments.append(
+            coupon_pv * (first_period**2 * sums[0] + 2 * first_period * sums[1] + sums[2])
+            + periods**2 * principal_pv
+        )
+    return moments
+
+def _approximate_ytm(price, face_value, coupon_rate, years_to_maturity):
+    """
+    Approximation classique du YTM, utilisée comme point de départ du solveur.
     """
-    # Approximation du YTM
-    annual_coupon = face_value * coupon_rate
-    
-    # Rendement approximatif (Yield Approximation)
     # YTM ≈ (C + (FV - P) / n) / ((FV + P) / 2)
     # Où:
     # C = Paiement de coupon annuel
     # FV = Valeur nominale
     # P = Prix actuel
     # n = Nombre d'années jusqu'à l'échéance
-    
-    ytm_approx = (annual_coupon + (face_value - price) / years_to_maturity) / ((face_value + price) / 2)
-    
-    # Pour un calcul plus précis, une boucle ou une fonction scipy.optimize.newton serait nécessaire.
-    # Nous allons retourner l'approximation pour l'instant.
-    return ytm_approx
+    annual_coupon = face_value * coupon_rate
+    return (annual_coupon + (face_value - price) / years_to_maturity) / ((face_value + price) / 2)
 
-def calculate_price(ytm, face_value, coupon_rate, frequency, years_to_maturity):
+@instrument()
+def solve_ytm_batch(price, face_value, coupon_rate, frequency, years_to_maturity,
+                    initial_ytm=None, tol=1e-10, max_iter=100, bounds=(-0.5, 5.0)):
     """
-    Calcule le prix d'une obligation.
+    Calcule le rendement à l'échéance (YTM) exact d'un ensemble d'obligations.
+
+    Résout P(ytm) = prix par la méthode de Newton-Raphson, appliquée à toutes
+    les obligations à la fois. Chaque obligation conserve un encadrement
+    [borne basse, borne haute] de la solution : lorsqu'un pas de Newton sort
+    de cet intervalle, il est remplacé par une bissection.
+
+    Args:
+        price (array-like): Prix de marché.
+        face_value, coupon_rate, frequency, years_to_maturity (array-like):
+            Caractéristiques des obligations (voir calculate_price_batch).
+        initial_ytm (array-like, optional): Rendements de départ (par exemple
+            ceux de la veille). Par défaut, l'approximation classique du YTM.
+        tol (float): Tolérance sur la variation du rendement entre deux itérations.
+        max_iter (int): Nombre maximal d'itérations.
+        bounds (tuple): Encadrement initial (min, max) du rendement annuel.
+
+    Returns:
+        YTMResult: (ytm, converged, iterations), tableaux de la forme des entrées.
+            Le YTM vaut NaN (non convergé) si le prix n'est pas fini ou si la
+            maturité est nulle ou négative. iterations compte les pas qui ont modifié le rendement au-delà de
+            la tolérance : depuis les rendements de la veille, une variation
+            de quelques points de base converge en 1 ou 2 itérations.
     """
-    if ytm == 0:
-        return face_value + (coupon_rate * face_value * years_to_maturity)
-        
-    periods = years_to_maturity * frequency
-    coupon_payment = (coupon_rate / frequency) * face_value
-    rate_per_period = ytm / frequency
-    
+    shape, (price, face_value, coupon_rate, frequency, years_to_maturity) = _broadcast_bond_arrays(
+        price, face_value, coupon_rate, frequency, years_to_maturity
+    )
+
+    # Sans prix ou sans échéance à venir, il n'y a pas de rendement à calculer :
+    # ces obligations restent hors de la boucle et leur YTM vaut NaN
+    with np.errstate(invalid='ignore'):
+        solvable = np.isfinite(price) & (years_to_maturity > 0)
+
+    if initial_ytm is None:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ytm = _approximate_ytm(price, face_value, coupon_rate, years_to_maturity)
+    else:
+        ytm = np.broadcast_to(np.asarray(initial_ytm, dtype=float), shape).ravel().copy()
+    ytm = np.where(np.isfinite(ytm), ytm, 0.05)
+
+    lower = np.full_like(ytm, bounds[0])
+    upper = np.full_like(ytm, bounds[1])
+    ytm = np.clip(ytm, lower, upper)
+    converged = np.zeros(ytm.shape, dtype=bool)
+    iterations = np.zeros(ytm.shape, dtype=np.int64)
+
+    active = np.flatnonzero(solvable)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        y = ytm[active]
+        f = frequency[active]
+        model_price, time_weighted = _price_moments(
+            y, face_value[active], coupon_rate[active], f, years_to_maturity[active]
+        )
+
+        # Écart de prix et dérivée dP/dy = -(1 / f) * (somme t * CF_t * v^t) / (1 + y / f)
+        error = model_price - price[active]
+        derivative = -time_weighted / (f + y)
+
+        # Le prix décroît avec le rendement : on resserre l'encadrement
+        too_low = error > 0
+        lower[active] = np.where(too_low, y, lower[active])
+        upper[active] = np.where(too_low, upper[active], y)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y_new = y - error / derivative
+        outside = ~np.isfinite(y_new) | (y_new < lower[active]) | (y_new > upper[active])
+        y_new = np.where(outside, (lower[active] + upper[active]) / 2, y_new)
+
+        # Un pas de Newton accepté et négligeable signale une racine ; une
+        # bissection qui se referme sur une borne signale un prix hors encadrement.
+        done = np.abs(y_new - y) <= tol
+        ytm[active] = y_new
+        # Le pas qui ne fait que constater la convergence n'est pas compté : un
+        # rendement de départ déjà à la tolérance converge en 0 itération
+        iterations[active] += ~(done & ~outside)
+        converged[active[done & ~outside]] = True
+        active = active[~done]
+
+    ytm[~solvable] = np.nan
+    return YTMResult(ytm.reshape(shape), converged.reshape(shape), iterations.reshape(shape))
+
+def calculate_ytm(price, face_value, coupon_rate, frequency, years_to_maturity):
+    """
+    Calcule le rendement à l'échéance (YTM) d'une obligation.
+    Utilise la méthode de Newton-Raphson (voir solve_ytm_batch).
+    """
+    result = solve_ytm_batch(price, face_value, coupon_rate, frequency, years_to_maturity)
+    return float(result.ytm)
+
+@instrument()
+def calculate_price_batch(ytm, face_value, coupon_rate, frequency, years_to_maturity, method='closed'):
+    """
+    Calcule le prix d'un ensemble d'obligations en un seul appel vectorisé.
+
+    Args:
+        ytm (array-like): Rendements à l'échéance (en décimal).
+        face_value (array-like): Valeurs nominales.
+        coupon_rate (array-like): Taux de coupon annuels (en décimal).
+        frequency (array-like): Nombre de paiements de coupon par an.
+        years_to_maturity (array-like): Années jusqu'à l'échéance.
+        method (str): 'closed' (formules d'annuité, coût O(1) par obligation)
+            ou 'iterative' (somme explicite des flux actualisés).
+
+    Les arguments sont diffusés (broadcasting NumPy) : un scalaire peut être
+    combiné avec des tableaux. L'échéancier est construit à rebours depuis
+    l'échéance, la première période pouvant être fractionnaire.
+
+    Returns:
+        np.ndarray: Prix de chaque obligation.
+    """
+    shape, (ytm, face_value, coupon_rate, frequency, years_to_maturity) = _broadcast_bond_arrays(
+        ytm, face_value, coupon_rate, frequency, years_to_maturity
+    )
+
     # Prix = Somme des valeurs actuelles des coupons + Valeur actuelle du principal
-    price = 0
-    for t in range(1, int(periods) + 1):
-        price += coupon_payment / (1 + rate_per_period)**t
-        
-    price += face_value / (1 + rate_per_period)**periods
-    
-    return price
+    (price,) = _price_moments(ytm, face_value, coupon_rate, frequency, years_to_maturity, order=0, method=method)
 
-def calculate_duration(price, face_value, coupon_rate, frequency, years_to_maturity, ytm=None):
+    return price.reshape(shape)
+
+def calculate_price(ytm, face_value, coupon_rate, frequency, years_to_maturity, method='closed'):
     """
-    Calcule la Duration de Macaulay.
+    Calcule le prix d'une obligation.
+    """
+    return float(calculate_price_batch(ytm, face_value, coupon_rate, frequency, years_to_maturity, method))
+
+@instrument()
+def calculate_duration_batch(price, face_value, coupon_rate, frequency, years_to_maturity, ytm=None, method='closed'):
+    """
+    Calcule la Duration de Macaulay et la Duration Modifiée d'un ensemble d'obligations.
+
+    Args:
+        price (array-like or None): Prix de marché. S'il est fourni (et positif),
+            il sert de dénominateur à la duration de Macaulay.
+        ytm (array-like, optional): Rendements. Résolus à partir du prix s'ils sont absents.
+        method (str): 'closed' ou 'iterative' (voir calculate_price_batch).
+
+    Returns:
+        tuple: (duration de Macaulay en années, duration modifiée), tableaux.
     """
     if ytm is None:
-        ytm = calculate_ytm(price, face_value, coupon_rate, frequency, years_to_maturity)
-        
-    periods = years_to_maturity * frequency
-    coupon_payment = (coupon_rate / frequency) * face_value
-    rate_per_period = ytm / frequency
-    
-    weighted_sum = 0
-    pv_sum = 0
-    
-    for t in range(1, int(periods) + 1):
-        cash_flow = coupon_payment
-        if t == periods:
-            cash_flow += face_value
-            
-        pv = cash_flow / (1 + rate_per_period)**t
-        weighted_sum += t * pv
-        pv_sum += pv
-        
+        ytm = solve_ytm_batch(price, face_value, coupon_rate, frequency, years_to_maturity).ytm
+    if price is None:
+        price = np.nan
+
+    shape, (price, face_value, coupon_rate, frequency, years_to_maturity, ytm) = _broadcast_bond_arrays(
+        price, face_value, coupon_rate, frequency, years_to_maturity, ytm
+    )
+    pv_sum, weighted_sum = _price_moments(
+        ytm, face_value, coupon_rate, frequency, years_to_maturity, order=1, method=method
+    )
+
     # Si le prix est fourni, on utilise le prix comme pv_sum pour plus de cohérence
     # Sinon, on utilise la somme des PV calculées
-    if price is not None and price > 0:
-        macaulay_duration = weighted_sum / price
-    else:
-        macaulay_duration = weighted_sum / pv_sum
-        
+    denominator = np.where(price > 0, price, pv_sum)
+
     # La duration de Macaulay est en périodes. On la convertit en années.
-    macaulay_duration_years = macaulay_duration / frequency
-    
+    macaulay_duration_years = weighted_sum / denominator / frequency
+
     # Duration Modifiée = Duration de Macaulay / (1 + YTM/frequency)
-    modified_duration = macaulay_duration_years / (1 + rate_per_period)
-    
-    return macaulay_duration_years, modified_duration
+    modified_duration = macaulay_duration_years / (1 + ytm / frequency)
+
+    return macaulay_duration_years.reshape(shape), modified_duration.reshape(shape)
+
+def calculate_duration(price, face_value, coupon_rate, frequency, years_to_maturity, ytm=None, method='closed'):
+    """
+    Calcule la Duration de Macaulay.
+    """
+    macaulay, modified = calculate_duration_batch(
+        price, face_value, coupon_rate, frequency, years_to_maturity, ytm, method
+    )
+    return float(macaulay), float(modified)
+
+@instrument()
+def calculate_risk_batch(ytm, face_value, coupon_rate, frequency, years_to_maturity, method='closed'):
+    """
+    Calcule en une seule passe le prix, les durations, la convexité et le DV01
+    d'un ensemble d'obligations.
+
+    Les facteurs d'actualisation ne sont calculés qu'une fois : toutes les
+    métriques sont dérivées des mêmes sommes de flux actualisés.
+
+    Args:
+        ytm (array-like): Rendements à l'échéance (en décimal).
+        face_value, coupon_rate, frequency, years_to_maturity (array-like):
+            Caractéristiques des obligations (voir calculate_price_batch).
+        method (str): 'closed' ou 'iterative' (voir calculate_price_batch).
+
+    Returns:
+        RiskMetrics: (price, macaulay_duration, modified_duration, convexity, dv01), tableaux.
+    """
+    shape, (ytm, face_value, coupon_rate, frequency, years_to_maturity) = _broadcast_bond_arrays(
+        ytm, face_value, coupon_rate, frequency, years_to_maturity
+    )
+    price, weighted_sum, weighted_sq_sum = _price_moments(
+        ytm, face_value, coupon_rate, frequency, years_to_maturity, order=2, method=method
+    )
+    gross_rate = 1 + ytm / frequency
+
+    macaulay_duration = weighted_sum / price / frequency
+    modified_duration = macaulay_duration / gross_rate
+
+    # Convexité = somme t (t + 1) CF_t v^(t + 2) / (P f^2)
+    convexity = (weighted_sq_sum + weighted_sum) / (price * gross_rate**2 * frequency**2)
+
+    # DV01 : baisse de prix pour une hausse du rendement de 1 point de base
+    dv01 = modified_duration * price * 1e-4
+
+    return RiskMetrics(*(metric.reshape(shape) for metric in (
+        price, macaulay_duration, modified_duration, convexity, dv01
+    )))
+
+def calculate_risk(ytm, face_value, coupon_rate, frequency, years_to_maturity, method='closed'):
+    """
+    Calcule le prix, les durations, la convexité et le DV01 d'une obligation.
+    """
+    metrics = calculate_risk_batch(ytm, face_value, coupon_rate, frequency, years_to_maturity, method)
+    return RiskMetrics(*(float(metric) for metric in metrics))
+
+class CashflowSchedule:
+    """
+    Échéancier compact des flux d'une obligation.
+
+    Les dates (en années) et les montants sont stockés dans deux tableaux
+    NumPy en lecture seule, partagés par tous les utilisateurs du cache
+    (voir get_cashflow_schedule).
+    """
+    __slots__ = ('times', 'amounts', 'frequency')
+
+    def __init__(self, times, amounts, frequency):
+        self.times = times
+        self.amounts = amounts
+        self.frequency = frequency
+
+    def __len__(self):
+        return len(self.times)
+
+    def __repr__(self):
+        maturity = self.times[-1] if len(self.times) else 0.0
+        return f"CashflowSchedule(flux={len(self)}, maturité={maturity:.2f} ans, fréquence={self.frequency:g})"
+
+    def discount_factors(self, ytm):
+        """
+        Facteurs d'actualisation des flux pour un ou plusieurs rendements.
+
+        Returns:
+            np.ndarray: Tableau (forme de ytm) x (nombre de flux).
+        """
+        ytm = np.asarray(ytm, dtype=float)
+        return (1 + ytm[..., None] / self.frequency) ** (-self.times * self.frequency)
+
+    def price(self, ytm):
+        """
+        Prix de l'obligation pour un ou plusieurs rendements.
+        """
+        return self.discount_factors(ytm) @ self.amounts
+
+    def risk(self, ytm):
+        """
+        Prix, durations, convexité et DV01 pour un ou plusieurs rendements.
+        """
+        ytm = np.asarray(ytm, dtype=float)
+        pv = self.discount_factors(ytm) * self.amounts
+        periods = self.times * self.frequency
+        price = pv.sum(axis=-1)
+        weighted_sum = pv @ periods
+        weighted_sq_sum = pv @ periods**2
+        gross_rate = 1 + ytm / self.frequency
+
+        macaulay_duration = weighted_sum / price / self.frequency
+        modified_duration = macaulay_duration / gross_rate
+        convexity = (weighted_sq_sum + weighted_sum) / (price * gross_rate**2 * self.frequency**2)
+        return RiskMetrics(price, macaulay_duration, modified_duration, convexity, modified_duration * price * 1e-4)
+
+    def ytm(self, price, initial_ytm=0.05, tol=1e-10, max_iter=50):
+        """
+        Rendement(s) à l'échéance correspondant à un ou plusieurs prix (Newton-Raphson).
+        """
+        price = np.asarray(price, dtype=float)
+        ytm = np.broadcast_to(np.asarray(initial_ytm, dtype=float), price.shape).copy()
+        periods = self.times * self.frequency
+        for _ in range(max_iter):
+            pv = self.discount_factors(ytm) * self.amounts
+            derivative = -(pv @ periods) / (self.frequency + ytm)
+            step = (pv.sum(axis=-1) - price) / derivative
+            ytm = ytm - step
+            if np.all(np.abs(step) <= tol):
+                break
+        return ytm
+
+    def price_with_curve(self, zero_rate, spread=0.0):
+        """
+        Prix de l'obligation actualisée sur une courbe de taux zéro.
+
+        Args:
+            zero_rate (callable): Fonction maturité (années) -> taux zéro (décimal),
+                composé à la fréquence de l'obligation.
+            spread (float): Écart ajouté au taux zéro (décimal).
+        """
+        rates = np.asarray(zero_rate(self.times), dtype=float) + spread
+        return float(self.amounts @ (1 + rates / self.frequency) ** (-self.times * self.frequency))
+
+@lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def _build_cashflow_schedule(face_value, coupon_rate, frequency, years_to_maturity):
+    periods, n_coupons, first_period, coupon_payment = _coupon_schedule(
+        face_value, coupon_rate, frequency, years_to_maturity
+    )
+    n_coupons = int(n_coupons)
+    if n_coupons == 0:
+        times = np.array([periods / frequency])
+        amounts = np.array([face_value])
+    else:
+        times = (first_period + np.arange(n_coupons)) / frequency
+        amounts = np.full(n_coupons, coupon_payment)
+        amounts[-1] += face_value
+    times.flags.writeable = False
+    amounts.flags.writeable = False
+    return CashflowSchedule(times, amounts, float(frequency))
+
+def get_cashflow_schedule(face_value, coupon_rate, frequency, years_to_maturity):
+    """
+    Retourne l'échéancier des flux d'une obligation, mis en cache par ses caractéristiques.
+
+    Les obligations de mêmes caractéristiques partagent le même objet
+    CashflowSchedule. Le cache est borné à SCHEDULE_CACHE_SIZE entrées.
+    """
+    return _build_cashflow_schedule(
+        float(face_value), float(coupon_rate), float(frequency), float(years_to_maturity)
+    )
+
+def schedule_cache_info():
+    """
+    Statistiques du cache d'échéanciers (hits, misses, maxsize, currsize).
+    """
+    return _build_cashflow_schedule.cache_info()
+
+register_cache('Échéanciers', schedule_cache_info)
+
+def clear_schedule_cache():
+    """
+    Vide le cache d'échéanciers.
+    """
+    _build_cashflow_schedule.cache_clear()
+
+def _iter_flattened_schedules(face_value, coupon_rate, frequency, years_to_maturity):
+    """
+    Parcourt les flux de toutes les obligations, par blocs, sous forme de
+    tableaux plats (indice de l'obligation, date, montant, fréquence).
+
+    Les obligations de mêmes caractéristiques partagent un échéancier du cache.
+    """
+    terms = np.column_stack([face_value, coupon_rate, frequency, years_to_maturity])
+    unique_terms, inverse = np.unique(terms, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    schedules = [get_cashflow_schedule(*row) for row in unique_terms]
+
+    lengths = np.array([len(schedule) for schedule in schedules], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    all_times = np.concatenate([schedule.times for schedule in schedules])
+    all_amounts = np.concatenate([schedule.amounts for schedule in schedules])
+
+    bond_lengths = lengths[inverse]
+    bond_ends = np.cumsum(bond_lengths)
+    chunk_start = 0
+    while chunk_start < len(inverse):
+        offset = bond_ends[chunk_start - 1] if chunk_start else 0
+        chunk_end = max(int(np.searchsorted(bond_ends, offset + _CURVE_PRICING_CHUNK, side='right')), chunk_start + 1)
+        counts = bond_lengths[chunk_start:chunk_end]
+        owner = np.repeat(np.arange(chunk_start, chunk_end), counts)
+        # Position de chaque flux dans son échéancier
+        position = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        flat_index = starts[inverse[owner]] + position
+        yield owner, all_times[flat_index], all_amounts[flat_index], frequency[owner]
+        chunk_start = chunk_end
+
+def _valid_schedule_terms(face_value, coupon_rate, frequency, years_to_maturity):
+    """
+    Obligations dont l'échéancier peut être construit : caractéristiques
+    finies, fréquence strictement positive et maturité positive ou nulle.
+    """
+    with np.errstate(invalid='ignore'):
+        return (np.isfinite(face_value) & np.isfinite(coupon_rate) & np.isfinite(frequency)
+                & np.isfinite(years_to_maturity) & (frequency > 0) & (years_to_maturity >= 0))
+
+@instrument()
+def price_with_curve_batch(zero_rate, face_value, coupon_rate, frequency, years_to_maturity, spread=0.0):
+    """
+    Calcule le prix d'un ensemble d'obligations actualisées sur une courbe de taux zéro.
+
+    Args:
+        zero_rate (callable): Fonction vectorisée maturité (années) -> taux zéro
+            (décimal), composé à la fréquence de chaque obligation.
+        face_value, coupon_rate, frequency, years_to_maturity (array-like):
+            Caractéristiques des obligations (voir calculate_price_batch).
+        spread (array-like): Écart ajouté au taux zéro, par obligation (décimal).
+
+    Returns:
+        np.ndarray: Prix de chaque obligation (NaN si ses caractéristiques sont
+            invalides : valeur manquante, fréquence nulle, maturité négative).
+    """
+    shape, (face_value, coupon_rate, frequency, years_to_maturity, spread) = _broadcast_bond_arrays(
+        face_value, coupon_rate, frequency, years_to_maturity, spread
+    )
+    # Les obligations aux caractéristiques invalides (NaN, fréquence nulle...) valent NaN
+    valid = np.flatnonzero(_valid_schedule_terms(face_value, coupon_rate, frequency, years_to_maturity))
+    price = np.full(face_value.shape, np.nan)
+    if valid.size == 0:
+        return price.reshape(shape)
+    spread = spread[valid]
+    valid_price = np.zeros(valid.size)
+    for owner, times, amounts, freq in _iter_flattened_schedules(
+        face_value[valid], coupon_rate[valid], frequency[valid], years_to_maturity[valid]
+    ):
+        rates = np.asarray(zero_rate(times), dtype=float) + spread[owner]
+        pv = amounts * (1 + rates / freq) ** (-times * freq)
+        valid_price += np.bincount(owner, weights=pv, minlength=valid.size)
+    price[valid] = valid_price
+    return price.reshape(shape)
+
+@instrument()
+def calculate_z_spread_batch(price, zero_rate, face_value, coupon_rate, frequency, years_to_maturity,
+                             tol=1e-10, max_iter=50):
+    """
+    Calcule l'écart (Z-spread) à ajouter à la courbe de taux zéro pour
+    retrouver le prix de marché de chaque obligation (Newton-Raphson).
+
+    Returns:
+        np.ndarray: Écarts (décimal), NaN si le solveur n'a pas convergé ou si
+            les données de l'obligation sont invalides.
+    """
+    shape, (price, face_value, coupon_rate, frequency, years_to_maturity) = _broadcast_bond_arrays(
+        price, face_value, coupon_rate, frequency, years_to_maturity
+    )
+    result = np.full(price.shape, np.nan)
+    valid = np.flatnonzero(_valid_schedule_terms(face_value, coupon_rate, frequency, years_to_maturity) & np.isfinite(price))
+    if valid.size == 0:
+        return result.reshape(shape)
+    price = price[valid]
+    flattened = list(_iter_flattened_schedules(
+        face_value[valid], coupon_rate[valid], frequency[valid], years_to_maturity[valid]
+    ))
+    base_rates = [np.asarray(zero_rate(times), dtype=float) for _, times, _, _ in flattened]
+
+    spread = np.zeros(price.shape)
+    converged = np.zeros(price.shape, dtype=bool)
+    for _ in range(max_iter):
+        model_price = np.zeros(price.shape)
+        derivative = np.zeros(price.shape)
+        for (owner, times, amounts, freq), rates in zip(flattened, base_rates):
+            gross_rate = 1 + (rates + spread[owner]) / freq
+            pv = amounts * gross_rate ** (-times * freq)
+            model_price += np.bincount(owner, weights=pv, minlength=price.size)
+            derivative -= np.bincount(owner, weights=pv * times / gross_rate, minlength=price.size)
+        step = (model_price - price) / derivative
+        spread = np.where(converged, spread, spread - step)
+        converged |= np.abs(step) <= tol
+        if converged.all():
+            break
+    result[valid] = np.where(converged, spread, np.nan)
+    return result.reshape(shape)
 
 # Exemple d'utilisation (pour test)
 if __name__ == '__main__':
@@ -93,13 +634,17 @@ if __name__ == '__main__':
     coupon_rate = 0.05
     frequency = 1
     years_to_maturity = 5
-    
+
     ytm = calculate_ytm(price, face_value, coupon_rate, frequency, years_to_maturity)
-    print(f"YTM approximatif: {ytm:.4f}")
-    
+    print(f"YTM: {ytm:.4f}")
+
     price_calc = calculate_price(ytm, face_value, coupon_rate, frequency, years_to_maturity)
     print(f"Prix calculé avec YTM: {price_calc:.2f}")
-    
+
     macaulay, modified = calculate_duration(price, face_value, coupon_rate, frequency, years_to_maturity, ytm)
     print(f"Duration de Macaulay (années): {macaulay:.4f}")
     print(f"Duration Modifiée (années): {modified:.4f}")
+
+    risk = calculate_risk(ytm, face_value, coupon_rate, frequency, years_to_maturity)
+    print(f"Convexité: {risk.convexity:.4f}")
+    print(f"DV01: {risk.dv01:.4f}")
@@ -1,11 +1,22 @@
 # app/utils/common.py
 
-import streamlit as st
 import pandas as pd
+from utils import instrumentation
+from utils.instrumentation import instrument
+from utils.lazy import lazy_import
+# Fonctions de données sans interface, réexportées pour les pages (voir utils.data)
+from utils.data import DATA_CACHE_DIR, BOND_EXAMPLE_DATA, read_data_file, clear_data_cache, get_bond_example_df
+
+# Fonctions d'affichage de l'application : streamlit n'est chargé qu'à leur premier appel
+st = lazy_import('streamlit')
+
+# Nombre de bilans de performance conservés par session (export JSON)
+PERF_HISTORY_SIZE = 50
 
 def set_page_config():
     """
-    Configure les paramètres de base de la page Streamlit.
+    Configure les paramètres de base de la page Streamlit et commence les
+    mesures de performance de la réexécution (voir display_perf_panel).
     """
     st.set_page_config(
         page_title="Gestion Obligataire",
@@ -13,27 +24,78 @@ def set_page_config():
         layout="wide",
         initial_sidebar_state="expanded"
     )
+    if 'perf_enabled' in st.session_state:
+        if st.session_state['perf_enabled']:
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+    instrumentation.begin_run()
 
+@instrument(category='E/S')
 def load_data(file_path):
     """
-    Charge un fichier de données (CSV ou Excel) en DataFrame.
+    Charge un fichier de données (CSV ou Excel) en DataFrame (voir utils.data.read_data_file)
+    et affiche les erreurs dans la page.
     """
     try:
-        if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        elif file_path.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(file_path)
-        else:
-            st.error("Format de fichier non supporté. Veuillez utiliser CSV ou Excel.")
-            return None
-        return df
+        return read_data_file(file_path)
     except FileNotFoundError:
         st.error(f"Fichier non trouvé: {file_path}")
         return None
+    except ValueError as e:
+        st.error(str(e))
+        return None
     except Exception as e:
         st.error(f"Erreur lors du chargement du fichier: {e}")
         return None
 
+def display_perf_panel():
+    """
+    Affiche dans la barre latérale les mesures de la réexécution de la page :
+    temps par catégorie (E/S, calcul, et rendu pour le reste du script),
+    appels des fonctions instrumentées, taux de succès des caches et
+    compteurs. Les bilans des dernières réexécutions sont exportables en JSON.
+
+    À appeler en fin de page (après set_page_config et les calculs).
+    """
+    with st.sidebar.expander("⏱️ Performance"):
+        st.checkbox("Mesurer les performances", value=instrumentation.is_enabled(), key='perf_enabled',
+                    help="S'applique à partir de la réexécution suivante, pour toutes les sessions.")
+        if not instrumentation.is_enabled():
+            st.caption("Instrumentation désactivée.")
+            return
+
+        report = instrumentation.run_report()
+        history = st.session_state.setdefault('perf_reports', [])
+        history.append(report)
+        del history[:-PERF_HISTORY_SIZE]
+
+        st.metric("Durée de la réexécution", f"{report['elapsed'] * 1000:.0f} ms")
+        st.dataframe(pd.DataFrame({
+            'Catégorie': list(report['categories']),
+            'Temps (ms)': [seconds * 1000 for seconds in report['categories'].values()]
+        }).round(1), hide_index=True)
+        if report['calls']:
+            st.dataframe(pd.DataFrame([
+                {'Fonction': name, 'Appels': stats['calls'], 'Total (ms)': stats['total'] * 1000,
+                 'Max (ms)': stats['max'] * 1000}
+                for name, stats in report['calls'].items()
+            ]).round(2), hide_index=True)
+        st.dataframe(pd.DataFrame([
+            {'Cache': name, 'Succès': stats['hits'], 'Échecs': stats['misses'],
+             'Taux (%)': None if stats['hit_rate'] is None else stats['hit_rate'] * 100,
+             'Taille': f"{stats['size']}/{stats['maxsize']}"}
+            for name, stats in report['caches'].items()
+        ]).round(1), hide_index=True)
+        if report['counters']:
+            st.dataframe(pd.DataFrame({
+                'Compteur': list(report['counters']), 'Valeur': list(report['counters'].values())
+            }), hide_index=True)
+        st.download_button(
+            "Exporter (JSON)", instrumentation.reports_to_json(history),
+            file_name='performance.json', mime='application/json'
+        )
+
 def display_header(title, icon):
     """
     Affiche un en-tête stylisé pour la page.
@@ -55,18 +117,4 @@ def display_header(title, icon):
         <div class="header-style">{icon} {title}</div>
     """, unsafe_allow_html=True)
 
-# Exemple de données pour les obligations
-BOND_EXAMPLE_DATA = {
-    'ISIN': ['FR0010000001', 'US9128285H31', 'DE0001102381'],
-    'Nominal': [1000, 1000, 1000],
-    'Taux_Coupon': [0.03, 0.05, 0.015],
-    'Frequence_Coupon': [1, 2, 1], # 1: Annuel, 2: Semestriel
-    'Maturite_Annees': [5, 10, 3],
-    'Prix_Actuel': [1015.50, 980.00, 1005.25]
-}
 
-def get_bond_example_df():
-    """
-    Retourne un DataFrame d'exemple pour les obligations.
-    """
-    return pd.DataFrame(BOND_EXAMPLE_DATA)
@@ -0,0 +1,271 @@
+# app/utils/curve_panel.py
+
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from utils.yields import CURVE_METHODS, parametric_yields
+
+# Grille de maturités par défaut du panel (années)
+DEFAULT_TENORS = (0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.0, 10.0, 15.0, 20.0, 30.0)
+
+# Noms des trois premiers facteurs de l'ACP des variations de courbe
+FACTOR_NAMES = ('Niveau', 'Pente', 'Courbure')
+
+# Résultat de l'ACP : vecteurs propres (maturités x facteurs), variances,
+# part de variance expliquée et moyenne des variations quotidiennes
+CurvePCA = namedtuple('CurvePCA', ['loadings', 'variances', 'explained_variance_ratio', 'mean'])
+
+def interpolate_curves(maturities, yields, tenors, method='linear'):
+    """
+    Interpole plusieurs courbes sur une grille de maturités commune.
+
+    Les courbes partageant les mêmes maturités observées (hors NaN) sont
+    interpolées en un seul appel, l'interpolateur étant linéaire en les rendements.
+
+    Args:
+        maturities (array-like): Maturités observées (années).
+        yields (array-like): Rendements (courbes x maturités), NaN si non observés.
+        tenors (array-like): Grille de maturités cible.
+        method (str): Méthode d'interpolation ('linear', 'cubic' ou 'pchip').
+            Au-delà des maturités observées, le rendement est prolongé à plat.
+
+    Returns:
+        np.ndarray: Rendements interpolés (courbes x grille).
+    """
+    if method not in ('linear', 'cubic', 'pchip'):
+        raise ValueError(f"Méthode d'interpolation par lot non supportée : {method}")
+    maturities = np.asarray(maturities, dtype=float)
+    yields = np.atleast_2d(np.asarray(yields, dtype=float))
+    tenors = np.asarray(tenors, dtype=float)
+    order = np.argsort(maturities)
+    maturities, yields = maturities[order], yields[:, order]
+
+    result = np.full((len(yields), len(tenors)), np.nan)
+    observed = np.isfinite(yields)
+    patterns, pattern_index = np.unique(observed, axis=0, return_inverse=True)
+    for p, pattern in enumerate(patterns):
+        rows = np.flatnonzero(pattern_index.ravel() == p)
+        if pattern.sum() < 2:
+            continue
+        x = maturities[pattern]
+        interpolator = CURVE_METHODS[method](x, yields[np.ix_(rows, np.flatnonzero(pattern))].T)
+        result[rows] = interpolator(np.clip(tenors, x[0], x[-1])).T
+    return result
+
+class CurvePanel:
+    """
+    Historique de courbes de rendement datées sur une grille de maturités commune.
+
+    Les rendements sont stockés dans un tableau (dates x maturités) en float32
+    dont la capacité double lorsqu'il est plein : l'ajout d'un jour ne recopie
+    pas l'historique. Les moments (somme et produits croisés) des variations
+    quotidiennes sont mis à jour à chaque ajout, de sorte que l'ACP ne
+    reparcourt pas l'historique.
+    """
+
+    def __init__(self, tenors=DEFAULT_TENORS, method='linear', dtype=np.float32, capacity=256):
+        """
+        Args:
+            tenors (array-like): Grille de maturités (années).
+            method (str): Méthode d'interpolation des courbes ajoutées.
+            dtype: Type de stockage des rendements.
+            capacity (int): Nombre de dates réservées initialement.
+        """
+        self.tenors = np.asarray(tenors, dtype=float)
+        self.method = method
+        self._yields = np.empty((capacity, len(self.tenors)), dtype=dtype)
+        self._dates = np.empty(capacity, dtype='datetime64[ns]')
+        self._size = 0
+        self._change_count = 0
+        self._change_sum = np.zeros(len(self.tenors))
+        self._change_products = np.zeros((len(self.tenors), len(self.tenors)))
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        if not self._size:
+            return f"CurvePanel(dates=0, maturités={len(self.tenors)})"
+        return (f"CurvePanel(dates={self._size}, maturités={len(self.tenors)}, "
+                f"du {pd.Timestamp(self._dates[0]).date()} au {pd.Timestamp(self._dates[self._size - 1]).date()})")
+
+    @property
+    def dates(self):
+        return self._dates[:self._size]
+
+    @property
+    def yields(self):
+        """
+        Rendements (dates x maturités), vue en lecture seule sur le stockage.
+        """
+        view = self._yields[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def _reserve(self, n_new):
+        needed = self._size + n_new
+        if needed <= len(self._yields):
+            return
+        capacity = max(needed, 2 * len(self._yields))
+        yields = np.empty((capacity, len(self.tenors)), dtype=self._yields.dtype)
+        dates = np.empty(capacity, dtype='datetime64[ns]')
+        yields[:self._size] = self._yields[:self._size]
+        dates[:self._size] = self._dates[:self._size]
+        self._yields, self._dates = yields, dates
+
+    # --- Ajout de courbes ---
+
+    def append_grid(self, dates, yields):
+        """
+        Ajoute des courbes déjà exprimées sur la grille du panel.
+
+        Args:
+            dates (array-like): Dates, postérieures à la dernière date du panel.
+            yields (array-like): Rendements (dates x maturités de la grille).
+        """
+        dates = np.atleast_1d(np.asarray(pd.to_datetime(dates), dtype='datetime64[ns]'))
+        yields = np.atleast_2d(np.asarray(yields, dtype=float))
+        if len(dates) != len(yields):
+            raise ValueError("Le nombre de dates et de courbes doit être identique.")
+        if len(dates) and (np.any(np.diff(dates) <= np.timedelta64(0)) or (self._size and dates[0] <= self._dates[self._size - 1])):
+            raise ValueError("Les dates ajoutées doivent être strictement croissantes et postérieures au panel.")
+
+        self._reserve(len(dates))
+        start = self._size
+        self._yields[start:start + len(dates)] = yields
+        self._dates[start:start + len(dates)] = dates
+        self._size += len(dates)
+
+        # Variations quotidiennes nouvelles (dont celle qui relie l'historique au premier ajout)
+        stored = self._yields[max(start - 1, 0):self._size].astype(float)
+        changes = np.diff(stored, axis=0)
+        changes = changes[np.isfinite(changes).all(axis=1)]
+        self._change_count += len(changes)
+        self._change_sum += changes.sum(axis=0)
+        self._change_products += changes.T @ changes
+
+    def append(self, dates, maturities, yields):
+        """
+        Interpole des courbes observées sur la grille du panel (en un appel par
+        motif de maturités observées) et les ajoute.
+
+        Args:
+            dates (array-like): Dates des courbes.
+            maturities (array-like): Maturités observées (années).
+            yields (array-like): Rendements (dates x maturités), NaN si non observés.
+        """
+        self.append_grid(dates, interpolate_curves(maturities, yields, self.tenors, self.method))
+
+    def append_frame(self, curves_df):
+        """
+        Ajoute des courbes au format long ('Date', 'Maturity', 'Yield') ou large
+        (index de dates, une colonne par maturité).
+        """
+        if {'Date', 'Maturity', 'Yield'}.issubset(curves_df.columns):
+            curves_df = curves_df.pivot_table(index='Date', columns='Maturity', values='Yield', aggfunc='last')
+        curves_df = curves_df.sort_index()
+        self.append(curves_df.index, curves_df.columns.to_numpy(dtype=float), curves_df.to_numpy(dtype=float))
+
+    @classmethod
+    def from_frame(cls, curves_df, tenors=DEFAULT_TENORS, method='linear', **kwargs):
+        """
+        Construit un panel à partir d'un DataFrame de courbes (voir append_frame).
+        """
+        panel = cls(tenors, method, **kwargs)
+        panel.append_frame(curves_df)
+        return panel
+
+    # --- Analyse ---
+
+    def to_frame(self):
+        """
+        Retourne le panel sous forme de DataFrame (index de dates, une colonne par maturité).
+        """
+        return pd.DataFrame(self.yields, index=pd.DatetimeIndex(self.dates, name='Date'), columns=self.tenors)
+
+    def changes(self):
+        """
+        Variations quotidiennes des rendements (dates à partir de la deuxième x maturités).
+        """
+        return np.diff(self.yields.astype(float), axis=0)
+
+    def pca(self, n_components=3):
+        """
+        Analyse en composantes principales des variations quotidiennes de la
+        courbe, à partir des moments mis à jour à chaque ajout.
+
+        Les signes sont normalisés : le premier facteur (niveau) est positif en
+        moyenne, le deuxième (pente) croît avec la maturité et le troisième
+        (courbure) est positif au milieu de la courbe.
+
+        Returns:
+            CurvePCA
+        """
+        if self._change_count < 2:
+            raise ValueError("Au moins trois dates sont nécessaires pour l'ACP.")
+        mean = self._change_sum / self._change_count
+        covariance = (self._change_products - self._change_count * np.outer(mean, mean)) / (self._change_count - 1)
+        variances, vectors = np.linalg.eigh(covariance)
+        variances, vectors = variances[::-1], vectors[:, ::-1]
+
+        middle = len(self.tenors) // 2
+        orientation = [vectors.sum(axis=0), vectors[-1] - vectors[0], vectors[middle] - (vectors[0] + vectors[-1]) / 2]
+        for k in range(min(n_components, len(orientation))):
+            if orientation[k][k] < 0:
+                vectors[:, k] = -vectors[:, k]
+
+        total = variances.sum()
+        return CurvePCA(
+            vectors[:, :n_components],
+            variances[:n_components],
+            variances[:n_components] / total if total > 0 else np.zeros(n_components),
+            mean
+        )
+
+    def factor_scores(self, pca=None):
+        """
+        Projette les variations quotidiennes sur les facteurs de l'ACP.
+
+        Returns:
+            pd.DataFrame: une colonne par facteur, indexé par date.
+        """
+        pca = self.pca() if pca is None else pca
+        scores = (self.changes() - pca.mean) @ pca.loadings
+        names = [FACTOR_NAMES[k] if k < len(FACTOR_NAMES) else f"Facteur {k + 1}" for k in range(scores.shape[1])]
+        return pd.DataFrame(scores, index=pd.DatetimeIndex(self.dates[1:], name='Date'), columns=names)
+
+def generate_sample_curve_history(n_days=1260, maturities=(0.5, 1, 2, 3, 5, 7, 10, 20, 30), start='2020-01-01', seed=0):
+    """
+    Génère un historique de courbes quotidiennes de démonstration (au format
+    long 'Date', 'Maturity', 'Yield' en %), à partir de paramètres de
+    Nelson-Siegel qui évoluent comme une marche aléatoire.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start=start, periods=n_days)
+    params = np.array([3.5, -2.0, 1.0, 2.0]) + np.cumsum(rng.normal(0.0, [0.03, 0.03, 0.05, 0.0], (n_days, 4)), axis=0)
+    maturities = np.asarray(maturities, dtype=float)
+    yields = parametric_yields(params, maturities, 'nelson_siegel') + rng.normal(0.0, 0.005, (n_days, len(maturities)))
+    return pd.DataFrame({
+        'Date': np.repeat(dates, len(maturities)),
+        'Maturity': np.tile(maturities, n_days),
+        'Yield': yields.ravel()
+    })
+
+# Exemple d'utilisation (pour test)
+if __name__ == '__main__':
+    import time
+
+    history_df = generate_sample_curve_history(n_days=5000)
+    dates = history_df['Date'].unique()
+
+    start_time = time.perf_counter()
+    panel = CurvePanel.from_frame(history_df[history_df['Date'] < dates[-1]], method='cubic')
+    print(f"{panel} construit en {(time.perf_counter() - start_time) * 1000:.1f} ms")
+
+    # Ajout du dernier jour : ni réinterpolation de l'historique, ni recalcul des moments
+    start_time = time.perf_counter()
+    panel.append_frame(history_df[history_df['Date'] == dates[-1]])
+    pca = panel.pca()
+    print(f"Ajout d'un jour et ACP : {(time.perf_counter() - start_time) * 1000:.2f} ms")
+    print(f"Variance expliquée : {np.round(pca.explained_variance_ratio * 100, 1)} %")
+    print(pd.DataFrame(pca.loadings, index=panel.tenors, columns=FACTOR_NAMES).round(3))
@@ -0,0 +1,165 @@
+# app/utils/data.py
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+from utils.instrumentation import instrument, count
+from utils.lazy import lazy_import
+
+# Fonctions de données utilisables hors de l'application (sans streamlit) :
+# lecture des fichiers avec cache, données d'exemple
+pq = lazy_import('pyarrow.parquet')
+
+# Répertoire des copies Parquet des fichiers de données déjà lus
+DATA_CACHE_DIR = os.environ.get(
+    'GESTION_OBLIGATAIRE_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'gestion_obligataire')
+)
+
+# Nombre de DataFrames conservés en mémoire (partagés entre les sessions Streamlit)
+DATA_CACHE_SIZE = 16
+
+_data_cache = OrderedDict()
+_data_cache_lock = threading.Lock()
+
+def _fingerprint(source, use_content_hash=False):
+    """
+    Empreinte d'une source de données : chemin, date de modification et taille
+    pour un fichier (ou son contenu si use_content_hash), contenu pour un
+    fichier téléversé.
+
+    Returns:
+        tuple: (nom du fichier, empreinte hexadécimale)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(source, (str, os.PathLike)):
+        path = os.path.abspath(source)
+        if use_content_hash:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        else:
+            stat = os.stat(path)
+            digest.update(f"{path}|{stat.st_mtime_ns}|{stat.st_size}".encode())
+        return os.path.basename(path), digest.hexdigest()
+    # Fichier téléversé (st.file_uploader) ou tout objet fichier avec un attribut name
+    digest.update(source.getvalue() if hasattr(source, 'getvalue') else source.read())
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return os.path.basename(getattr(source, 'name', 'upload')), digest.hexdigest()
+
+def _parse_source(source, name):
+    if name.endswith('.csv'):
+        return pd.read_csv(source)
+    if name.endswith(('.xls', '.xlsx')):
+        return pd.read_excel(source)
+    raise ValueError("Format de fichier non supporté. Veuillez utiliser CSV ou Excel.")
+
+def _write_sidecar(df, sidecar_path):
+    """
+    Écrit la copie Parquet d'un DataFrame (sans effet si les colonnes ne s'y
+    prêtent pas ou si l'écriture échoue) et supprime les copies périmées du
+    même fichier, écrites sous une empreinte précédente.
+    """
+    if not all(isinstance(column, str) for column in df.columns):
+        return
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(sidecar_path), exist_ok=True)
+        tmp_path = f"{sidecar_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, sidecar_path)
+    except Exception:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+
+    # Copies d'une version précédente du fichier (même nom, autre empreinte)
+    directory, sidecar_name = os.path.split(sidecar_path)
+    prefix = sidecar_name.rsplit('-', 1)[0] + '-'
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith('.parquet') and name != sidecar_name \
+                and len(name) == len(sidecar_name):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+@instrument(category='E/S')
+def read_data_file(source, use_content_hash=False):
+    """
+    Lit un fichier de données (CSV ou Excel) en DataFrame, sans le relire si
+    son contenu n'a pas changé.
+
+    À la première lecture, une copie Parquet typée est écrite dans
+    DATA_CACHE_DIR, sous l'empreinte du fichier ; les lectures suivantes la
+    projettent en mémoire au lieu de relire le fichier source. Une seule copie
+    est conservée par nom de fichier : celle de la version précédente est
+    supprimée quand le fichier change (deux fichiers de même nom dans des
+    répertoires différents se remplacent donc l'un l'autre). Les copies ne
+    sont pas autrement limitées : clear_data_cache(sidecars=True) les supprime. Les DataFrames
+    lus sont en outre conservés en mémoire (DATA_CACHE_SIZE au plus), pour
+    toutes les sessions et réexécutions de l'application.
+
+    Args:
+        source (str or file-like): Chemin du fichier ou fichier téléversé.
+        use_content_hash (bool): Empreinte calculée sur le contenu du fichier
+            plutôt que sur sa date de modification et sa taille.
+
+    Returns:
+        pd.DataFrame: Une copie, modifiable sans affecter le cache.
+
+    Raises:
+        FileNotFoundError: si le fichier n'existe pas.
+        ValueError: si le format n'est pas supporté.
+    """
+    name, key = _fingerprint(source, use_content_hash)
+    with _data_cache_lock:
+        if key in _data_cache:
+            _data_cache.move_to_end(key)
+            count('Fichiers : mémoire')
+            return _data_cache[key].copy()
+
+    sidecar_path = os.path.join(DATA_CACHE_DIR, f"{os.path.splitext(name)[0]}-{key}.parquet")
+    if os.path.exists(sidecar_path):
+        df = pq.read_table(sidecar_path, memory_map=True).to_pandas()
+        count('Fichiers : copie Parquet')
+    else:
+        df = _parse_source(source, name)
+        count('Fichiers : source')
+        _write_sidecar(df, sidecar_path)
+
+    with _data_cache_lock:
+        _data_cache[key] = df
+        while len(_data_cache) > DATA_CACHE_SIZE:
+            _data_cache.popitem(last=False)
+    return df.copy()
+
+def clear_data_cache(sidecars=False):
+    """
+    Vide le cache mémoire des fichiers de données et, si sidecars est vrai,
+    supprime aussi les copies Parquet de DATA_CACHE_DIR.
+    """
+    with _data_cache_lock:
+        _data_cache.clear()
+    if sidecars and os.path.isdir(DATA_CACHE_DIR):
+        for name in os.listdir(DATA_CACHE_DIR):
+            if name.endswith('.parquet'):
+                os.remove(os.path.join(DATA_CACHE_DIR, name))
+
+# Exemple de données pour les obligations
+BOND_EXAMPLE_DATA = {
+    'ISIN': ['FR0010000001', 'US9128285H31', 'DE0001102381'],
+    'Nominal': [1000, 1000, 1000],
+    'Taux_Coupon': [0.03, 0.05, 0.015],
+    'Frequence_Coupon': [1, 2, 1], # 1: Annuel, 2: Semestriel
+    'Maturite_Annees': [5, 10, 3],
+    'Prix_Actuel': [1015.50, 980.00, 1005.25]
+}
+
+def get_bond_example_df():
+    """
+    Retourne un DataFrame d'exemple pour les obligations.
+    """
+    return pd.DataFrame(BOND_EXAMPLE_DATA)
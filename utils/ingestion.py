@@ -0,0 +1,244 @@
+# app/utils/ingestion.py
+
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+
+# Schéma d'une colonne : type de stockage ('float32', 'float64', 'int8', ...,
+# 'category', 'str' ou 'datetime64[ns]'), bornes incluses, valeur strictement
+# positive, motif (expression régulière), caractère obligatoire de la colonne
+# et acceptation des valeurs manquantes.
+ColumnSchema = namedtuple(
+    'ColumnSchema', ['dtype', 'min_value', 'max_value', 'strictly_positive', 'pattern', 'required', 'nullable'],
+    defaults=(None, None, False, None, True, False)
+)
+
+# Bilan d'une ingestion : lignes lues, acceptées, rejetées, et détail des
+# premiers rejets (numéro de ligne du fichier, motif et valeurs brutes)
+IngestionReport = namedtuple('IngestionReport', ['n_rows', 'n_accepted', 'n_rejected', 'rejected'])
+
+# Format d'un code ISIN, à imposer explicitement lorsque les identifiants doivent
+# en être : {**BOND_SCHEMA, 'ISIN': ColumnSchema('category', pattern=ISIN_PATTERN)}
+ISIN_PATTERN = r'^[A-Z]{2}[A-Z0-9]{9}[0-9]$'
+
+# Colonnes des obligations (celles de utils.data.BOND_EXAMPLE_DATA). L'identifiant
+# est libre (ISIN, code interne, vide) : seules les colonnes numériques sont validées.
+BOND_SCHEMA = {
+    'ISIN': ColumnSchema('category', required=False, nullable=True),
+    'Nominal': ColumnSchema('float32', strictly_positive=True),
+    'Taux_Coupon': ColumnSchema('float32', min_value=0.0, max_value=100.0),
+    'Frequence_Coupon': ColumnSchema('int8', min_value=1, max_value=12),
+    'Maturite_Annees': ColumnSchema('float32', min_value=0.0, max_value=100.0),
+    'Prix_Actuel': ColumnSchema('float32', strictly_positive=True)
+}
+
+# Soumissions d'une adjudication. Les prix restent en float64 : ils sont
+# comparés exactement aux niveaux de prix du carnet lors de la liquidation.
+BID_SCHEMA = {
+    'Price': ColumnSchema('float64', strictly_positive=True),
+    'Amount': ColumnSchema('float32', min_value=0.0)
+}
+
+# Historiques d'adjudication (voir utils.backtest)
+AUCTION_SCHEMA = {
+    'Auction_ID': ColumnSchema('int64'),
+    'Date': ColumnSchema('datetime64[ns]'),
+    'ISIN': ColumnSchema('category'),
+    'Total_Amount': ColumnSchema('float64', strictly_positive=True),
+    'Post_Auction_Price': ColumnSchema('float64', strictly_positive=True, required=False)
+}
+AUCTION_BID_SCHEMA = {'Auction_ID': ColumnSchema('int64'), **BID_SCHEMA}
+
+# Lignes d'un portefeuille : obligations et quantités détenues
+PORTFOLIO_SCHEMA = {**BOND_SCHEMA, 'Quantité': ColumnSchema('float64', min_value=0.0)}
+
+# Nombre de lignes lues à la fois et nombre maximal de rejets détaillés
+INGESTION_CHUNK_SIZE = 200_000
+MAX_REJECTED_ROWS = 1000
+
+def _missing_columns(columns, schema):
+    return [name for name, spec in schema.items() if spec.required and name not in columns]
+
+def validate_frame(df, schema, downcast=True, first_line=0):
+    """
+    Valide un DataFrame selon un schéma et convertit ses colonnes.
+
+    Args:
+        df (pd.DataFrame): Données brutes (texte ou déjà typées).
+        schema (dict): Colonne -> ColumnSchema.
+        downcast (bool): Si vrai, les colonnes sont stockées dans le type du
+            schéma (float32, petits entiers, catégories) ; sinon les colonnes
+            numériques restent en float64 (int64 pour les entiers) et les
+            colonnes catégorielles en texte.
+        first_line (int): Numéro attribué à la première ligne dans le rapport de rejets.
+
+    Returns:
+        tuple: (DataFrame des lignes valides, colonnes du schéma uniquement,
+                DataFrame des lignes rejetées avec 'Ligne' et 'Motif'),
+            qui conservent l'index de df.
+
+    Raises:
+        ValueError: si une colonne obligatoire est absente.
+    """
+    missing = _missing_columns(df.columns, schema)
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+
+    columns = {}
+    reason = pd.Series(None, index=df.index, dtype=object)
+
+    def _reject(mask, message):
+        reason.mask(mask & reason.isna(), message, inplace=True)
+
+    for name, spec in schema.items():
+        if name not in df:
+            continue
+        raw = df[name]
+        numeric_input = pd.api.types.is_numeric_dtype(raw)
+        empty = raw.isna()
+        if not numeric_input:
+            empty |= raw.astype(str).str.strip() == ''
+        if not spec.nullable:
+            _reject(empty, f"{name} : valeur manquante")
+
+        if spec.dtype in ('category', 'str'):
+            values = raw.astype(str).str.strip().mask(raw.isna())
+            if spec.pattern is not None:
+                _reject(~empty & ~values.str.match(spec.pattern, na=False), f"{name} : format invalide")
+        elif spec.dtype.startswith('datetime'):
+            values = pd.to_datetime(raw, errors='coerce')
+            _reject(~empty & values.isna(), f"{name} : date invalide")
+        else:
+            # Colonne déjà typée par le lecteur CSV : seules les colonnes contenant
+            # des valeurs non numériques passent par la conversion (plus lente)
+            values = (raw if numeric_input else pd.to_numeric(raw, errors='coerce')).astype(float)
+            _reject(~empty & values.isna(), f"{name} : non numérique")
+            out_of_bounds = pd.Series(False, index=df.index)
+            if spec.min_value is not None:
+                out_of_bounds |= values < spec.min_value
+            if spec.max_value is not None:
+                out_of_bounds |= values > spec.max_value
+            if spec.strictly_positive:
+                out_of_bounds |= values <= 0
+            _reject(out_of_bounds, f"{name} : hors bornes")
+            if spec.dtype.startswith('int'):
+                _reject(values.notna() & (values != np.round(values)), f"{name} : non entier")
+        columns[name] = values
+
+    accepted = reason.isna().to_numpy()
+    valid_df = pd.DataFrame({name: values[accepted] for name, values in columns.items()})
+    for name, values in valid_df.items():
+        dtype = schema[name].dtype
+        if dtype == 'str' or dtype.startswith('datetime'):
+            continue
+        if downcast:
+            valid_df[name] = values.astype(dtype)
+        elif dtype.startswith('int'):
+            valid_df[name] = values.astype('int64')
+
+    rejected_df = df.loc[~accepted].copy()
+    rejected_df.insert(0, 'Motif', reason[~accepted])
+    rejected_df.insert(0, 'Ligne', first_line + np.flatnonzero(~accepted))
+    return valid_df, rejected_df
+
+def iter_csv_chunks(source, schema, chunksize=INGESTION_CHUNK_SIZE, downcast=True, **read_csv_kwargs):
+    """
+    Lit un fichier CSV par blocs de `chunksize` lignes et valide chaque bloc :
+    la mémoire utilisée ne dépend que de la taille des blocs.
+
+    Yields:
+        tuple: (lignes valides typées, lignes rejetées) de chaque bloc. Les
+            numéros de ligne des rejets sont ceux du fichier (en-tête en ligne 1).
+    """
+    text_columns = {name: str for name, spec in schema.items() if spec.dtype in ('category', 'str')}
+    reader = pd.read_csv(source, chunksize=chunksize, dtype=text_columns, **read_csv_kwargs)
+    first_line = 2
+    for chunk in reader:
+        missing = _missing_columns(chunk.columns, schema)
+        if missing:
+            raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+        chunk = chunk[[name for name in schema if name in chunk.columns]]
+        yield validate_frame(chunk, schema, downcast=downcast, first_line=first_line)
+        first_line += len(chunk)
+
+def ingest_csv(source, schema, chunksize=INGESTION_CHUNK_SIZE, downcast=True, max_rejected=MAX_REJECTED_ROWS,
+               **read_csv_kwargs):
+    """
+    Ingère un fichier CSV par blocs, en validant chaque ligne selon le schéma.
+
+    Seules les colonnes du schéma sont conservées, dans leur type réduit :
+    les blocs validés occupent donc bien moins de mémoire que le fichier lu
+    d'un seul tenant en float64 et object.
+
+    Args:
+        source (str or file-like): Fichier CSV.
+        schema (dict): Colonne -> ColumnSchema (par exemple BOND_SCHEMA ou BID_SCHEMA).
+        chunksize (int): Nombre de lignes lues à la fois.
+        downcast (bool): Stocke les colonnes dans le type réduit du schéma.
+        max_rejected (int): Nombre maximal de lignes rejetées détaillées dans le rapport.
+
+    Returns:
+        tuple: (DataFrame des lignes valides, IngestionReport)
+    """
+    valid_chunks, rejected_chunks = [], []
+    n_rows = n_rejected = n_kept = 0
+    for valid_df, rejected_df in iter_csv_chunks(source, schema, chunksize, downcast, **read_csv_kwargs):
+        n_rows += len(valid_df) + len(rejected_df)
+        n_rejected += len(rejected_df)
+        valid_chunks.append(valid_df)
+        if n_kept < max_rejected and len(rejected_df):
+            rejected_chunks.append(rejected_df.iloc[:max_rejected - n_kept])
+            n_kept += len(rejected_chunks[-1])
+
+    if not valid_chunks:
+        valid_df = pd.DataFrame({name: pd.Series(dtype=object) for name, spec in schema.items() if spec.required})
+    else:
+        categorical = [name for name in valid_chunks[0] if isinstance(valid_chunks[0][name].dtype, pd.CategoricalDtype)]
+        unions = {
+            name: pd.api.types.union_categoricals([chunk[name] for chunk in valid_chunks])
+            for name in categorical
+        }
+        valid_df = pd.concat([chunk.drop(columns=categorical) for chunk in valid_chunks], ignore_index=True)
+        for name in categorical:
+            valid_df[name] = unions[name]
+        valid_df = valid_df[list(valid_chunks[0].columns)]
+
+    rejected_df = pd.concat(rejected_chunks, ignore_index=True) if rejected_chunks else pd.DataFrame(columns=['Ligne', 'Motif'])
+    return valid_df, IngestionReport(n_rows, n_rows - n_rejected, n_rejected, rejected_df)
+
+# Exemple d'utilisation (pour test)
+if __name__ == '__main__':
+    import os
+    import tempfile
+    import time
+    import tracemalloc
+
+    n_rows = 2_000_000
+    rng = np.random.default_rng(0)
+    bonds_df = pd.DataFrame({
+        'ISIN': np.char.add('FR', np.char.zfill(rng.integers(0, 5000, n_rows).astype(str), 10)),
+        'Nominal': 1000,
+        'Taux_Coupon': np.round(rng.uniform(0, 6, n_rows), 3),
+        'Frequence_Coupon': rng.choice([1, 2], n_rows),
+        'Maturite_Annees': np.round(rng.uniform(0.5, 30, n_rows), 2),
+        'Prix_Actuel': np.round(rng.uniform(900, 1100, n_rows), 2)
+    })
+    bonds_df.loc[::10000, 'Prix_Actuel'] = -1
+    bonds_df.loc[5::10000, 'Maturite_Annees'] = np.nan
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'bonds.csv')
+        bonds_df.to_csv(path, index=False)
+        del bonds_df
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        valid_df, report = ingest_csv(path, BOND_SCHEMA)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    print(f"{report.n_rows:,} lignes en {elapsed:.2f} s : {report.n_accepted:,} acceptées, {report.n_rejected:,} rejetées")
+    print(f"Mémoire du résultat : {valid_df.memory_usage(deep=True).sum() / 1e6:.1f} Mo, pic : {peak / 1e6:.1f} Mo")
+    print(valid_df.dtypes)
+    print(report.rejected.head())
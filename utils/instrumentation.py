@@ -0,0 +1,213 @@
+# app/utils/instrumentation.py
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Catégories de temps : lecture de données, calcul, et affichage (le temps de la
+# réexécution qui n'est pas mesuré par ailleurs : rendu Streamlit, code des pages)
+CATEGORIES = ('E/S', 'Calcul', 'Rendu')
+
+# Instrumentation active au démarrage si la variable d'environnement vaut 1
+_enabled = os.environ.get('GESTION_OBLIGATAIRE_PERF', '0') == '1'
+
+# Mesures de la réexécution en cours, propres à chaque thread (chaque session
+# Streamlit exécute ses pages dans son propre thread)
+_local = threading.local()
+
+# Caches suivis : nom -> fonction retournant un objet (hits, misses, maxsize, currsize)
+_caches = {}
+
+def enable():
+    """
+    Active l'instrumentation (pour tout le processus).
+    """
+    global _enabled
+    _enabled = True
+
+def disable():
+    """
+    Désactive l'instrumentation : les fonctions instrumentées ne paient plus
+    qu'un test de booléen par appel.
+    """
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def register_cache(name, info):
+    """
+    Suit un cache dont les statistiques sont données par info() (par exemple
+    la méthode cache_info d'une fonction décorée par functools.lru_cache).
+    """
+    _caches[name] = info
+
+def _cache_counts():
+    counts = {}
+    for name, info in _caches.items():
+        stats = info()
+        counts[name] = (stats.hits, stats.misses, stats.currsize, stats.maxsize)
+    return counts
+
+def _run():
+    run = getattr(_local, 'run', None)
+    if run is None:
+        run = begin_run()
+    return run
+
+def begin_run():
+    """
+    Commence les mesures d'une réexécution (d'une page) dans le thread courant
+    et retourne leur état.
+    """
+    _local.run = {
+        'start': time.perf_counter(),
+        'started_at': datetime.now().isoformat(timespec='milliseconds'),
+        'calls': {},
+        'counters': {},
+        'caches': _cache_counts(),
+        'depth': 0
+    }
+    return _local.run
+
+def _record(run, name, category, elapsed):
+    stats = run['calls'].get(name)
+    if stats is None:
+        stats = run['calls'][name] = {'category': category, 'calls': 0, 'total': 0.0, 'exclusive': 0.0, 'max': 0.0}
+    stats['calls'] += 1
+    stats['total'] += elapsed
+    stats['max'] = max(stats['max'], elapsed)
+
+@contextmanager
+def timer(name, category='Calcul'):
+    """
+    Mesure la durée d'un bloc de code (sans effet si l'instrumentation est désactivée).
+
+    Les durées des blocs imbriqués ne sont comptées qu'une fois dans le total
+    de leur catégorie : seul le bloc le plus externe y contribue.
+    """
+    if not _enabled:
+        yield
+        return
+    run = _run()
+    run['depth'] += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        run['depth'] -= 1
+        _record(run, name, category, elapsed)
+        if run['depth'] == 0:
+            run['calls'][name]['exclusive'] += elapsed
+
+def instrument(name=None, category='Calcul'):
+    """
+    Décorateur mesurant la durée et le nombre d'appels d'une fonction.
+
+    Désactivé, le décorateur ne coûte qu'un test de booléen par appel.
+
+    Args:
+        name (str, optional): Nom de la mesure (par défaut, module.fonction).
+        category (str): Catégorie de la mesure (voir CATEGORIES).
+    """
+    def decorator(function):
+        label = name or f"{function.__module__.rsplit('.', 1)[-1]}.{function.__name__}"
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with timer(label, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name, n=1):
+    """
+    Incrémente un compteur de la réexécution en cours (sans effet si
+    l'instrumentation est désactivée).
+    """
+    if not _enabled:
+        return
+    counters = _run()['counters']
+    counters[name] = counters.get(name, 0) + n
+
+def run_report():
+    """
+    Bilan des mesures de la réexécution en cours.
+
+    Returns:
+        dict: {'started_at', 'elapsed' (secondes depuis begin_run),
+               'categories' (temps par catégorie, le rendu recevant le temps
+               non mesuré),
+               'calls' (par mesure : catégorie, appels, temps total et maximal),
+               'counters', 'caches' (hits, misses et taux de succès pendant la
+               réexécution, taille et capacité)}
+    """
+    run = _run()
+    elapsed = time.perf_counter() - run['start']
+    categories = {category: 0.0 for category in CATEGORIES}
+    for stats in run['calls'].values():
+        categories[stats['category']] = categories.get(stats['category'], 0.0) + stats['exclusive']
+    categories['Rendu'] += max(elapsed - sum(categories.values()), 0.0)
+
+    caches = {}
+    for cache_name, (hits, misses, size, maxsize) in _cache_counts().items():
+        hits_before, misses_before = run['caches'].get(cache_name, (0, 0, 0, 0))[:2]
+        hits, misses = hits - hits_before, misses - misses_before
+        caches[cache_name] = {
+            'hits': hits, 'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else None,
+            'size': size, 'maxsize': maxsize
+        }
+
+    return {
+        'started_at': run['started_at'],
+        'elapsed': elapsed,
+        'categories': categories,
+        'calls': {
+            name: {'category': stats['category'], 'calls': stats['calls'], 'total': stats['total'], 'max': stats['max']}
+            for name, stats in sorted(run['calls'].items(), key=lambda item: -item[1]['total'])
+        },
+        'counters': dict(run['counters']),
+        'caches': caches
+    }
+
+def reports_to_json(reports):
+    """
+    Exporte une liste de bilans (voir run_report) en JSON, pour analyse hors ligne.
+    """
+    return json.dumps({'reports': list(reports)}, indent=2, ensure_ascii=False)
+
+# Exemple d'utilisation (pour test)
+if __name__ == '__main__':
+    import timeit
+    import numpy as np
+    # Module importé sous son nom : c'est lui qu'utilisent les modules instrumentés
+    import utils.instrumentation as instrumentation
+    from utils.bonds import calculate_price_batch, get_cashflow_schedule
+
+    def reference():
+        pass
+    instrumented = instrumentation.instrument()(reference)
+    n_calls = 1_000_000
+    overhead = (min(timeit.repeat(instrumented, number=n_calls, repeat=5))
+                - min(timeit.repeat(reference, number=n_calls, repeat=5))) / n_calls
+    print(f"Surcoût de l'instrumentation désactivée : {overhead * 1e9:.0f} ns par appel")
+
+    instrumentation.enable()
+    instrumentation.begin_run()
+    ytm = np.random.default_rng(0).uniform(0.0, 0.07, 1000)
+    for _ in range(100):
+        calculate_price_batch(ytm, 100.0, 0.04, 2.0, 10.0)
+        get_cashflow_schedule(100.0, 0.04, 2.0, 10.0)
+    with instrumentation.timer('attente', 'E/S'):
+        time.sleep(0.01)
+    instrumentation.count('exemple')
+    print(instrumentation.reports_to_json([instrumentation.run_report()]))
@@ -0,0 +1,41 @@
+# app/utils/lazy.py
+
+import importlib
+import sys
+import types
+
+class _LazyModule(types.ModuleType):
+    """
+    Module importé au premier accès à l'un de ses attributs.
+    """
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self.__name__)
+        # Les attributs du module sont recopiés : les accès suivants ne passent plus par __getattr__
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        state = "chargé" if is_loaded(self.__name__) else "non chargé"
+        return f"<module paresseux '{self.__name__}' ({state})>"
+
+def lazy_import(name):
+    """
+    Retourne un module dont l'import est différé jusqu'à sa première
+    utilisation (par exemple `interpolate.CubicSpline`).
+
+    Les bibliothèques lourdes (scipy, plotly, streamlit) ne sont ainsi chargées
+    que par les fonctions et les pages qui s'en servent réellement.
+
+    Args:
+        name (str): Nom complet du module (par exemple 'scipy.interpolate').
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return _LazyModule(name)
+
+def is_loaded(name):
+    """
+    Indique si un module a déjà été importé dans le processus.
+    """
+    return name in sys.modules
@@ -0,0 +1,184 @@
+# app/utils/montecarlo.py
+
+import os
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# Modèle paramétrique d'un carnet de soumissions du marché :
+# - nombre de soumissions ~ Poisson(mean_bids)
+# - prix = price_center + choc commun N(0, shift_vol) + bruit individuel N(0, price_vol), arrondi au tick
+# - montants ~ LogNormale(log_amount_mean, log_amount_vol)
+BidBookModel = namedtuple('BidBookModel', [
+    'mean_bids', 'price_center', 'price_vol', 'shift_vol', 'log_amount_mean', 'log_amount_vol', 'tick_size'
+])
+
+# Nombre de carnets simulés par tâche : fixe, pour que les résultats ne
+# dépendent que de la graine et pas du nombre de processus.
+SIMULATION_CHUNK_SIZE = 2000
+
+def calibrate_bid_model(bids_df, tick_size=0.01, shift_vol=None):
+    """
+    Calibre le modèle de carnet sur un carnet de référence.
+
+    Args:
+        bids_df (pd.DataFrame): Soumissions de référence ('Price', 'Amount').
+        tick_size (float): Pas de cotation des prix simulés.
+        shift_vol (float, optional): Volatilité du choc de prix commun à toutes
+            les soumissions d'une adjudication. Par défaut, la dispersion des prix.
+
+    Returns:
+        BidBookModel
+    """
+    prices = bids_df['Price'].to_numpy(dtype=float)
+    amounts = bids_df['Amount'].to_numpy(dtype=float)
+    amounts = amounts[amounts > 0]
+
+    price_center = np.average(prices, weights=bids_df['Amount'].to_numpy(dtype=float)) if amounts.size else prices.mean()
+    price_vol = prices.std() if len(prices) > 1 else tick_size
+    log_amounts = np.log(amounts) if amounts.size else np.zeros(1)
+
+    return BidBookModel(
+        mean_bids=float(len(prices)),
+        price_center=float(price_center),
+        price_vol=float(max(price_vol, tick_size)),
+        shift_vol=float(price_vol if shift_vol is None else shift_vol),
+        log_amount_mean=float(log_amounts.mean()),
+        log_amount_vol=float(log_amounts.std()),
+        tick_size=float(tick_size)
+    )
+
+def simulate_bid_books(model, n_books, rng):
+    """
+    Génère n_books carnets de marché aléatoires sous forme de tableaux
+    (n_books, nombre maximal de soumissions), complétés par des soumissions
+    de montant nul.
+
+    Returns:
+        tuple: (prix, montants)
+    """
+    n_bids = np.maximum(rng.poisson(model.mean_bids, n_books), 1)
+    width = int(n_bids.max())
+    shift = rng.normal(0.0, model.shift_vol, (n_books, 1))
+    prices = model.price_center + shift + rng.normal(0.0, model.price_vol, (n_books, width))
+    # Le second arrondi élimine les résidus binaires (99.45000000000002) qui
+    # fausseraient la comparaison des niveaux de prix
+    prices = np.round(np.round(prices / model.tick_size) * model.tick_size, 10)
+    amounts = rng.lognormal(model.log_amount_mean, model.log_amount_vol, (n_books, width))
+    amounts[np.arange(width) >= n_bids[:, None]] = 0.0
+    return prices, amounts
+
+def clear_auctions_batch(prices, amounts, total_amount):
+    """
+    Calcule le prix marginal de plusieurs adjudications à la fois (une par ligne).
+
+    Returns:
+        tuple: (prix marginaux, ratio de service au prix marginal), un par ligne.
+            Une adjudication sous-souscrite a pour prix marginal son plus bas
+            prix soumis (avec un montant non nul) et un ratio de 1.
+    """
+    order = np.argsort(-prices, axis=1)
+    sorted_prices = np.take_along_axis(prices, order, axis=1)
+    cumulative = np.cumsum(np.take_along_axis(amounts, order, axis=1), axis=1)
+
+    reached = cumulative >= total_amount
+    subscribed = reached.any(axis=1)
+    marginal_index = np.where(subscribed, reached.argmax(axis=1), 0)
+    marginal_price = sorted_prices[np.arange(len(prices)), marginal_index]
+    lowest_price = np.where(amounts > 0, prices, np.inf).min(axis=1)
+    marginal_price = np.where(subscribed, marginal_price, lowest_price)
+
+    demand_above = np.where(prices > marginal_price[:, None], amounts, 0.0).sum(axis=1)
+    level_amount = np.where(prices == marginal_price[:, None], amounts, 0.0).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(level_amount > 0, (total_amount - demand_above) / level_amount, 0.0)
+    ratio = np.where(subscribed, ratio, 1.0)
+    return marginal_price, ratio
+
+def _simulate_chunk(model, n_books, total_amount, user_price, user_amount, seed_sequence):
+    """
+    Simule et liquide un bloc de carnets, notre soumission incluse.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    prices, amounts = simulate_bid_books(model, n_books, rng)
+    prices = np.column_stack([prices, np.full(n_books, user_price)])
+    amounts = np.column_stack([amounts, np.full(n_books, user_amount)])
+
+    marginal_price, ratio = clear_auctions_batch(prices, amounts, total_amount)
+    allocation = np.where(user_price > marginal_price, user_amount,
+                          np.where(user_price == marginal_price, user_amount * ratio, 0.0))
+    return marginal_price, allocation
+
+def run_monte_carlo(bids_df, total_amount, user_price, user_amount, n_simulations=10000,
+                    seed=0, workers=None, model=None, tick_size=0.01):
+    """
+    Estime la distribution des résultats d'adjudication pour notre soumission.
+
+    Les carnets du marché sont générés à partir du modèle calibré sur
+    `bids_df`, liquidés par blocs vectorisés, et les blocs sont répartis sur
+    un pool de processus. Chaque bloc reçoit sa propre graine dérivée de
+    `seed` : les résultats sont identiques quel que soit le nombre de processus.
+
+    Args:
+        bids_df (pd.DataFrame): Carnet de référence du marché ('Price', 'Amount').
+        total_amount (float): Montant total de l'obligation à allouer.
+        user_price, user_amount (float): Notre soumission.
+        n_simulations (int): Nombre d'adjudications simulées.
+        seed (int): Graine aléatoire.
+        workers (int, optional): Nombre de processus (par défaut, le nombre de cœurs).
+            Avec 1, la simulation s'exécute dans le processus courant.
+        model (BidBookModel, optional): Modèle déjà calibré.
+        tick_size (float): Pas de cotation des prix simulés.
+
+    Returns:
+        pd.DataFrame: Une ligne par simulation : 'Marginal_Price', 'Allocation',
+            'Fill_Ratio' et 'Cost' (montant alloué multiplié par notre prix).
+    """
+    if model is None:
+        model = calibrate_bid_model(bids_df, tick_size=tick_size)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    chunk_sizes = [SIMULATION_CHUNK_SIZE] * (n_simulations // SIMULATION_CHUNK_SIZE)
+    if n_simulations % SIMULATION_CHUNK_SIZE:
+        chunk_sizes.append(n_simulations % SIMULATION_CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = [(model, size, total_amount, user_price, user_amount, chunk_seed) for size, chunk_seed in zip(chunk_sizes, seeds)]
+
+    if workers == 1 or len(tasks) <= 1:
+        results = [_simulate_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(_simulate_chunk, *zip(*tasks)))
+
+    marginal_price = np.concatenate([r[0] for r in results]) if results else np.zeros(0)
+    allocation = np.concatenate([r[1] for r in results]) if results else np.zeros(0)
+    return pd.DataFrame({
+        'Marginal_Price': marginal_price,
+        'Allocation': allocation,
+        'Fill_Ratio': allocation / user_amount if user_amount > 0 else np.zeros_like(allocation),
+        'Cost': allocation * user_price / 100
+    })
+
+def summarize_monte_carlo(results_df, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """
+    Résume les distributions simulées : moyenne, écart-type et quantiles.
+    """
+    return results_df.describe(percentiles=list(quantiles)).T
+
+# Exemple d'utilisation (pour test)
+if __name__ == '__main__':
+    import time
+
+    bids_df = pd.DataFrame({
+        'Price': [99.55, 99.50, 99.45, 99.40, 99.35],
+        'Amount': [80.0, 120.0, 150.0, 100.0, 50.0]
+    })
+
+    for workers in (1, os.cpu_count()):
+        start = time.perf_counter()
+        results_df = run_monte_carlo(bids_df, 300.0, 99.45, 50.0, n_simulations=100000, seed=42, workers=workers)
+        print(f"{workers} processus : {time.perf_counter() - start:.2f} s")
+
+    print(summarize_monte_carlo(results_df))
@@ -0,0 +1,272 @@
+# app/utils/orderbook.py
+
+import itertools
+import numpy as np
+import pandas as pd
+from utils.adjudication import ClearingResult
+
+# Grille de prix des carnets des pages d'adjudication (en % du nominal) : la
+# saisie des prix y est limitée au même pas et au même maximum
+BOOK_TICK_SIZE = 0.001
+BOOK_MAX_PRICE = 200.0
+
+class BidBook:
+    """
+    Carnet de soumissions persistant pour le suivi d'une adjudication en direct.
+
+    Les niveaux de prix sont indexés sur une grille de pas `tick_size`, du plus
+    haut prix au plus bas. Les montants agrégés par niveau sont stockés dans un
+    arbre de Fenwick, qui maintient le montant cumulé : l'ajout, la
+    modification ou l'annulation d'une soumission, comme la recherche du
+    niveau marginal, coûtent O(log n) où n est le nombre de niveaux de la grille.
+    """
+
+    def __init__(self, total_amount, tick_size=0.01, min_price=0.0, max_price=200.0):
+        """
+        Args:
+            total_amount (float): Montant total de l'obligation à allouer.
+            tick_size (float): Pas de cotation des prix.
+            min_price, max_price (float): Bornes de la grille de prix.
+        """
+        self.total_amount = float(total_amount)
+        self.tick_size = float(tick_size)
+        self.min_price = float(min_price)
+        self.max_price = float(max_price)
+        self._n_levels = int(round((self.max_price - self.min_price) / self.tick_size)) + 1
+        self._level_amounts = [0.0] * self._n_levels
+        self._tree = [0.0] * (self._n_levels + 1)
+        self._top_step = 1 << (self._n_levels.bit_length() - 1)
+        self._bids = {}
+        self._ids = itertools.count()
+        self._total_demand = 0.0
+        self._result = None
+
+    # --- Arbre de Fenwick sur les niveaux de prix ---
+
+    def _update_level(self, level, delta):
+        self._level_amounts[level] += delta
+        self._total_demand += delta
+        i = level + 1
+        while i <= self._n_levels:
+            self._tree[i] += delta
+            i += i & -i
+        self._result = None
+
+    def _cumulative_amount(self, level):
+        """
+        Montant cumulé des niveaux 0..level (prix supérieurs ou égaux).
+        """
+        total = 0.0
+        i = level + 1
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _first_level_reaching(self, target):
+        """
+        Premier niveau dont le montant cumulé atteint `target` (n si aucun).
+        """
+        # Tolérance sur les erreurs d'arrondi accumulées par les mises à jour
+        remaining = target - 1e-9 * max(1.0, abs(target))
+        position = 0
+        step = self._top_step
+        while step:
+            candidate = position + step
+            if candidate <= self._n_levels and self._tree[candidate] < remaining:
+                position = candidate
+                remaining -= self._tree[candidate]
+            step >>= 1
+        return position
+
+    def _level(self, price):
+        level = int(round((self.max_price - price) / self.tick_size))
+        if not 0 <= level < self._n_levels:
+            raise ValueError(f"Prix {price} hors de la grille [{self.min_price}, {self.max_price}].")
+        if abs(self.max_price - level * self.tick_size - price) > 1e-6 * self.tick_size:
+            raise ValueError(f"Prix {price} non aligné sur le pas de cotation {self.tick_size}.")
+        return level
+
+    def _price(self, level):
+        return round(self.max_price - level * self.tick_size, 10)
+
+    # --- Mises à jour du carnet ---
+
+    def add_bid(self, price, amount, bid_id=None):
+        """
+        Ajoute une soumission et retourne son identifiant.
+        """
+        if amount < 0:
+            raise ValueError("Le montant d'une soumission doit être positif.")
+        if bid_id is None:
+            bid_id = next(self._ids)
+        if bid_id in self._bids:
+            raise KeyError(f"Soumission déjà présente : {bid_id}")
+        level = self._level(price)
+        self._bids[bid_id] = (level, float(amount))
+        self._update_level(level, float(amount))
+        return bid_id
+
+    def amend_bid(self, bid_id, price=None, amount=None):
+        """
+        Modifie le prix et/ou le montant d'une soumission existante.
+        """
+        level, old_amount = self._bids[bid_id]
+        new_level = level if price is None else self._level(price)
+        new_amount = old_amount if amount is None else float(amount)
+        if new_amount < 0:
+            raise ValueError("Le montant d'une soumission doit être positif.")
+        if new_level == level:
+            self._update_level(level, new_amount - old_amount)
+        else:
+            self._update_level(level, -old_amount)
+            self._update_level(new_level, new_amount)
+        self._bids[bid_id] = (new_level, new_amount)
+
+    def cancel_bid(self, bid_id):
+        """
+        Annule une soumission.
+        """
+        level, amount = self._bids.pop(bid_id)
+        self._update_level(level, -amount)
+
+    def set_total_amount(self, total_amount):
+        """
+        Modifie le montant total à allouer.
+        """
+        self.total_amount = float(total_amount)
+        self._result = None
+
+    def sync(self, bids_df):
+        """
+        Aligne le carnet sur un DataFrame de soumissions (colonnes 'Price' et
+        'Amount', l'index servant d'identifiant) en n'appliquant que les
+        différences : soumissions ajoutées, modifiées ou supprimées.
+        """
+        current = dict(zip(bids_df.index, zip(bids_df['Price'].to_numpy(dtype=float), bids_df['Amount'].to_numpy(dtype=float))))
+        for bid_id in [bid_id for bid_id in self._bids if bid_id not in current]:
+            self.cancel_bid(bid_id)
+        for bid_id, (price, amount) in current.items():
+            if bid_id not in self._bids:
+                self.add_bid(price, amount, bid_id)
+                continue
+            level, old_amount = self._bids[bid_id]
+            if self._level(price) != level or amount != old_amount:
+                self.amend_bid(bid_id, price, amount)
+
+    @classmethod
+    def from_dataframe(cls, bids_df, total_amount, **kwargs):
+        """
+        Construit un carnet à partir d'un DataFrame de soumissions.
+        """
+        book = cls(total_amount, **kwargs)
+        book.sync(bids_df)
+        return book
+
+    # --- Résultat de l'adjudication ---
+
+    def __len__(self):
+        return len(self._bids)
+
+    @property
+    def total_demand(self):
+        return self._total_demand
+
+    def clearing(self):
+        """
+        Prix marginal et ratio de service au prix marginal, recalculés en
+        O(log n) après chaque modification du carnet.
+
+        Returns:
+            ClearingResult: les allocations individuelles sont obtenues par
+                allocation() ou allocations() ; le champ allocations vaut None.
+        """
+        if self._result is not None:
+            return self._result
+        if self._total_demand <= 1e-9 * max(1.0, self.total_amount):
+            # Carnet vide ou sans demande : pas de prix marginal (les soumissions
+            # de montant nul ne sont pas des niveaux de prix)
+            self._result = ClearingResult(np.nan, None, 0.0, 0.0)
+            return self._result
+
+        marginal_level = self._first_level_reaching(self.total_amount)
+        if marginal_level >= self._n_levels:
+            # Adjudication sous-souscrite : toute la demande est servie
+            lowest_level = self._first_level_reaching(self._total_demand)
+            self._result = ClearingResult(self._price(lowest_level), None, 1.0, self._total_demand)
+            return self._result
+
+        amount_allocated_above = self._cumulative_amount(marginal_level - 1) if marginal_level > 0 else 0.0
+        total_marginal_amount = self._level_amounts[marginal_level]
+        remaining_amount = self.total_amount - amount_allocated_above
+        allocation_ratio = min(remaining_amount / total_marginal_amount, 1.0) if total_marginal_amount > 0 else 0.0
+        self._result = ClearingResult(self._price(marginal_level), None, allocation_ratio, self.total_amount)
+        return self._result
+
+    def allocation(self, bid_id):
+        """
+        Montant alloué à une soumission.
+        """
+        level, amount = self._bids[bid_id]
+        result = self.clearing()
+        if np.isnan(result.marginal_price):
+            return 0.0
+        marginal_level = self._level(result.marginal_price)
+        if level < marginal_level:
+            return amount
+        if level == marginal_level:
+            return amount * result.pro_rata_ratio
+        return 0.0
+
+    def allocations(self):
+        """
+        Retourne toutes les soumissions avec leur allocation, par prix décroissant.
+
+        Returns:
+            pd.DataFrame: colonnes 'Price', 'Amount' et 'Allocation', indexé par identifiant.
+        """
+        result = self.clearing()
+        ids = list(self._bids)
+        levels = np.array([self._bids[bid_id][0] for bid_id in ids], dtype=np.int64)
+        amounts = np.array([self._bids[bid_id][1] for bid_id in ids], dtype=float)
+        if not np.isnan(result.marginal_price):
+            marginal_level = self._level(result.marginal_price)
+            allocation = np.where(levels < marginal_level, amounts,
+                                  np.where(levels == marginal_level, amounts * result.pro_rata_ratio, 0.0))
+        else:
+            allocation = np.zeros_like(amounts)
+        allocations_df = pd.DataFrame({
+            'Price': np.round(self.max_price - levels * self.tick_size, 10),
+            'Amount': amounts,
+            'Allocation': allocation
+        }, index=pd.Index(ids, name='Bid_ID'))
+        return allocations_df.sort_values(by='Price', ascending=False, kind='stable')
+
+    def levels(self):
+        """
+        Retourne les niveaux de prix non vides avec le montant agrégé et cumulé.
+        """
+        level_amounts = np.asarray(self._level_amounts)
+        active = np.flatnonzero(level_amounts > 0)
+        return pd.DataFrame({
+            'Price': np.round(self.max_price - active * self.tick_size, 10),
+            'Amount': level_amounts[active],
+            'Cumulative_Amount': np.cumsum(level_amounts[active])
+        })
+
+# Exemple d'utilisation (pour test)
+if __name__ == '__main__':
+    book = BidBook(total_amount=400)
+    for price, amount in zip([99.50, 99.45, 99.40, 99.35, 99.30], [100, 150, 200, 100, 50]):
+        book.add_bid(price, amount)
+
+    print(f"Prix Marginal: {book.clearing().marginal_price}")
+    print(book.allocations())
+
+    # Une nouvelle soumission au-dessus du prix marginal réduit le ratio de service
+    new_bid = book.add_bid(99.55, 120)
+    result = book.clearing()
+    print(f"\nAprès ajout - Prix Marginal: {result.marginal_price}, Ratio: {result.pro_rata_ratio:.2%}")
+    book.cancel_bid(new_bid)
+    print(f"Après annulation - Prix Marginal: {book.clearing().marginal_price}")
+    print(book.levels())
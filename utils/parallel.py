@@ -0,0 +1,255 @@
+# app/utils/parallel.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from utils.instrumentation import instrument
+from utils.portfolio import BondMetrics, portfolio_arrays, compute_bond_metrics, build_portfolio_results
+from utils.screener import ScreeningMetrics, screening_arrays, compute_screening_metrics, build_screening_results
+
+# Calcul parallèle des analyses de portefeuille et de recherche d'opportunités :
+# les obligations sont réparties en tranches entre plusieurs processus, qui
+# lisent leurs données et écrivent leurs résultats dans des tableaux NumPy en
+# mémoire partagée (aucun DataFrame n'est sérialisé). Les agrégats sont
+# calculés à la fin, sur les tableaux complets, comme dans le calcul sur un
+# seul processus : les résultats sont identiques.
+
+# Nombre minimal d'obligations par tranche : en deçà, la répartition coûte
+# plus qu'elle ne rapporte et le calcul reste dans le processus courant
+MIN_SHARD_SIZE = 50_000
+
+# Tranches par processus : des tranches plus petites équilibrent la charge
+# (le solveur de YTM ne converge pas aussi vite pour toutes les obligations)
+SHARDS_PER_WORKER = 4
+
+# Entrées des calculs, dans l'ordre des arguments des noyaux
+_PORTFOLIO_INPUTS = ('face_value', 'coupon_rate', 'frequency', 'years_to_maturity', 'price', 'quantity', 'initial_ytm')
+_SCREENING_INPUTS = ('face_value', 'coupon_rate', 'frequency', 'years_to_maturity', 'market_price', 'reference_ytm')
+
+class SharedArrays:
+    """
+    Tableaux float64 de même longueur, rangés dans un seul bloc de mémoire
+    partagée et accessibles par leur nom (self.arrays).
+
+    Le processus qui crée le bloc le libère en sortie du bloc `with` ; les
+    autres s'y rattachent par SharedArrays.attach(*spec) et le ferment par close().
+    """
+
+    def __init__(self, fields, n, name=None):
+        self.fields = tuple(fields)
+        self.n = n
+        self._owner = name is None
+        self._shm = shared_memory.SharedMemory(name=name, create=self._owner, size=max(len(self.fields) * n * 8, 1))
+        data = np.ndarray((len(self.fields), n), dtype=np.float64, buffer=self._shm.buf)
+        self.arrays = dict(zip(self.fields, data))
+
+    @classmethod
+    def attach(cls, name, fields, n):
+        return cls(fields, n, name)
+
+    @property
+    def spec(self):
+        """
+        Description (nom du bloc, champs, longueur) transmise aux autres processus.
+        """
+        return self._shm.name, self.fields, self.n
+
+    def slice(self, start, stop):
+        return {field: values[start:stop] for field, values in self.arrays.items()}
+
+    def close(self):
+        # Les vues NumPy doivent disparaître avant la fermeture du bloc
+        self.arrays = {}
+        self._shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        if self._owner:
+            self._shm.unlink()
+
+def _resolve_workers(workers):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(int(workers), 1)
+
+def _shard_bounds(n, workers):
+    """
+    Découpe [0, n) en tranches contiguës de tailles proches.
+
+    Returns:
+        list: [(début, fin), ...]
+    """
+    n_shards = max(min(workers * SHARDS_PER_WORKER, n // MIN_SHARD_SIZE), 1)
+    bounds = np.linspace(0, n, n_shards + 1).astype(np.int64)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+def _run_shard(kernel, input_spec, output_spec, start, stop, args):
+    """
+    Exécute kernel sur une tranche, dans un processus de calcul.
+    """
+    inputs = SharedArrays.attach(*input_spec)
+    outputs = SharedArrays.attach(*output_spec)
+    try:
+        kernel(inputs.slice(start, stop), outputs.slice(start, stop), *args)
+    finally:
+        inputs.close()
+        outputs.close()
+
+def _run_sharded(kernel, inputs, output_fields, args, workers, executor=None):
+    """
+    Copie les entrées en mémoire partagée, calcule les tranches sur le pool de
+    processus et retourne les résultats complets.
+
+    Args:
+        kernel (callable): kernel(entrées, sorties, *args), sur des dictionnaires
+            de tableaux (une tranche), défini au niveau d'un module.
+        inputs (dict): Tableaux d'entrée, par nom.
+        output_fields (tuple): Noms des tableaux de sortie.
+        args (tuple): Arguments supplémentaires du noyau.
+        workers (int): Nombre de processus.
+        executor (ProcessPoolExecutor, optional): Pool existant (sinon, un pool
+            de `workers` processus est créé pour l'appel).
+
+    Returns:
+        dict: Tableaux de sortie complets, par nom.
+    """
+    n = len(next(iter(inputs.values())))
+    with SharedArrays(inputs.keys(), n) as shared_inputs, SharedArrays(output_fields, n) as shared_outputs:
+        for field, values in inputs.items():
+            shared_inputs.arrays[field][:] = values
+        tasks = [
+            (kernel, shared_inputs.spec, shared_outputs.spec, start, stop, args)
+            for start, stop in _shard_bounds(n, workers)
+        ]
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for future in [pool.submit(_run_shard, *task) for task in tasks]:
+                    future.result()
+        else:
+            for future in [executor.submit(_run_shard, *task) for task in tasks]:
+                future.result()
+        # Copie hors du bloc partagé, libéré en sortie du bloc `with`
+        return {field: shared_outputs.arrays[field].copy() for field in output_fields}
+
+def _portfolio_kernel(inputs, outputs, use_initial_ytm):
+    metrics = compute_bond_metrics(
+        *(inputs[field] for field in _PORTFOLIO_INPUTS[:-1]),
+        initial_ytm=inputs['initial_ytm'] if use_initial_ytm else None
+    )
+    for field, values in zip(BondMetrics._fields, metrics):
+        outputs[field][:] = values
+
+def _screening_kernel(inputs, outputs):
+    metrics = compute_screening_metrics(*(inputs[field] for field in _SCREENING_INPUTS))
+    for field, values in zip(ScreeningMetrics._fields, metrics):
+        outputs[field][:] = values
+
+@instrument()
+def parallel_analyze_portfolio(portfolio_df, workers=None, coupon_in_percent=True, initial_ytm=None, executor=None):
+    """
+    Équivalent de utils.portfolio.analyze_portfolio, calculé sur plusieurs
+    processus. Les résultats sont identiques à ceux du calcul sur un seul
+    processus.
+
+    Args:
+        portfolio_df (pd.DataFrame): Portefeuille nettoyé (voir prepare_portfolio).
+        workers (int, optional): Nombre de processus (None : nombre de cœurs).
+        coupon_in_percent (bool): Si vrai, 'Taux_Coupon' est exprimé en pourcentage.
+        initial_ytm (array-like, optional): Rendements de départ du solveur.
+        executor (ProcessPoolExecutor, optional): Pool réutilisé d'un appel à
+            l'autre (par exemple pour plusieurs scénarios de prix).
+
+    Returns:
+        tuple: (results_df, summary), voir analyze_portfolio.
+    """
+    workers = _resolve_workers(workers)
+    arrays = portfolio_arrays(portfolio_df, coupon_in_percent)
+    n = len(portfolio_df)
+    if (workers <= 1 and executor is None) or n < 2 * MIN_SHARD_SIZE:
+        metrics = compute_bond_metrics(*arrays, initial_ytm=initial_ytm)
+        return build_portfolio_results(portfolio_df, metrics)
+
+    inputs = dict(zip(_PORTFOLIO_INPUTS, arrays))
+    inputs['initial_ytm'] = (
+        np.broadcast_to(np.asarray(initial_ytm, dtype=float), (n,)) if initial_ytm is not None else np.zeros(n)
+    )
+    outputs = _run_sharded(_portfolio_kernel, inputs, BondMetrics._fields, (initial_ytm is not None,), workers, executor)
+    outputs['converged'] = outputs['converged'].astype(bool)
+    return build_portfolio_results(portfolio_df, BondMetrics(**outputs))
+
+@instrument()
+def parallel_screen_opportunities(bonds_df, reference_ytm, threshold_bp=5.0, top_n=10, rank_by='normalized_gap',
+                                  coupon_in_percent=True, workers=None, executor=None):
+    """
+    Équivalent de utils.screener.screen_opportunities, calculé sur plusieurs
+    processus. Les résultats sont identiques à ceux du calcul sur un seul
+    processus.
+
+    Args:
+        bonds_df, reference_ytm, threshold_bp, top_n, rank_by, coupon_in_percent:
+            Voir screen_opportunities.
+        workers (int, optional): Nombre de processus (None : nombre de cœurs).
+        executor (ProcessPoolExecutor, optional): Pool réutilisé d'un appel à l'autre.
+
+    Returns:
+        tuple: (results_df, cheap_df, rich_df), voir screen_opportunities.
+    """
+    workers = _resolve_workers(workers)
+    arrays = screening_arrays(bonds_df, coupon_in_percent)
+    market_price = arrays[-1]
+    reference_ytm = np.broadcast_to(np.asarray(reference_ytm, dtype=float), market_price.shape)
+    if (workers <= 1 and executor is None) or len(bonds_df) < 2 * MIN_SHARD_SIZE:
+        metrics = compute_screening_metrics(*arrays, reference_ytm)
+    else:
+        inputs = dict(zip(_SCREENING_INPUTS, arrays + (reference_ytm,)))
+        metrics = ScreeningMetrics(**_run_sharded(_screening_kernel, inputs, ScreeningMetrics._fields, (), workers, executor))
+    return build_screening_results(bonds_df, market_price, reference_ytm, metrics, threshold_bp, top_n, rank_by)
+
+# Comparaison au calcul sur un seul processus : python -m utils.parallel --bonds 2000000 --workers 4
+if __name__ == '__main__':
+    import argparse
+    import time
+    import pandas as pd
+    from utils.portfolio import analyze_portfolio
+    from utils.screener import screen_opportunities
+
+    parser = argparse.ArgumentParser(description="Analyse de portefeuille et recherche d'opportunités sur plusieurs processus.")
+    parser.add_argument('--bonds', type=int, default=1_000_000, help="Nombre d'obligations.")
+    parser.add_argument('--workers', type=int, default=0, help="Nombre de processus (0 : nombre de cœurs).")
+    args = parser.parse_args()
+    workers = _resolve_workers(args.workers or None)
+
+    rng = np.random.default_rng(0)
+    n = args.bonds
+    bonds_df = pd.DataFrame({
+        'ISIN': np.arange(n),
+        'Nominal': 100.0,
+        'Taux_Coupon': rng.uniform(0.0, 6.0, n),
+        'Frequence_Coupon': rng.choice([1, 2, 4], n),
+        'Maturite_Annees': rng.uniform(0.5, 30.0, n),
+        'Prix_Actuel': rng.uniform(80.0, 120.0, n),
+        'Quantité': rng.integers(1, 1000, n)
+    })
+    reference_ytm = rng.uniform(0.0, 0.06, n)
+
+    def timed(function, *function_args, **kwargs):
+        start = time.perf_counter()
+        result = function(*function_args, **kwargs)
+        return result, time.perf_counter() - start
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        (serial_df, serial_summary), serial_time = timed(analyze_portfolio, bonds_df)
+        (parallel_df, parallel_summary), parallel_time = timed(parallel_analyze_portfolio, bonds_df, executor=executor)
+        identical = serial_df.equals(parallel_df) and serial_summary == parallel_summary
+        print(f"Portefeuille ({n:,} lignes, {workers} processus) : {serial_time:.2f} s -> {parallel_time:.2f} s, "
+              f"résultats identiques : {identical}")
+
+        serial, serial_time = timed(screen_opportunities, bonds_df, reference_ytm)
+        parallel, parallel_time = timed(parallel_screen_opportunities, bonds_df, reference_ytm, executor=executor)
+        identical = all(a.equals(b) for a, b in zip(serial, parallel))
+        print(f"Opportunités ({n:,} obligations, {workers} processus) : {serial_time:.2f} s -> {parallel_time:.2f} s, "
+              f"résultats identiques : {identical}")
@@ -0,0 +1,145 @@
+# app/utils/portfolio.py
+
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from utils.bonds import solve_ytm_batch, calculate_risk_batch
+from utils.ingestion import validate_frame, PORTFOLIO_SCHEMA
+
+# Colonnes numériques attendues pour chaque ligne du portefeuille
+PORTFOLIO_NUMERIC_COLUMNS = ['Nominal', 'Taux_Coupon', 'Frequence_Coupon', 'Maturite_Annees', 'Prix_Actuel', 'Quantité']
+
+# Métriques par obligation calculées par compute_bond_metrics (DV01 et valeur
+# de marché multipliés par la quantité détenue)
+BondMetrics = namedtuple('BondMetrics', [
+    'ytm', 'converged', 'macaulay_duration', 'modified_duration', 'convexity', 'dv01', 'market_value'
+])
+
+def prepare_portfolio(portfolio_df, return_rejected=False):
+    """
+    Valide les lignes du portefeuille (voir utils.ingestion.PORTFOLIO_SCHEMA),
+    convertit les colonnes en numérique et supprime les lignes invalides.
+
+    Args:
+        portfolio_df (pd.DataFrame): Portefeuille saisi (colonnes de PORTFOLIO_NUMERIC_COLUMNS et 'ISIN').
+        return_rejected (bool): Si vrai, retourne aussi les lignes rejetées et leur motif.
+
+    Returns:
+        pd.DataFrame: Copie nettoyée du portefeuille (et, si demandé, le
+            DataFrame des lignes rejetées).
+    """
+    valid_df, rejected_df = validate_frame(portfolio_df, PORTFOLIO_SCHEMA, downcast=False)
+    valid_df = valid_df.reset_index(drop=True)
+    return (valid_df, rejected_df) if return_rejected else valid_df
+
+def portfolio_arrays(portfolio_df, coupon_in_percent=True):
+    """
+    Extrait les colonnes du portefeuille sous forme de tableaux float.
+
+    Returns:
+        tuple: (nominal, taux du coupon en décimal, fréquence, maturité, prix, quantité)
+    """
+    face_value = portfolio_df['Nominal'].to_numpy(dtype=float)
+    coupon_rate = portfolio_df['Taux_Coupon'].to_numpy(dtype=float)
+    if coupon_in_percent:
+        coupon_rate = coupon_rate / 100
+    frequency = portfolio_df['Frequence_Coupon'].to_numpy(dtype=float)
+    years_to_maturity = portfolio_df['Maturite_Annees'].to_numpy(dtype=float)
+    price = portfolio_df['Prix_Actuel'].to_numpy(dtype=float)
+    quantity = portfolio_df['Quantité'].to_numpy(dtype=float)
+    return face_value, coupon_rate, frequency, years_to_maturity, price, quantity
+
+def compute_bond_metrics(face_value, coupon_rate, frequency, years_to_maturity, price, quantity, initial_ytm=None):
+    """
+    Calcule les métriques de chaque ligne du portefeuille. Chaque ligne est
+    calculée indépendamment des autres : le résultat d'une tranche de lignes
+    est identique à la tranche correspondante du résultat complet.
+
+    Returns:
+        BondMetrics: tableaux d'une valeur par ligne.
+    """
+    ytm_result = solve_ytm_batch(price, face_value, coupon_rate, frequency, years_to_maturity, initial_ytm=initial_ytm)
+    risk = calculate_risk_batch(ytm_result.ytm, face_value, coupon_rate, frequency, years_to_maturity)
+    return BondMetrics(
+        ytm_result.ytm, ytm_result.converged, risk.macaulay_duration, risk.modified_duration,
+        risk.convexity, risk.dv01 * quantity, price * quantity
+    )
+
+def build_portfolio_results(portfolio_df, metrics):
+    """
+    Assemble le détail par ligne et calcule les agrégats du portefeuille
+    (poids, duration, YTM et convexité pondérés, DV01 total).
+
+    Args:
+        portfolio_df (pd.DataFrame): Portefeuille nettoyé (pour les ISIN).
+        metrics (BondMetrics): Métriques de toutes les lignes (voir compute_bond_metrics).
+
+    Returns:
+        tuple: (results_df, summary), voir analyze_portfolio.
+    """
+    market_value = metrics.market_value
+    total_market_value = market_value.sum()
+    weight = market_value / total_market_value if total_market_value else np.zeros_like(market_value)
+
+    results_df = pd.DataFrame({
+        # Sans colonne ISIN, l'index identifie la ligne (unique sur tout un fichier traité par blocs)
+        'ISIN': portfolio_df['ISIN'].to_numpy() if 'ISIN' in portfolio_df else portfolio_df.index.to_numpy(),
+        'YTM': metrics.ytm,
+        'YTM_Converged': metrics.converged,
+        'Macaulay_Duration': metrics.macaulay_duration,
+        'Modified_Duration': metrics.modified_duration,
+        'Convexity': metrics.convexity,
+        'DV01': metrics.dv01,
+        'Market_Value': market_value,
+        'Weight': weight
+    })
+
+    summary = {
+        'total_market_value': float(total_market_value),
+        # Duration Modifiée Pondérée du Portefeuille
+        'modified_duration': float(weight @ metrics.modified_duration),
+        # YTM Pondéré du Portefeuille (Approximation)
+        'ytm': float(weight @ metrics.ytm),
+        'convexity': float(weight @ metrics.convexity),
+        'dv01': float(results_df['DV01'].sum()),
+        'n_bonds': len(results_df),
+        'n_unconverged': int((~metrics.converged).sum())
+    }
+
+    return results_df, summary
+
+def analyze_portfolio(portfolio_df, coupon_in_percent=True, initial_ytm=None):
+    """
+    Calcule les métriques d'un portefeuille obligataire, colonne par colonne,
+    pour toutes les lignes à la fois.
+
+    Args:
+        portfolio_df (pd.DataFrame): Portefeuille nettoyé (voir prepare_portfolio).
+        coupon_in_percent (bool): Si vrai, 'Taux_Coupon' est exprimé en pourcentage.
+        initial_ytm (array-like, optional): Rendements de départ du solveur
+            (par exemple ceux de l'analyse précédente).
+
+    Returns:
+        tuple: (results_df, summary)
+            results_df contient, par ligne : ISIN, YTM, durations, convexité,
+            DV01, valeur de marché et poids.
+            summary contient les agrégats du portefeuille.
+    """
+    metrics = compute_bond_metrics(*portfolio_arrays(portfolio_df, coupon_in_percent), initial_ytm=initial_ytm)
+    return build_portfolio_results(portfolio_df, metrics)
+
+# Exemple d'utilisation (pour test)
+if __name__ == '__main__':
+    portfolio_df = pd.DataFrame({
+        'ISIN': ['FR0010000001', 'US9128285H31', 'DE0001102381'],
+        'Nominal': [1000, 1000, 1000],
+        'Taux_Coupon': [0.03, 0.05, 0.015],
+        'Frequence_Coupon': [1, 2, 1],
+        'Maturite_Annees': [5, 10, 3],
+        'Prix_Actuel': [1015.50, 980.00, 1005.25],
+        'Quantité': [100, 50, 200]
+    })
+
+    results_df, summary = analyze_portfolio(prepare_portfolio(portfolio_df), coupon_in_percent=False)
+    print(results_df)
+    print(summary)
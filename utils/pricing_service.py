@@ -0,0 +1,497 @@
+# app/utils/pricing_service.py
+
+import asyncio
+import json
+import time
+from collections import deque
+import numpy as np
+from utils.bonds import solve_ytm_batch, calculate_risk_batch
+
+# Service HTTP local de pricing (bibliothèque standard uniquement) : les
+# requêtes unitaires concurrentes sont regroupées en micro-lots, calculés en
+# un seul appel vectorisé.
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Taille maximale d'un micro-lot et attente maximale (secondes) avant de
+# calculer un lot incomplet
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_WAIT = 0.002
+
+# Caractéristiques d'une obligation dans une requête (décimal pour les taux) ;
+# la requête contient en outre 'price' (calcul du YTM) ou 'ytm' (calcul du prix)
+REQUEST_FIELDS = ('face_value', 'coupon_rate', 'frequency', 'years_to_maturity')
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            500: 'Internal Server Error'}
+
+def _parse_request(request):
+    """
+    Returns:
+        tuple: (nominal, coupon, fréquence, maturité, prix, ytm), NaN pour la donnée à calculer.
+
+    Raises:
+        ValueError: si la requête est incomplète ou incohérente.
+    """
+    if not isinstance(request, dict):
+        raise ValueError("Requête JSON objet attendue.")
+    missing = [field for field in REQUEST_FIELDS if field not in request]
+    if missing:
+        raise ValueError(f"Champs manquants : {', '.join(missing)}")
+    face_value, coupon_rate, frequency, years_to_maturity = (float(request[field]) for field in REQUEST_FIELDS)
+    # json.loads accepte NaN et Infinity : ces valeurs sont refusées comme les autres
+    given = [request[field] for field in ('price', 'ytm') if field in request]
+    if not np.isfinite([face_value, coupon_rate, frequency, years_to_maturity] + [float(value) for value in given]).all():
+        raise ValueError("Les champs numériques doivent être finis.")
+    if face_value <= 0 or frequency < 1 or years_to_maturity <= 0 or coupon_rate < 0:
+        raise ValueError("Nominal, fréquence et maturité doivent être positifs, le coupon positif ou nul.")
+    if 'ytm' in request:
+        return face_value, coupon_rate, frequency, years_to_maturity, np.nan, float(request['ytm'])
+    if 'price' in request:
+        price = float(request['price'])
+        if price <= 0:
+            raise ValueError("Le prix doit être strictement positif.")
+        return face_value, coupon_rate, frequency, years_to_maturity, price, np.nan
+    raise ValueError("Indiquez 'price' (calcul du YTM) ou 'ytm' (calcul du prix).")
+
+def price_requests(requests):
+    """
+    Calcule prix, YTM, durations, convexité et DV01 d'une liste de requêtes,
+    en un appel vectorisé pour tout le lot.
+
+    Args:
+        requests (list): Dictionnaires avec les champs de REQUEST_FIELDS et
+            'price' ou 'ytm' (décimal).
+
+    Returns:
+        list: Un dictionnaire de résultats par requête, ou {'error': motif}
+            pour une requête invalide (les autres requêtes du lot sont calculées).
+    """
+    n = len(requests)
+    params = np.full((n, 6), np.nan)
+    errors = [None] * n
+    for i, request in enumerate(requests):
+        try:
+            params[i] = _parse_request(request)
+        except (TypeError, ValueError) as e:
+            errors[i] = str(e)
+    valid = np.array([error is None for error in errors], dtype=bool)
+    face_value, coupon_rate, frequency, years_to_maturity, price, ytm = params[valid].T
+
+    converged = np.ones(ytm.shape, dtype=bool)
+    solve = np.isnan(ytm)
+    if solve.any():
+        ytm_result = solve_ytm_batch(
+            price[solve], face_value[solve], coupon_rate[solve], frequency[solve], years_to_maturity[solve]
+        )
+        ytm[solve] = ytm_result.ytm
+        converged[solve] = ytm_result.converged
+    risk = calculate_risk_batch(ytm, face_value, coupon_rate, frequency, years_to_maturity)
+
+    columns = zip(
+        risk.price.tolist(), ytm.tolist(), converged.tolist(), risk.macaulay_duration.tolist(),
+        risk.modified_duration.tolist(), risk.convexity.tolist(), risk.dv01.tolist()
+    )
+    results = []
+    for error in errors:
+        if error is not None:
+            results.append({'error': error})
+            continue
+        price_i, ytm_i, converged_i, macaulay, modified, convexity, dv01 = next(columns)
+        results.append({
+            'price': price_i, 'ytm': ytm_i, 'converged': converged_i, 'macaulay_duration': macaulay,
+            'modified_duration': modified, 'convexity': convexity, 'dv01': dv01
+        })
+    return results
+
+def _json_safe(payload):
+    """
+    Remplace les flottants non finis (NaN, infini) par None, sérialisé en
+    null : JSON ne les représente pas.
+    """
+    if isinstance(payload, float):
+        return payload if np.isfinite(payload) else None
+    if isinstance(payload, dict):
+        return {key: _json_safe(value) for key, value in payload.items()}
+    if isinstance(payload, list):
+        return [_json_safe(value) for value in payload]
+    return payload
+
+class MicroBatcher:
+    """
+    Regroupe les requêtes concurrentes en micro-lots.
+
+    Un lot est calculé dès qu'il atteint max_batch_size requêtes, ou
+    max_wait secondes après l'arrivée de sa première requête : sous charge,
+    les lots sont pleins ; à faible charge, une requête isolée n'attend
+    qu'au plus max_wait.
+    """
+
+    def __init__(self, kernel, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT):
+        """
+        Args:
+            kernel (callable): Fonction liste de requêtes -> liste de résultats (même ordre).
+            max_batch_size (int): Taille maximale d'un lot.
+            max_wait (float): Attente maximale (secondes) avant de calculer un lot incomplet.
+        """
+        self.kernel = kernel
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.n_batches = 0
+        self.n_requests = 0
+        self._pending = []
+        self._timer = None
+
+    def submit(self, request):
+        """
+        Ajoute une requête au lot en cours.
+
+        Returns:
+            asyncio.Future: résultat de la requête, disponible une fois le lot calculé.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            # Avec max_wait nul, le lot regroupe les requêtes déjà lues dans
+            # l'itération courante de la boucle d'événements
+            self._timer = loop.call_later(self.max_wait, self.flush)
+        return future
+
+    def flush(self):
+        """
+        Calcule le lot en cours (appelé quand il est plein ou à l'échéance de max_wait).
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        requests, futures = zip(*batch)
+        try:
+            results = self.kernel(list(requests))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+        self.n_batches += 1
+        self.n_requests += len(batch)
+
+    def stats(self):
+        return {
+            'batches': self.n_batches,
+            'requests': self.n_requests,
+            'mean_batch_size': self.n_requests / self.n_batches if self.n_batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait': self.max_wait
+        }
+
+class PricingService:
+    """
+    Service HTTP/1.1 (connexions persistantes) de pricing d'obligations.
+
+    Points d'accès (JSON) :
+        POST /price        une obligation (regroupée en micro-lot avec les requêtes concurrentes)
+        POST /price/batch  une liste d'obligations, calculée en un appel
+        GET  /stats        statistiques des micro-lots
+        GET  /health       disponibilité du service
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait=DEFAULT_MAX_WAIT):
+        self.host = host
+        self.port = port
+        self.batcher = MicroBatcher(price_requests, max_batch_size, max_wait)
+        self._server = None
+
+    async def start(self):
+        """
+        Démarre le service (port 0 : port libre choisi par le système, voir self.port).
+        """
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(lambda: _HTTPProtocol(self), self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.batcher.flush()
+
+    def dispatch(self, method, path, body):
+        """
+        Traite une requête HTTP.
+
+        Returns:
+            tuple | asyncio.Future: (code HTTP, réponse) ou, pour POST /price,
+                le résultat à venir du micro-lot
+        """
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/stats':
+            return 200, self.batcher.stats()
+        if path not in ('/price', '/price/batch'):
+            return 404, {'error': f"Chemin inconnu : {path}"}
+        if method != 'POST':
+            return 405, {'error': "Méthode POST attendue."}
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 400, {'error': "Corps JSON invalide."}
+        if path == '/price':
+            return self.batcher.submit(payload)
+        if not isinstance(payload, list):
+            return 400, {'error': "Liste JSON attendue."}
+        return 200, price_requests(payload)
+
+class _HTTPProtocol(asyncio.Protocol):
+    """
+    Connexion HTTP/1.1 : les requêtes sont lues dès leur arrivée (y compris
+    en pipeline) et les réponses écrites dans l'ordre des requêtes.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.transport = None
+        self._buffer = bytearray()
+        self._responses = deque()
+        self._closing = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.transport = None
+
+    def data_received(self, data):
+        self._buffer += data
+        while not self._closing:
+            end = self._buffer.find(b'\r\n\r\n')
+            if end < 0:
+                break
+            try:
+                lines = self._buffer[:end].decode('latin-1').split('\r\n')
+                method, path, _ = lines[0].split(' ', 2)
+                length = 0
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    name = name.strip().lower()
+                    if name == 'content-length':
+                        length = int(value)
+                    elif name == 'connection' and value.strip().lower() == 'close':
+                        self._closing = True
+            except ValueError:
+                self.transport.close()
+                return
+            if len(self._buffer) < end + 4 + length:
+                break
+            body = bytes(self._buffer[end + 4:end + 4 + length])
+            del self._buffer[:end + 4 + length]
+
+            response = self.service.dispatch(method, path, body)
+            self._responses.append(response)
+            if isinstance(response, asyncio.Future):
+                response.add_done_callback(self._write_responses)
+        self._write_responses()
+
+    def _write_responses(self, _future=None):
+        while self._responses:
+            response = self._responses[0]
+            if isinstance(response, asyncio.Future):
+                if not response.done():
+                    return
+                if response.exception() is not None:
+                    status, payload = 500, {'error': str(response.exception())}
+                else:
+                    payload = response.result()
+                    status = 400 if 'error' in payload else 200
+            else:
+                status, payload = response
+            self._responses.popleft()
+            if self.transport is None:
+                continue
+            data = json.dumps(_json_safe(payload), allow_nan=False).encode()
+            self.transport.write(
+                f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n".encode('latin-1') + data
+            )
+        if self._closing and self.transport is not None:
+            self.transport.close()
+
+class PricingClient:
+    """
+    Client du service de pricing sur une connexion persistante (une requête à la fois).
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._reader = self._writer = None
+
+    async def __aenter__(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def request(self, method, path, payload=None):
+        """
+        Returns:
+            tuple: (code HTTP, réponse JSON décodée)
+        """
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self._writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+        )
+        await self._writer.drain()
+        head = (await self._reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(head[0].split(' ', 2)[1])
+        length = 0
+        for line in head[1:]:
+            name, _, value = line.partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        return status, json.loads(await self._reader.readexactly(length))
+
+    async def price(self, request):
+        return (await self.request('POST', '/price', request))[1]
+
+    async def price_batch(self, requests):
+        return (await self.request('POST', '/price/batch', requests))[1]
+
+def generate_sample_requests(n, seed=0):
+    """
+    Requêtes aléatoires (moitié à partir d'un prix, moitié à partir d'un YTM).
+    """
+    rng = np.random.default_rng(seed)
+    requests = []
+    for i in range(n):
+        request = {
+            'face_value': 100.0,
+            'coupon_rate': round(float(rng.uniform(0.0, 0.06)), 4),
+            'frequency': int(rng.choice([1, 2, 4])),
+            'years_to_maturity': round(float(rng.uniform(0.5, 30.0)), 2)
+        }
+        if i % 2:
+            request['price'] = round(float(rng.uniform(80.0, 120.0)), 2)
+        else:
+            request['ytm'] = round(float(rng.uniform(0.0, 0.07)), 4)
+        requests.append(request)
+    return requests
+
+async def run_load_test(host, port, requests, concurrency=64):
+    """
+    Envoie les requêtes unitairement depuis `concurrency` connexions
+    concurrentes, puis en un seul appel /price/batch.
+
+    Returns:
+        dict: {'single': {...}, 'batch': {...}} avec, pour chaque mode, la
+            durée totale, le débit (requêtes/s) et, pour les requêtes
+            unitaires, les latences médiane et au 99e centile (ms).
+    """
+    latencies = []
+    shares = [requests[k::concurrency] for k in range(concurrency)]
+
+    async def worker(share):
+        async with PricingClient(host, port) as client:
+            for request in share:
+                start = time.perf_counter()
+                await client.price(request)
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(share) for share in shares if share))
+    single_elapsed = time.perf_counter() - start
+
+    async with PricingClient(host, port) as client:
+        start = time.perf_counter()
+        await client.price_batch(requests)
+        batch_elapsed = time.perf_counter() - start
+        stats = (await client.request('GET', '/stats'))[1]
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'single': {
+            'elapsed': single_elapsed, 'throughput': len(requests) / single_elapsed,
+            'p50_ms': float(np.percentile(latencies, 50)), 'p99_ms': float(np.percentile(latencies, 99)),
+            'mean_batch_size': stats['mean_batch_size']
+        },
+        'batch': {'elapsed': batch_elapsed, 'throughput': len(requests) / batch_elapsed}
+    }
+
+async def _benchmark(n_requests, concurrency, configurations):
+    """
+    Lance le service dans un processus séparé pour chaque configuration
+    (taille de lot, attente) et mesure la charge de run_load_test.
+    """
+    import os
+    import sys
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    requests = generate_sample_requests(n_requests)
+    for max_batch_size, max_wait in configurations:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, '-m', 'utils.pricing_service', 'serve', '--port', '0',
+            '--max-batch-size', str(max_batch_size), '--max-wait', str(max_wait),
+            cwd=root, stdout=asyncio.subprocess.PIPE
+        )
+        try:
+            # Le service indique son port sur sa première ligne de sortie
+            port = int((await process.stdout.readline()).decode().rsplit(':', 1)[1])
+            result = await run_load_test(DEFAULT_HOST, port, requests, concurrency)
+        finally:
+            process.terminate()
+            await process.wait()
+        single, batch = result['single'], result['batch']
+        print(f"lot max {max_batch_size:>4}, attente {max_wait * 1000:>4.1f} ms : "
+              f"{single['throughput']:>8,.0f} req/s unitaires (lot moyen {single['mean_batch_size']:>6.1f}, "
+              f"p50 {single['p50_ms']:.2f} ms, p99 {single['p99_ms']:.2f} ms) ; "
+              f"{batch['throughput']:>9,.0f} req/s en un appel /price/batch")
+
+# Service et benchmark : python -m utils.pricing_service {serve,bench} ...
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Service HTTP local de pricing d'obligations.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help="Démarre le service.")
+    serve_parser.add_argument('--host', default=DEFAULT_HOST)
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port (0 : port libre).")
+    serve_parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    serve_parser.add_argument('--max-wait', type=float, default=DEFAULT_MAX_WAIT, help="Attente maximale d'un lot (secondes).")
+    bench_parser = subparsers.add_parser('bench', help="Latence et débit, avec et sans micro-lots.")
+    bench_parser.add_argument('--requests', type=int, default=20_000)
+    bench_parser.add_argument('--concurrency', type=int, default=64, help="Connexions clientes simultanées.")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        async def _serve():
+            service = PricingService(args.host, args.port, args.max_batch_size, args.max_wait)
+            await service.start()
+            print(f"Service de pricing à l'écoute sur {service.host}:{service.port}", flush=True)
+            await service.serve_forever()
+        try:
+            asyncio.run(_serve())
+        except KeyboardInterrupt:
+            pass
+    else:
+        # Sans micro-lots (lots d'une requête), puis avec
+        asyncio.run(_benchmark(args.requests, args.concurrency, [
+            (1, 0.0), (DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT), (DEFAULT_MAX_BATCH_SIZE, 0.0)
+        ]))
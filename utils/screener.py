@@ -0,0 +1,177 @@
+# app/utils/screener.py
+
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from utils.bonds import solve_ytm_batch, calculate_risk_batch
+from utils.yields import get_fitted_curve
+
+# Libellés de classification des obligations
+CHEAP_LABEL = 'Sous-évaluée (Achat)'
+RICH_LABEL = 'Surévaluée (Vente)'
+FAIR_LABEL = 'Juste Valeur'
+
+# Écarts par obligation calculés par compute_screening_metrics
+ScreeningMetrics = namedtuple('ScreeningMetrics', [
+    'theoretical_price', 'price_gap', 'normalized_gap', 'market_ytm', 'yield_spread_bp', 'dv01'
+])
+
+def reference_yields_from_curve(curve_df, maturities, method='cubic'):
+    """
+    Interpole les rendements de référence (en décimal) sur la courbe, pour
+    toutes les maturités en un seul appel.
+
+    Args:
+        curve_df (pd.DataFrame): Courbe avec les colonnes 'Maturity' et 'Yield' (en %).
+        maturities (array-like): Maturités des obligations (années).
+        method (str): Méthode d'interpolation (voir utils.yields.get_fitted_curve).
+    """
+    # Les maturités hors de la courbe sont ramenées à ses bornes (pas d'extrapolation)
+    return get_fitted_curve(curve_df, method)(maturities, extrapolate=False)
+
+def screening_arrays(bonds_df, coupon_in_percent=True):
+    """
+    Extrait les colonnes de l'univers sous forme de tableaux float.
+
+    Returns:
+        tuple: (nominal, taux du coupon en décimal, fréquence, maturité, prix de marché)
+    """
+    face_value = bonds_df['Nominal'].to_numpy(dtype=float)
+    coupon_rate = bonds_df['Taux_Coupon'].to_numpy(dtype=float)
+    if coupon_in_percent:
+        coupon_rate = coupon_rate / 100
+    frequency = bonds_df['Frequence_Coupon'].to_numpy(dtype=float)
+    years_to_maturity = bonds_df['Maturite_Annees'].to_numpy(dtype=float)
+    market_price = bonds_df['Prix_Actuel'].to_numpy(dtype=float)
+    return face_value, coupon_rate, frequency, years_to_maturity, market_price
+
+def compute_screening_metrics(face_value, coupon_rate, frequency, years_to_maturity, market_price, reference_ytm):
+    """
+    Calcule les écarts de chaque obligation à son prix théorique. Chaque
+    obligation est calculée indépendamment des autres.
+
+    Returns:
+        ScreeningMetrics: tableaux d'une valeur par obligation.
+    """
+    # Prix théorique et DV01 au rendement de référence, en une seule passe
+    risk = calculate_risk_batch(reference_ytm, face_value, coupon_rate, frequency, years_to_maturity)
+    # Rendement implicite du prix de marché, en partant du rendement de référence
+    market_ytm = solve_ytm_batch(
+        market_price, face_value, coupon_rate, frequency, years_to_maturity, initial_ytm=reference_ytm
+    ).ytm
+
+    price_gap = market_price - risk.price
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Écart de prix exprimé en pb de rendement : positif si l'obligation est chère
+        normalized_gap = price_gap / risk.dv01
+    yield_spread_bp = (market_ytm - reference_ytm) * 1e4
+
+    return ScreeningMetrics(risk.price, price_gap, normalized_gap, market_ytm, yield_spread_bp, risk.dv01)
+
+def build_screening_results(bonds_df, market_price, reference_ytm, metrics, threshold_bp=5.0, top_n=10,
+                            rank_by='normalized_gap'):
+    """
+    Classe les obligations et sélectionne les meilleures opportunités.
+
+    Args:
+        bonds_df (pd.DataFrame): Univers analysé (pour les ISIN).
+        market_price, reference_ytm (np.ndarray): Prix de marché et rendements de référence.
+        metrics (ScreeningMetrics): Écarts de toutes les obligations (voir compute_screening_metrics).
+        threshold_bp, top_n, rank_by: Voir screen_opportunities.
+
+    Returns:
+        tuple: (results_df, cheap_df, rich_df), voir screen_opportunities.
+    """
+    normalized_gap = metrics.normalized_gap
+    opportunity = np.where(
+        normalized_gap > threshold_bp, RICH_LABEL,
+        np.where(normalized_gap < -threshold_bp, CHEAP_LABEL, FAIR_LABEL)
+    )
+
+    results_df = pd.DataFrame({
+        # Sans colonne ISIN, l'index identifie la ligne (unique sur tout un fichier traité par blocs)
+        'ISIN': bonds_df['ISIN'].to_numpy() if 'ISIN' in bonds_df else bonds_df.index.to_numpy(),
+        'Prix_Actuel': market_price,
+        'Prix_Théorique': metrics.theoretical_price,
+        'Écart_Prix': metrics.price_gap,
+        'Écart_Normalisé_pb': normalized_gap,
+        'YTM_Marché': metrics.market_ytm,
+        'YTM_Reference': reference_ytm,
+        'Spread_pb': metrics.yield_spread_bp,
+        'DV01': metrics.dv01,
+        'Opportunité': opportunity
+    })
+
+    if rank_by == 'normalized_gap':
+        richness = normalized_gap
+    elif rank_by == 'spread':
+        richness = -metrics.yield_spread_bp
+    else:
+        raise ValueError(f"Critère de classement inconnu : {rank_by}")
+
+    cheap_df = _top_n(results_df, results_df['Opportunité'] == CHEAP_LABEL, -richness, top_n)
+    rich_df = _top_n(results_df, results_df['Opportunité'] == RICH_LABEL, richness, top_n)
+
+    return results_df, cheap_df, rich_df
+
+def screen_opportunities(bonds_df, reference_ytm, threshold_bp=5.0, top_n=10, rank_by='normalized_gap',
+                         coupon_in_percent=True):
+    """
+    Compare le prix de marché de chaque obligation à son prix théorique,
+    calculé au rendement de référence, pour tout l'univers à la fois.
+
+    L'écart de prix est normalisé par le DV01 : il s'exprime en points de base
+    de rendement, ce qui rend comparables des obligations de maturités différentes.
+
+    Args:
+        bonds_df (pd.DataFrame): Univers avec les colonnes 'Nominal', 'Taux_Coupon',
+            'Frequence_Coupon', 'Maturite_Annees' et 'Prix_Actuel'.
+        reference_ytm (array-like): Rendements de référence (en décimal), un par obligation.
+        threshold_bp (float): Écart normalisé (en pb) au-delà duquel une obligation
+            est considérée comme sous- ou surévaluée.
+        top_n (int): Nombre d'obligations retenues de chaque côté.
+        rank_by (str): Critère de classement des top_n : 'normalized_gap'
+            (écart de prix / DV01) ou 'spread' (écart de rendement).
+        coupon_in_percent (bool): Si vrai, 'Taux_Coupon' est exprimé en pourcentage.
+
+    Returns:
+        tuple: (results_df, cheap_df, rich_df)
+            results_df contient toutes les obligations analysées,
+            cheap_df / rich_df les top_n obligations les plus sous- / surévaluées.
+    """
+    face_value, coupon_rate, frequency, years_to_maturity, market_price = screening_arrays(bonds_df, coupon_in_percent)
+    reference_ytm = np.broadcast_to(np.asarray(reference_ytm, dtype=float), market_price.shape)
+
+    metrics = compute_screening_metrics(face_value, coupon_rate, frequency, years_to_maturity, market_price, reference_ytm)
+    return build_screening_results(bonds_df, market_price, reference_ytm, metrics, threshold_bp, top_n, rank_by)
+
+def _top_n(results_df, mask, score, top_n):
+    """
+    Sélectionne les top_n lignes de plus grand score parmi celles du masque,
+    sans trier tout l'univers.
+    """
+    candidates = np.flatnonzero(np.asarray(mask))
+    if top_n <= 0:
+        candidates = candidates[:0]
+    elif candidates.size > top_n:
+        candidates = candidates[np.argpartition(-score[candidates], top_n - 1)[:top_n]]
+    candidates = candidates[np.argsort(-score[candidates], kind='stable')]
+    return results_df.iloc[candidates].reset_index(drop=True)
+
+# Exemple d'utilisation (pour test)
+if __name__ == '__main__':
+    bonds_df = pd.DataFrame({
+        'ISIN': ['FR0010000001', 'US9128285H31', 'DE0001102381'],
+        'Nominal': [1000, 1000, 1000],
+        'Taux_Coupon': [3.0, 5.0, 1.5],
+        'Frequence_Coupon': [1, 2, 1],
+        'Maturite_Annees': [5, 10, 3],
+        'Prix_Actuel': [1015.50, 980.00, 1005.25]
+    })
+
+    results_df, cheap_df, rich_df = screen_opportunities(bonds_df, [0.032, 0.051, 0.018])
+    print(results_df[['ISIN', 'Prix_Théorique', 'Écart_Normalisé_pb', 'Spread_pb', 'Opportunité']])
+    print("\nSous-évaluées:")
+    print(cheap_df[['ISIN', 'Écart_Normalisé_pb']])
+    print("\nSurévaluées:")
+    print(rich_df[['ISIN', 'Écart_Normalisé_pb']])
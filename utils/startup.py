@@ -0,0 +1,134 @@
+# app/utils/startup.py
+
+import ast
+import glob
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Racine de l'application (répertoire contenant app.py, pages/ et utils/)
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bibliothèques lourdes chargées à la demande (voir utils.lazy)
+HEAVY_MODULES = ('scipy', 'plotly', 'streamlit')
+
+# Modules de calcul utilisables hors de l'application : budget de démarrage
+# à froid (secondes) et bibliothèques lourdes qu'ils ne doivent pas charger
+HEADLESS_BUDGETS = {
+    'utils.bonds': (0.3, HEAVY_MODULES),
+    'utils.adjudication': (1.0, HEAVY_MODULES),
+    'utils.yields': (1.0, HEAVY_MODULES),
+    'utils.portfolio': (1.0, HEAVY_MODULES),
+    'utils.data': (1.0, HEAVY_MODULES),
+    'utils.batch': (1.0, HEAVY_MODULES)
+}
+
+# Budget de démarrage à froid des imports de chaque page (secondes)
+PAGE_BUDGET = 2.5
+
+_MEASURE_TEMPLATE = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'modules': sorted({{name.split('.')[0] for name in sys.modules}})}}))
+"""
+
+def page_imports(path):
+    """
+    Retourne les instructions d'import de premier niveau d'une page (sans
+    exécuter la page, qui nécessite un serveur Streamlit).
+    """
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def measure_cold_start(imports, repeat=3, root=APP_ROOT):
+    """
+    Mesure le temps d'exécution d'instructions d'import dans un interpréteur
+    neuf (hors démarrage de l'interpréteur lui-même).
+
+    Returns:
+        tuple: (temps médian en secondes, modules de premier niveau chargés)
+
+    Raises:
+        RuntimeError: si les imports échouent.
+    """
+    code = _MEASURE_TEMPLATE.format(imports=imports)
+    env = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    timings, modules = [], set()
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, '-c', code], cwd=root, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "échec de l'import")
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        timings.append(result['elapsed'])
+        modules = set(result['modules'])
+    return statistics.median(timings), modules
+
+def startup_report(repeat=3, include_pages=True, root=APP_ROOT):
+    """
+    Rapport de démarrage à froid des modules de calcul et des pages. Les pages
+    sont ignorées lorsque streamlit n'est pas installé.
+
+    Returns:
+        list: une ligne (dict) par cible, avec le temps mesuré, le budget, les
+            bibliothèques lourdes chargées et le statut ('OK', 'Dépassement',
+            'Import interdit', 'Ignorée (streamlit absent)' ou 'Erreur').
+    """
+    targets = [(module, f"import {module}", budget, forbidden, False) for module, (budget, forbidden) in HEADLESS_BUDGETS.items()]
+    if include_pages:
+        for path in [os.path.join(root, 'app.py')] + sorted(glob.glob(os.path.join(root, 'pages', '*.py'))):
+            targets.append((os.path.relpath(path, root), page_imports(path), PAGE_BUDGET, (), True))
+    streamlit_available = importlib.util.find_spec('streamlit') is not None
+
+    rows = []
+    for name, imports, budget, forbidden, is_page in targets:
+        if is_page and not streamlit_available:
+            rows.append({'Cible': name, 'Temps (s)': float('nan'), 'Budget (s)': budget,
+                         'Modules Lourds': '', 'Statut': 'Ignorée (streamlit absent)'})
+            continue
+        try:
+            elapsed, modules = measure_cold_start(imports, repeat, root)
+        except RuntimeError as e:
+            rows.append({'Cible': name, 'Temps (s)': float('nan'), 'Budget (s)': budget,
+                         'Modules Lourds': '', 'Statut': f"Erreur : {e}"})
+            continue
+        heavy = sorted(modules.intersection(HEAVY_MODULES))
+        if modules.intersection(forbidden):
+            status = 'Import interdit'
+        elif elapsed > budget:
+            status = 'Dépassement'
+        else:
+            status = 'OK'
+        rows.append({'Cible': name, 'Temps (s)': elapsed, 'Budget (s)': budget,
+                     'Modules Lourds': ', '.join(heavy), 'Statut': status})
+    return rows
+
+def format_report(rows):
+    """
+    Met en forme le rapport de startup_report en tableau texte.
+    """
+    columns = ['Cible', 'Temps (s)', 'Budget (s)', 'Modules Lourds', 'Statut']
+    cells = [[f"{row[column]:.3f}" if isinstance(row[column], float) else str(row[column]) for column in columns]
+             for row in rows]
+    widths = [max([len(column)] + [len(line[i]) for line in cells]) for i, column in enumerate(columns)]
+    lines = [columns] + cells
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(line, widths)) for line in lines)
+
+# Vérification du budget de démarrage (code de sortie 1 en cas de dépassement ;
+# les mêmes budgets sont vérifiés par tests/test_startup.py)
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rapport de démarrage à froid des modules et des pages.")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre de mesures par cible (médiane).")
+    parser.add_argument('--headless-only', action='store_true', help="Ne mesure que les modules de calcul.")
+    args = parser.parse_args()
+
+    report = startup_report(repeat=args.repeat, include_pages=not args.headless_only)
+    print(format_report(report))
+    sys.exit(0 if all(row['Statut'] == 'OK' or row['Statut'].startswith('Ignorée') for row in report) else 1)
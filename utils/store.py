@@ -0,0 +1,323 @@
+# app/utils/store.py
+
+import os
+import uuid
+import pandas as pd
+from utils.data import DATA_CACHE_DIR
+from utils.lazy import lazy_import
+
+pa = lazy_import('pyarrow')
+ds = lazy_import('pyarrow.dataset')
+pq = lazy_import('pyarrow.parquet')
+fs = lazy_import('pyarrow.fs')
+
+# Sous-répertoires et fichier d'index de la base
+AUCTIONS_DIR = 'auctions'
+BIDS_DIR = 'bids'
+INDEX_FILE = 'index.parquet'
+
+# Schéma de chaque jeu de données, complété à chaque ajout (le préfixe '_'
+# l'exclut des fichiers de données lors de la lecture des partitions)
+SCHEMA_FILE = '_schema.parquet'
+
+# Nombre de fichiers d'une partition au-delà duquel append les fusionne en un
+# seul : chaque ajout crée un fichier par année, et la lecture ralentit avec
+# le nombre de fichiers ouverts
+COMPACT_THRESHOLD = 32
+
+# Ordre des lignes dans les fichiers (resserre les statistiques min/max)
+_SORT_KEYS = {
+    AUCTIONS_DIR: [('ISIN', 'ascending'), ('Date', 'ascending')],
+    BIDS_DIR: [('Auction_ID', 'ascending'), ('Price', 'descending')]
+}
+
+# Emplacement par défaut de la base (dans le répertoire de cache des données)
+DEFAULT_STORE_DIR = os.path.join(DATA_CACHE_DIR, 'auctions_store')
+
+class AuctionStore:
+    """
+    Base locale et colonnaire des adjudications historiques (Parquet).
+
+    Les en-têtes d'adjudication et les soumissions sont écrits dans deux jeux
+    de données partitionnés par année (`year=AAAA/`), en ajout seul : chaque
+    ingestion crée de nouveaux fichiers, sans réécrire l'historique. Un index
+    compact (Auction_ID, Date, ISIN, année) permet de ne lire que les
+    partitions utiles. Au-delà de COMPACT_THRESHOLD fichiers, ceux d'une
+    partition sont fusionnés (voir compact). Les lectures sont projetées en
+    mémoire (memory-map) et les filtres sont poussés jusqu'aux statistiques
+    des fichiers Parquet.
+    """
+
+    def __init__(self, root):
+        """
+        Args:
+            root (str): Répertoire de la base, créé à la première écriture
+                (une base absente se lit comme une base vide).
+        """
+        self.root = root
+        self._filesystem = fs.LocalFileSystem(use_mmap=True)
+
+    # --- Index ---
+
+    def index(self):
+        """
+        Retourne l'index des adjudications (Auction_ID, Date, ISIN, year).
+        """
+        path = os.path.join(self.root, INDEX_FILE)
+        if not os.path.exists(path):
+            return pd.DataFrame({
+                'Auction_ID': pd.Series(dtype='int64'),
+                'Date': pd.Series(dtype='datetime64[ns]'),
+                'ISIN': pd.Series(dtype='object'),
+                'year': pd.Series(dtype='int32')
+            })
+        return pq.read_table(path, memory_map=True).to_pandas()
+
+    def _write_index(self, index_df):
+        path = os.path.join(self.root, INDEX_FILE)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        pq.write_table(pa.Table.from_pandas(index_df, preserve_index=False), tmp_path)
+        os.replace(tmp_path, path)
+
+    # --- Schéma et fichiers ---
+
+    def _partition_files(self, directory):
+        """
+        Returns:
+            dict: Répertoire de partition -> fichiers de données (chemins complets).
+        """
+        path = os.path.join(self.root, directory)
+        if not os.path.isdir(path):
+            return {}
+        partitions = {}
+        for name in sorted(os.listdir(path)):
+            partition = os.path.join(path, name)
+            if name.startswith('year=') and os.path.isdir(partition):
+                partitions[partition] = [
+                    os.path.join(partition, file) for file in sorted(os.listdir(partition))
+                    if file.startswith('part-') and file.endswith('.parquet')
+                ]
+        return partitions
+
+    def _schema(self, directory):
+        """
+        Schéma du jeu de données (sans la colonne de partition) : celui
+        enregistré par append ou, à défaut, l'union des schémas de ses fichiers.
+        None si le jeu de données est vide.
+        """
+        path = os.path.join(self.root, directory, SCHEMA_FILE)
+        if os.path.exists(path):
+            return pq.read_schema(path)
+        files = [file for files in self._partition_files(directory).values() for file in files]
+        return pa.unify_schemas([pq.read_schema(file) for file in files]) if files else None
+
+    def _write_schema(self, directory, schema):
+        path = os.path.join(self.root, directory, SCHEMA_FILE)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        pq.write_table(schema.empty_table(), tmp_path)
+        os.replace(tmp_path, path)
+
+    def _compact_partition(self, directory, partition, files, schema):
+        # Le fichier fusionné est écrit sous un nom ignoré à la lecture, puis
+        # renommé avant la suppression des fichiers qu'il remplace
+        batch = uuid.uuid4().hex
+        table = ds.dataset(files, schema=schema, format='parquet', filesystem=self._filesystem).to_table()
+        tmp_path = os.path.join(partition, f"_compact-{batch}.parquet")
+        pq.write_table(table.sort_by(_SORT_KEYS[directory]), tmp_path)
+        os.replace(tmp_path, os.path.join(partition, f"part-{batch}.parquet"))
+        for file in files:
+            os.remove(file)
+
+    def compact(self, min_files=2):
+        """
+        Fusionne les fichiers de chaque partition en un seul fichier trié.
+
+        À exécuter en l'absence d'autre écriture dans la base (append fusionne
+        déjà les partitions qu'il modifie au-delà de COMPACT_THRESHOLD fichiers).
+
+        Args:
+            min_files (int): Nombre minimal de fichiers d'une partition à fusionner.
+
+        Returns:
+            int: Nombre de partitions fusionnées.
+        """
+        n_compacted = 0
+        for directory in (AUCTIONS_DIR, BIDS_DIR):
+            schema = self._schema(directory)
+            for partition, files in self._partition_files(directory).items():
+                if len(files) >= max(min_files, 2):
+                    self._compact_partition(directory, partition, files, schema)
+                    n_compacted += 1
+        return n_compacted
+
+    # --- Ingestion ---
+
+    def append(self, auctions_df, bids_df):
+        """
+        Ajoute des adjudications et leurs soumissions à la base.
+
+        Args:
+            auctions_df (pd.DataFrame): En-têtes ('Auction_ID', 'Date', 'ISIN',
+                'Total_Amount' et toute colonne descriptive, par exemple 'Tenor').
+            bids_df (pd.DataFrame): Soumissions ('Auction_ID', 'Price', 'Amount').
+
+        Raises:
+            ValueError: si une adjudication est déjà présente dans la base, si
+                des soumissions ne correspondent à aucune adjudication ingérée
+                ou si le type d'une colonne diffère de celui de la base.
+        """
+        index_df = self.index()
+        duplicated = set(auctions_df['Auction_ID']).intersection(index_df['Auction_ID'])
+        if duplicated:
+            raise ValueError(f"Adjudications déjà présentes dans la base : {sorted(duplicated)[:10]}")
+        orphans = set(bids_df['Auction_ID']).difference(auctions_df['Auction_ID'])
+        if orphans:
+            raise ValueError(f"Soumissions sans en-tête d'adjudication : {sorted(orphans)[:10]}")
+
+        auctions_df = auctions_df.copy()
+        auctions_df['Date'] = pd.to_datetime(auctions_df['Date'])
+        auctions_df['year'] = auctions_df['Date'].dt.year.astype('int32')
+        # Le tri par ISIN et date resserre les statistiques min/max des fichiers
+        auctions_df = auctions_df.sort_values(['ISIN', 'Date']).reset_index(drop=True)
+
+        years = auctions_df[['Auction_ID', 'year']]
+        bids_df = bids_df.merge(years, on='Auction_ID', how='left').sort_values(['Auction_ID', 'Price'], ascending=[True, False])
+
+        # Schémas vérifiés avant toute écriture : une colonne de type différent
+        # rendrait le jeu de données illisible
+        frames = {AUCTIONS_DIR: auctions_df, BIDS_DIR: bids_df}
+        schemas = {}
+        for directory, frame in frames.items():
+            schema = pa.Schema.from_pandas(frame.drop(columns='year'), preserve_index=False)
+            stored = self._schema(directory)
+            try:
+                schemas[directory] = (schema, pa.unify_schemas([stored, schema]) if stored is not None else schema)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(f"Colonnes incompatibles avec la base ({directory}) : {e}") from e
+
+        os.makedirs(self.root, exist_ok=True)
+        batch = uuid.uuid4().hex
+        for directory, frame in frames.items():
+            schema, dataset_schema = schemas[directory]
+            os.makedirs(os.path.join(self.root, directory), exist_ok=True)
+            self._write_schema(directory, dataset_schema)
+            for year, group in frame.groupby('year'):
+                partition = os.path.join(self.root, directory, f"year={year}")
+                os.makedirs(partition, exist_ok=True)
+                table = pa.Table.from_pandas(group.drop(columns='year'), schema=schema, preserve_index=False)
+                pq.write_table(table, os.path.join(partition, f"part-{batch}.parquet"))
+
+            partitions = self._partition_files(directory)
+            for year in frame['year'].unique():
+                partition = os.path.join(self.root, directory, f"year={year}")
+                if len(partitions[partition]) > COMPACT_THRESHOLD:
+                    self._compact_partition(directory, partition, partitions[partition], dataset_schema)
+
+        new_index = auctions_df[['Auction_ID', 'Date', 'ISIN', 'year']]
+        self._write_index(pd.concat([index_df, new_index], ignore_index=True) if len(index_df) else new_index)
+
+    # --- Lecture ---
+
+    def _dataset(self, directory):
+        # Schéma explicite : sans lui, pyarrow le déduit du premier fichier et
+        # ignore les colonnes ajoutées par les ingestions suivantes
+        year = pa.field('year', pa.int32())
+        return ds.dataset(
+            os.path.join(self.root, directory),
+            schema=self._schema(directory).append(year),
+            format='parquet',
+            partitioning=ds.partitioning(pa.schema([year]), flavor='hive'),
+            filesystem=self._filesystem
+        )
+
+    def query_auctions(self, start=None, end=None, isins=None, columns=None, **filters):
+        """
+        Lit les en-têtes d'adjudication correspondant aux critères.
+
+        Seules les partitions des années demandées sont ouvertes, et les
+        filtres (dates, ISIN, colonnes descriptives) sont appliqués pendant la lecture.
+
+        Args:
+            start, end (date-like, optional): Bornes de date (incluses).
+            isins (list, optional): ISIN retenus.
+            columns (list, optional): Colonnes à lire.
+            **filters: Égalités sur d'autres colonnes (par exemple Tenor=10).
+
+        Returns:
+            pd.DataFrame
+        """
+        expression = None
+
+        def _and(condition):
+            return condition if expression is None else expression & condition
+
+        if start is not None:
+            start = pd.Timestamp(start)
+            expression = _and((ds.field('year') >= start.year) & (ds.field('Date') >= pa.scalar(start.to_pydatetime(), pa.timestamp('ns'))))
+        if end is not None:
+            end = pd.Timestamp(end)
+            expression = _and((ds.field('year') <= end.year) & (ds.field('Date') <= pa.scalar(end.to_pydatetime(), pa.timestamp('ns'))))
+        if isins is not None:
+            expression = _and(ds.field('ISIN').isin(list(isins)))
+        for column, value in filters.items():
+            expression = _and(ds.field(column) == value)
+
+        if not self.index().shape[0]:
+            return pd.DataFrame(columns=columns)
+        table = self._dataset(AUCTIONS_DIR).to_table(columns=columns, filter=expression)
+        auctions_df = table.to_pandas()
+        if 'year' in auctions_df and (columns is None or 'year' not in columns):
+            auctions_df = auctions_df.drop(columns='year')
+        sort_columns = [c for c in ('Date', 'Auction_ID') if c in auctions_df]
+        return auctions_df.sort_values(sort_columns).reset_index(drop=True) if sort_columns else auctions_df
+
+    def load_bids(self, auction_ids, columns=None):
+        """
+        Lit les soumissions des adjudications demandées, en n'ouvrant que les
+        partitions des années concernées (d'après l'index).
+        """
+        auction_ids = list(auction_ids)
+        index_df = self.index()
+        years = index_df.loc[index_df['Auction_ID'].isin(auction_ids), 'year'].unique().tolist()
+        if not years:
+            return pd.DataFrame(columns=columns or ['Auction_ID', 'Price', 'Amount'])
+        expression = ds.field('year').isin(years) & ds.field('Auction_ID').isin(auction_ids)
+        bids_df = self._dataset(BIDS_DIR).to_table(columns=columns, filter=expression).to_pandas()
+        if 'year' in bids_df and (columns is None or 'year' not in columns):
+            bids_df = bids_df.drop(columns='year')
+        return bids_df.reset_index(drop=True)
+
+    def load(self, start=None, end=None, isins=None, **filters):
+        """
+        Charge les en-têtes et les carnets complets des adjudications
+        correspondant aux critères (voir query_auctions).
+
+        Returns:
+            tuple: (auctions_df, bids_df), prêts pour utils.backtest.run_backtest.
+        """
+        auctions_df = self.query_auctions(start=start, end=end, isins=isins, **filters)
+        bids_df = self.load_bids(auctions_df['Auction_ID']) if len(auctions_df) else pd.DataFrame(columns=['Auction_ID', 'Price', 'Amount'])
+        return auctions_df, bids_df
+
+# Exemple d'utilisation (pour test)
+if __name__ == '__main__':
+    import tempfile
+    import time
+    from utils.backtest import generate_sample_history
+
+    auctions_df, bids_df = generate_sample_history(n_auctions=520)
+    auctions_df['Tenor'] = [10, 5, 2] * (len(auctions_df) // 3) + [10, 5, 2][:len(auctions_df) % 3]
+
+    with tempfile.TemporaryDirectory() as root:
+        store = AuctionStore(root)
+        # Ingestion en deux lots (ajout seul)
+        half = len(auctions_df) // 2
+        first_ids = auctions_df['Auction_ID'].iloc[:half]
+        store.append(auctions_df.iloc[:half], bids_df[bids_df['Auction_ID'].isin(first_ids)])
+        store.append(auctions_df.iloc[half:], bids_df[~bids_df['Auction_ID'].isin(first_ids)])
+
+        start_time = time.perf_counter()
+        tenor_10y, tenor_10y_bids = store.load(start='2018-01-01', Tenor=10)
+        print(f"Adjudications 10 ans depuis 2018 : {len(tenor_10y)} ({len(tenor_10y_bids)} soumissions) "
+              f"en {time.perf_counter() - start_time:.3f} s")
+        print(tenor_10y.head())
@@ -2,7 +2,36 @@
 
 import pandas as pd
 import numpy as np
-from scipy.interpolate import CubicSpline
+from collections import namedtuple
+from functools import lru_cache
+from utils.bonds import get_cashflow_schedule
+from utils.instrumentation import instrument, register_cache
+from utils.lazy import lazy_import
+
+# scipy n'est chargé qu'au premier ajustement d'une courbe par spline
+interpolate = lazy_import('scipy.interpolate')
+
+# Modèles paramétriques : nombre de paramètres (β0, β1, β2, τ1) ou (β0, β1, β2, β3, τ1, τ2)
+PARAMETRIC_MODELS = {'nelson_siegel': 4, 'svensson': 6}
+
+# Bornes des paramètres de décroissance τ (années)
+TAU_BOUNDS = (0.05, 30.0)
+
+# Résultat d'un ajustement paramétrique : paramètres (une ligne par courbe),
+# erreur quadratique moyenne, indicateur de convergence et nombre d'itérations
+CurveFit = namedtuple('CurveFit', ['params', 'rmse', 'converged', 'iterations'])
+
+# Méthodes d'ajustement disponibles : constructeur (maturités, rendements) -> courbe évaluable
+CURVE_METHODS = {
+    'cubic': lambda x, y: interpolate.CubicSpline(x, y),
+    'pchip': lambda x, y: interpolate.PchipInterpolator(x, y),
+    'linear': lambda x, y: interpolate.make_interp_spline(x, y, k=1),
+    'nelson_siegel': lambda x, y: ParametricCurve.fit(x, y, 'nelson_siegel'),
+    'svensson': lambda x, y: ParametricCurve.fit(x, y, 'svensson')
+}
+
+# Nombre maximal de courbes ajustées conservées en cache
+CURVE_CACHE_SIZE = 256
 
 def create_dummy_yield_curve(maturities):
     """
@@ -28,26 +57,302 @@ def create_dummy_yield_curve(maturities):
     
     return curve_df
 
-def interpolate_yield_curve(curve_df, target_maturities):
+class FittedCurve:
+    """
+    Courbe de rendement ajustée, partagée via le cache de get_fitted_curve.
+
+    Les maturités et rendements (en décimal) sont en lecture seule : la même
+    instance est réutilisée par toutes les pages et fonctions qui demandent
+    la même courbe.
+    """
+
+    __slots__ = ('maturities', 'yields', 'method', '_interpolator')
+
+    def __init__(self, maturities, yields, method='cubic'):
+        if method not in CURVE_METHODS:
+            raise ValueError(f"Méthode d'interpolation inconnue : {method} (attendu : {', '.join(CURVE_METHODS)})")
+        self.maturities = np.asarray(maturities, dtype=float)
+        self.yields = np.asarray(yields, dtype=float)
+        self.maturities.flags.writeable = False
+        self.yields.flags.writeable = False
+        self.method = method
+        self._interpolator = CURVE_METHODS[method](self.maturities, self.yields)
+
+    def __call__(self, maturities, extrapolate=True):
+        """
+        Rendements (en décimal) aux maturités demandées.
+
+        Args:
+            maturities (array-like): Maturités (années).
+            extrapolate (bool): Si False, les maturités hors de la courbe sont
+                ramenées à ses bornes.
+        """
+        maturities = np.asarray(maturities, dtype=float)
+        if not extrapolate:
+            maturities = np.clip(maturities, self.maturities[0], self.maturities[-1])
+        return self._interpolator(maturities)
+
+def _factor_loadings(maturities, tau):
+    """
+    Facteurs de pente et de courbure de Nelson-Siegel et leur dérivée par rapport à τ.
+
+    Returns:
+        tuple: (pente, courbure, dérivée de la pente, dérivée de la courbure),
+            tableaux (courbes) x (maturités).
+    """
+    x = maturities / tau[:, None]
+    decay = np.exp(-x)
+    slope = -np.expm1(-x) / x
+    curvature = slope - decay
+    tau = tau[:, None]
+    return slope, curvature, curvature / tau, (curvature - decay * x) / tau
+
+def _parametric_yields(params, maturities, model, jacobian=False):
+    """
+    Rendements du modèle pour chaque jeu de paramètres (une ligne par courbe)
+    et, si demandé, leur Jacobien analytique (courbes x maturités x paramètres).
+    """
+    slope, curvature, d_slope, d_curvature = _factor_loadings(maturities, params[:, -2 if model == 'svensson' else -1])
+    yields = params[:, [0]] + params[:, [1]] * slope + params[:, [2]] * curvature
+    columns = [np.ones_like(slope), slope, curvature]
+    if model == 'svensson':
+        _, curvature_2, _, d_curvature_2 = _factor_loadings(maturities, params[:, -1])
+        yields = yields + params[:, [3]] * curvature_2
+        columns += [curvature_2, params[:, [1]] * d_slope + params[:, [2]] * d_curvature, params[:, [3]] * d_curvature_2]
+    else:
+        columns.append(params[:, [1]] * d_slope + params[:, [2]] * d_curvature)
+    if not jacobian:
+        return yields
+    return yields, np.stack(columns, axis=-1)
+
+def _initial_parameters(maturities, yields, model):
+    """
+    Paramètres de départ : τ fixés à des valeurs usuelles, coefficients β
+    obtenus par moindres carrés linéaires (toutes les courbes à la fois).
+    """
+    taus = [1.5] if model == 'nelson_siegel' else [1.5, 8.0]
+    params = np.zeros((len(yields), PARAMETRIC_MODELS[model]))
+    params[:, -len(taus):] = taus
+    params[:, :-len(taus)] = 1.0
+    loadings = _parametric_yields(params[:1], maturities, model, jacobian=True)[1][0, :, :-len(taus)]
+    filled = np.where(np.isfinite(yields), yields, np.nanmean(yields, axis=1, keepdims=True))
+    params[:, :-len(taus)] = np.linalg.lstsq(loadings, filled.T, rcond=None)[0].T
+    return params
+
+def _levenberg_marquardt(maturities, yields, params, model, tol, max_iter):
+    """
+    Moindres carrés non linéaires (Levenberg-Marquardt) menés simultanément
+    sur toutes les courbes, chacune avec son propre facteur d'amortissement.
+    Les rendements manquants (NaN) sont ignorés.
+    """
+    n_taus = 1 if model == 'nelson_siegel' else 2
+    valid = np.isfinite(yields)
+    targets = np.where(valid, yields, 0.0)
+    params = params.copy()
+    model_yields, jac = _parametric_yields(params, maturities, model, jacobian=True)
+    residuals = np.where(valid, model_yields - targets, 0.0)
+    cost = (residuals ** 2).sum(axis=1)
+    damping = np.full(len(params), 1e-3)
+    converged = np.zeros(len(params), dtype=bool)
+    iterations = np.zeros(len(params), dtype=int)
+
+    for _ in range(max_iter):
+        active = np.flatnonzero(~converged & (damping < 1e12))
+        if not active.size:
+            break
+        weighted_jac = jac[active] * valid[active][..., None]
+        normal = np.einsum('nmk,nml->nkl', weighted_jac, weighted_jac)
+        gradient = np.einsum('nmk,nm->nk', weighted_jac, residuals[active])
+        diagonal = np.einsum('nkk->nk', normal)
+        damped = normal + (damping[active, None] * diagonal + 1e-12)[..., None] * np.eye(normal.shape[-1])
+        step = -np.linalg.solve(damped, gradient[..., None])[..., 0]
+
+        trial = params[active] + step
+        trial[:, -n_taus:] = np.clip(trial[:, -n_taus:], *TAU_BOUNDS)
+        trial_yields, trial_jac = _parametric_yields(trial, maturities, model, jacobian=True)
+        trial_residuals = np.where(valid[active], trial_yields - targets[active], 0.0)
+        trial_cost = (trial_residuals ** 2).sum(axis=1)
+
+        improved = trial_cost <= cost[active]
+        accepted = active[improved]
+        params[accepted] = trial[improved]
+        jac[accepted] = trial_jac[improved]
+        residuals[accepted] = trial_residuals[improved]
+        previous_cost = cost[accepted]
+        cost[accepted] = trial_cost[improved]
+        damping[active] = np.where(improved, damping[active] / 3, damping[active] * 4)
+        iterations[active] += 1
+
+        small_step = np.max(np.abs(step[improved]) / (1 + np.abs(trial[improved])), axis=1) <= tol
+        small_gain = previous_cost - cost[accepted] <= tol * (tol + cost[accepted])
+        converged[accepted[small_step | small_gain]] = True
+
+    rmse = np.sqrt(cost / np.maximum(valid.sum(axis=1), 1))
+    return CurveFit(params, rmse, converged, iterations)
+
+@instrument()
+def fit_parametric_curve(maturities, yields, model='nelson_siegel', initial=None, tol=1e-8, max_iter=100):
+    """
+    Ajuste le modèle de Nelson-Siegel ou de Svensson sur une ou plusieurs
+    courbes observées aux mêmes maturités (moindres carrés, Jacobien analytique).
+
+    Args:
+        maturities (array-like): Maturités observées (années, > 0).
+        yields (array-like): Rendements observés, une courbe (maturités) ou
+            plusieurs (courbes x maturités). Les NaN sont ignorés.
+        model (str): 'nelson_siegel' ou 'svensson'.
+        initial (array-like, optional): Paramètres de départ (par exemple ceux
+            de la veille), diffusés sur toutes les courbes.
+        tol (float): Tolérance relative sur le pas et sur la baisse de l'erreur.
+        max_iter (int): Nombre maximal d'itérations.
+
+    Returns:
+        CurveFit: paramètres exprimés dans l'unité des rendements (β) et en années (τ).
+    """
+    if model not in PARAMETRIC_MODELS:
+        raise ValueError(f"Modèle inconnu : {model} (attendu : {', '.join(PARAMETRIC_MODELS)})")
+    maturities = np.asarray(maturities, dtype=float)
+    yields = np.asarray(yields, dtype=float)
+    single = yields.ndim == 1
+    yields = np.atleast_2d(yields)
+    if initial is None:
+        params = _initial_parameters(maturities, yields, model)
+    else:
+        params = np.broadcast_to(np.asarray(initial, dtype=float), (len(yields), PARAMETRIC_MODELS[model])).copy()
+    fit = _levenberg_marquardt(maturities, yields, params, model, tol, max_iter)
+    if single:
+        return CurveFit(fit.params[0], fit.rmse[0], fit.converged[0], fit.iterations[0])
+    return fit
+
+@instrument()
+def fit_curve_history(maturities, yields, model='nelson_siegel', initial=None, block_size=20, tol=1e-8, max_iter=100):
+    """
+    Ajuste le modèle sur une série chronologique de courbes (une ligne par jour).
+
+    Les jours sont traités par blocs de `block_size` ajustés simultanément ;
+    tous les jours d'un bloc partent des paramètres du dernier jour du bloc
+    précédent (avec block_size=1, chaque jour part des paramètres de la veille).
+
+    Args:
+        maturities (array-like): Maturités observées (années).
+        yields (array-like): Rendements (jours x maturités), NaN si non observés.
+        model (str): 'nelson_siegel' ou 'svensson'.
+        initial (array-like, optional): Paramètres de départ du premier jour
+            (par défaut, ajustés sur le premier jour).
+        block_size (int): Nombre de jours ajustés simultanément.
+
+    Returns:
+        CurveFit: une ligne de paramètres par jour.
+    """
+    yields = np.atleast_2d(np.asarray(yields, dtype=float))
+    previous = fit_parametric_curve(maturities, yields[0], model, initial, tol, max_iter).params
+    fits = []
+    for start in range(0, len(yields), block_size):
+        fit = fit_parametric_curve(maturities, yields[start:start + block_size], model, previous, tol, max_iter)
+        fits.append(fit)
+        previous = fit.params[-1]
+    return CurveFit(*(np.concatenate(arrays) for arrays in zip(*fits)))
+
+def parametric_yields(params, maturities, model='nelson_siegel'):
+    """
+    Rendements du modèle aux maturités données, pour un jeu de paramètres
+    (maturités) ou plusieurs (jeux x maturités).
+    """
+    params = np.asarray(params, dtype=float)
+    maturities = np.maximum(np.asarray(maturities, dtype=float), 1e-8)
+    yields = _parametric_yields(np.atleast_2d(params), maturities.ravel(), model)
+    return yields.reshape(maturities.shape) if params.ndim == 1 else yields.reshape((len(params),) + maturities.shape)
+
+class ParametricCurve:
+    """
+    Courbe de Nelson-Siegel ou de Svensson ajustée, évaluable comme une fonction des maturités.
+    """
+
+    __slots__ = ('params', 'model')
+
+    def __init__(self, params, model='nelson_siegel'):
+        self.params = np.asarray(params, dtype=float)
+        self.params.flags.writeable = False
+        self.model = model
+
+    @classmethod
+    def fit(cls, maturities, yields, model='nelson_siegel', **kwargs):
+        """
+        Ajuste le modèle sur une courbe observée (voir fit_parametric_curve).
+        """
+        return cls(fit_parametric_curve(maturities, yields, model, **kwargs).params, model)
+
+    def __call__(self, maturities):
+        return parametric_yields(self.params, maturities, self.model)
+
+@lru_cache(maxsize=CURVE_CACHE_SIZE)
+def _fit_curve(maturities_bytes, yields_bytes, method):
+    return FittedCurve(np.frombuffer(maturities_bytes), np.frombuffer(yields_bytes), method)
+
+@instrument()
+def get_fitted_curve(curve_df, method='cubic'):
+    """
+    Retourne la courbe ajustée sur curve_df, depuis le cache si une courbe de
+    même contenu (maturités, rendements et méthode) a déjà été ajustée.
+
+    Le cache est borné à CURVE_CACHE_SIZE courbes (les moins récemment
+    utilisées sont évincées).
+
+    Args:
+        curve_df (pd.DataFrame): DataFrame avec les colonnes 'Maturity' et 'Yield' (en %).
+        method (str): Méthode de CURVE_METHODS : interpolation qui passe par
+            tous les points ('cubic', 'pchip' ou 'linear'), ou modèle
+            paramétrique ajusté par moindres carrés ('nelson_siegel' ou
+            'svensson', voir fit_parametric_curve).
+
+    Returns:
+        FittedCurve: Courbe évaluable aux maturités voulues (rendements en
+            décimal). Pour un modèle paramétrique, la courbe est évaluée par
+            parametric_yields et ne passe pas exactement par les points
+            observés ; elle reste définie au-delà des maturités observées.
+    """
+    maturities = curve_df['Maturity'].to_numpy(dtype=float)
+    yields = curve_df['Yield'].to_numpy(dtype=float) / 100
+    order = np.argsort(maturities, kind='stable')
+    return _fit_curve(
+        np.ascontiguousarray(maturities[order]).tobytes(),
+        np.ascontiguousarray(yields[order]).tobytes(),
+        method
+    )
+
+def curve_cache_info():
+    """
+    Statistiques du cache de courbes ajustées (hits, misses, maxsize, currsize).
+    """
+    return _fit_curve.cache_info()
+
+register_cache('Courbes ajustées', curve_cache_info)
+
+def clear_curve_cache():
     """
-    Interpole la courbe de rendement en utilisant la méthode des splines cubiques.
+    Vide le cache de courbes ajustées.
+    """
+    _fit_curve.cache_clear()
+
+@instrument()
+def interpolate_yield_curve(curve_df, target_maturities, method='cubic'):
+    """
+    Interpole la courbe de rendement (par défaut, méthode des splines cubiques).
+
+    La courbe ajustée est réutilisée d'un appel à l'autre tant que les
+    données de curve_df ne changent pas (voir get_fitted_curve).
     
     Args:
         curve_df (pd.DataFrame): DataFrame avec les colonnes 'Maturity' et 'Yield'.
         target_maturities (list): Liste des maturités cibles pour l'interpolation.
+        method (str): Méthode de CURVE_METHODS ('cubic', 'pchip', 'linear',
+            'nelson_siegel' ou 'svensson'), voir get_fitted_curve.
         
     Returns:
         pd.DataFrame: DataFrame avec les maturités cibles et les rendements interpolés.
     """
-    # Convertir les rendements en décimal pour l'interpolation
-    x = curve_df['Maturity'].values
-    y = curve_df['Yield'].values / 100
-    
-    # Utiliser les splines cubiques pour l'interpolation
-    cs = CubicSpline(x, y)
-    
     # Calculer les rendements interpolés
-    interpolated_yields = cs(target_maturities) * 100
+    interpolated_yields = get_fitted_curve(curve_df, method)(target_maturities) * 100
     
     # Créer le DataFrame de résultats
     interpolated_df = pd.DataFrame({
@@ -57,6 +362,159 @@ def interpolate_yield_curve(curve_df, target_maturities):
     
     return interpolated_df
 
+class Curve:
+    """
+    Courbe d'actualisation zéro-coupon.
+
+    La courbe est définie par le logarithme des facteurs d'actualisation aux
+    nœuds `times` (le premier nœud est t=0) et interpolée linéairement entre
+    les nœuds, ce qui correspond à des taux forward constants par morceaux.
+    Au-delà du dernier nœud, le dernier taux forward est prolongé.
+    """
+
+    __slots__ = ('times', 'log_discount')
+
+    def __init__(self, times, log_discount):
+        """
+        Args:
+            times (array-like): Nœuds de la courbe (années), croissants, commençant à 0.
+            log_discount (array-like): Logarithme des facteurs d'actualisation aux nœuds.
+        """
+        self.times = np.asarray(times, dtype=float)
+        self.log_discount = np.asarray(log_discount, dtype=float)
+        self.times.flags.writeable = False
+        self.log_discount.flags.writeable = False
+
+    def __repr__(self):
+        return f"Curve(nœuds={len(self.times) - 1}, maturité={self.times[-1]:.2f} ans)"
+
+    def _log_discount(self, t):
+        t = np.asarray(t, dtype=float)
+        log_discount = np.interp(t, self.times, self.log_discount)
+        if len(self.times) > 1:
+            last_forward = (self.log_discount[-1] - self.log_discount[-2]) / (self.times[-1] - self.times[-2])
+            log_discount = np.where(t > self.times[-1], self.log_discount[-1] + last_forward * (t - self.times[-1]), log_discount)
+        return log_discount
+
+    def discount(self, t):
+        """
+        Facteurs d'actualisation aux maturités t (années).
+        """
+        return np.exp(self._log_discount(t))
+
+    def zero(self, t, frequency=None):
+        """
+        Taux zéro-coupon (décimal) aux maturités t.
+
+        Args:
+            t (array-like): Maturités (années).
+            frequency (int, optional): Fréquence de composition (None : continue).
+                Avec la fréquence d'une obligation, `lambda t: curve.zero(t, f)`
+                peut être passé à utils.bonds.price_with_curve_batch.
+        """
+        t = np.asarray(t, dtype=float)
+        log_discount = self._log_discount(t)
+        # En t=0, le taux zéro est le taux forward instantané du premier segment
+        short_rate = -(self.log_discount[1] - self.log_discount[0]) / self.times[1] if len(self.times) > 1 else 0.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            continuous = np.where(t > 0, -log_discount / t, short_rate)
+        if frequency is None:
+            return continuous
+        return frequency * np.expm1(continuous / frequency)
+
+    def forward(self, t1, t2, frequency=None):
+        """
+        Taux forward (décimal) entre t1 et t2 (t2 > t1).
+        """
+        t1 = np.asarray(t1, dtype=float)
+        t2 = np.asarray(t2, dtype=float)
+        continuous = (self._log_discount(t1) - self._log_discount(t2)) / (t2 - t1)
+        if frequency is None:
+            return continuous
+        return frequency * np.expm1(continuous / frequency)
+
+@instrument()
+def bootstrap_zero_curve(price, face_value, coupon_rate, frequency, years_to_maturity, tol=1e-12, max_iter=50):
+    """
+    Construit la courbe zéro-coupon qui reprice exactement un ensemble d'obligations.
+
+    Les obligations sont triées par maturité ; chaque maturité devient un nœud
+    de la courbe. Les flux antérieurs au nœud précédent sont actualisés sur la
+    courbe déjà construite, et le facteur d'actualisation du nouveau nœud est
+    obtenu par Newton-Raphson (une seule inconnue par nœud). Lorsque plusieurs
+    obligations ont la même maturité, le nœud reprice la somme de leurs prix.
+
+    Args:
+        price (array-like): Prix de marché (même unité que face_value).
+        face_value, coupon_rate, frequency, years_to_maturity (array-like):
+            Caractéristiques des obligations (voir utils.bonds.calculate_price_batch).
+        tol (float): Tolérance sur le logarithme du facteur d'actualisation du
+            nœud (écart relatif de prix, indépendant du nominal).
+        max_iter (int): Nombre maximal d'itérations par nœud.
+
+    Returns:
+        Curve
+
+    Raises:
+        ValueError: si un nœud ne peut pas être construit (prix incohérent
+            avec les obligations plus courtes, ou non-convergence).
+    """
+    price, face_value, coupon_rate, frequency, years_to_maturity = (
+        a.ravel() for a in np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (
+            price, face_value, coupon_rate, frequency, years_to_maturity
+        )))
+    )
+    order = np.argsort(years_to_maturity, kind='stable')
+    schedules = [get_cashflow_schedule(face_value[i], coupon_rate[i], frequency[i], years_to_maturity[i]) for i in order]
+    maturities = np.array([schedule.times[-1] for schedule in schedules])
+    first_bonds = np.concatenate(([0], np.flatnonzero(np.diff(maturities) > 1e-12) + 1))
+    nodes = maturities[first_bonds]
+    targets = np.add.reduceat(price[order], first_bonds)
+
+    # Flux de toutes les obligations, regroupés par nœud
+    cf_times = np.concatenate([schedule.times for schedule in schedules])
+    cf_amounts = np.concatenate([schedule.amounts for schedule in schedules])
+    bond_offsets = np.concatenate(([0], np.cumsum([len(schedule) for schedule in schedules])))
+    group_offsets = bond_offsets[np.append(first_bonds, len(schedules))]
+    # Segment de chaque flux : indice du premier nœud qui lui est postérieur ou égal (0 = t=0)
+    segments = np.searchsorted(nodes, cf_times - 1e-12) + 1
+
+    times = np.concatenate(([0.0], nodes))
+    log_discount = np.zeros(len(times))
+    for k in range(1, len(times)):
+        node, target = times[k], targets[k - 1]
+        group = slice(group_offsets[k - 1], group_offsets[k])
+        group_times, group_amounts = cf_times[group], cf_amounts[group]
+
+        previous_time, previous_log = times[k - 1], log_discount[k - 1]
+        known = segments[group] < k
+        known_pv = group_amounts[known] @ np.exp(np.interp(group_times[known], times[:k], log_discount[:k]))
+        weight = (group_times[~known] - previous_time) / (node - previous_time)
+        amounts = group_amounts[~known] * np.exp(previous_log * (1 - weight))
+        if target - known_pv <= 0 or not amounts.size:
+            raise ValueError(f"Impossible de construire le nœud {node:.4f} ans : prix incohérent avec les maturités plus courtes.")
+
+        # Départ : prolongement du dernier taux forward (ou rendement simple pour le premier nœud)
+        forward = (log_discount[k - 2] - previous_log) / (previous_time - times[k - 2]) if k > 1 else \
+            np.log(group_amounts.sum() / target) / node
+        x = previous_log - forward * (node - previous_time)
+        # Newton-Raphson sur le logarithme de la valeur actuelle : la fonction est
+        # presque linéaire en x (exacte pour un seul flux inconnu), ce qui évite
+        # les dépassements lorsque deux nœuds sont très proches
+        log_target = np.log(target - known_pv)
+        for _ in range(max_iter):
+            pv = amounts * np.exp(weight * x)
+            step = (np.log(pv.sum()) - log_target) * pv.sum() / (pv @ weight)
+            x -= step
+            # Critère sans unité : le pas est une variation relative de la valeur actuelle
+            if abs(step) <= tol:
+                break
+        else:
+            raise ValueError(f"Le nœud {node:.4f} ans n'a pas convergé.")
+        log_discount[k] = x
+
+    return Curve(times, log_discount)
+
 # Exemple d'utilisation (pour test)
 if __name__ == '__main__':
     maturities = [0.5, 1, 2, 3, 5, 7, 10, 20, 30]
@@ -68,3 +526,44 @@ if __name__ == '__main__':
     interpolated_df = interpolate_yield_curve(curve_df, target_maturities)
     print("\nCourbe de rendement interpolée (premières lignes):")
     print(interpolated_df.head())
+
+    # Les appels suivants réutilisent la courbe ajustée
+    interpolate_yield_curve(curve_df, target_maturities)
+    print(f"\nCache des courbes : {curve_cache_info()}")
+
+    # Bootstrapping d'une courbe zéro-coupon sur 200 obligations
+    import time
+    from utils.bonds import calculate_price_batch
+
+    rng = np.random.default_rng(0)
+    bond_maturities = np.sort(rng.uniform(0.25, 30.0, 200))
+    coupons = np.round(rng.uniform(0.0, 0.06, 200), 4)
+    prices = calculate_price_batch(0.01 + 0.025 * (1 - np.exp(-bond_maturities / 5)), 100, coupons, 2, bond_maturities)
+
+    start = time.perf_counter()
+    curve = bootstrap_zero_curve(prices, 100, coupons, 2, bond_maturities)
+    print(f"\n{curve} construite en {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"Taux zéro 2/5/10/30 ans : {np.round(curve.zero([2, 5, 10, 30], frequency=2) * 100, 3)}")
+    print(f"Forward 5 ans dans 5 ans : {curve.forward(5, 10, frequency=2) * 100:.3f} %")
+
+    # Le critère d'arrêt ne dépend ni du nominal ni de la fréquence des coupons
+    zero_yields = 0.01 + 0.025 * (1 - np.exp(-bond_maturities / 5))
+    for face_value in (100, 1_000, 1e6):
+        for frequency in (1, 2, 4):
+            prices = calculate_price_batch(zero_yields, face_value, coupons, frequency, bond_maturities)
+            curve = bootstrap_zero_curve(prices, face_value, coupons, frequency, bond_maturities)
+            schedules = [get_cashflow_schedule(face_value, c, frequency, t) for c, t in zip(coupons, bond_maturities)]
+            repriced = np.array([schedule.amounts @ curve.discount(schedule.times) for schedule in schedules])
+            assert np.allclose(repriced, prices, rtol=1e-10, atol=0), (face_value, frequency)
+    print("Bootstrapping vérifié pour les nominaux 100, 1 000 et 1 000 000 (fréquences 1, 2 et 4)")
+
+    # Ajustement de Nelson-Siegel-Svensson sur cinq ans de courbes quotidiennes
+    tenors = np.array([0.25, 0.5, 1, 2, 3, 5, 7, 10, 15, 20, 30])
+    daily_params = np.array([4.0, -2.0, 1.5, -1.0, 1.2, 9.0]) + np.cumsum(rng.normal(0, 0.02, (1260, 6)), axis=0)
+    daily_params[:, 4:] = np.clip(daily_params[:, 4:], 0.5, 20.0)
+    daily_yields = parametric_yields(daily_params, tenors, 'svensson') + rng.normal(0, 0.005, (1260, len(tenors)))
+
+    start = time.perf_counter()
+    history_fit = fit_curve_history(tenors, daily_yields, 'svensson')
+    print(f"\n{len(daily_yields)} courbes ajustées (Svensson) en {time.perf_counter() - start:.2f} s, "
+          f"convergence : {history_fit.converged.mean():.1%}, RMSE médiane : {np.median(history_fit.rmse):.4f}")